@@ -0,0 +1,253 @@
+"""가상 시장 데이터로 지표 / 업종 선정 / 종목 선정 / 전체 백테스트 시간을 재는 벤치마크
+
+    python -m benchmarks.run                       # 100종목 × 5년
+    python -m benchmarks.run --sizes 100x5,1000x10,5000x20 --out bench_results.json
+    python -m benchmarks.run --save-baseline       # 현재 결과를 기준값으로 저장
+    python -m benchmarks.run --threshold 1.3       # 기준값 대비 30% 넘게 느려지면 종료 코드 1
+    python -m benchmarks.run --memory 2500x20 --memory-limit 2G   # 일반 / compact+한도 모드 메모리 비교
+
+네트워크 없이 돈다: 데이터는 benchmarks.synthetic 이 만들고, 캐시/인덱스 파일은 임시 폴더에 쓴다.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from benchmarks.synthetic import make_market
+from modules import cross_index, indicator_cache
+from modules.compact import compact_data, parse_memory
+from modules.cross_index import CrossEventIndex
+from modules.engine import Backtester
+from modules.indicators import calculate_rs, calculate_rsi, calculate_supertrend
+from modules.signal_logic import (SectorSignals, build_sector_signal_panel, find_leading_sectors,
+                                  find_leading_sectors_from_panel)
+from modules.stock_filter import filter_first_golden_cross_stock
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+DEFAULT_THRESHOLD = 1.25   # 기준값 대비 허용 배수
+NOISE_FLOOR = 0.005        # 이보다 짧은 측정은 회귀 판정에서 제외 (초)
+SAMPLE_TICKERS = 200       # 종목별 지표 벤치마크에 쓰는 최대 종목 수
+QUERY_DATES = 20           # find_leading_sectors (날짜별 전체 재계산) 를 잴 날짜 수
+
+
+def parse_size(size):
+    """'1000x10' → (1000 종목, 10 년)"""
+    tickers, years = size.lower().split("x")
+    return int(tickers), int(years)
+
+
+def _time(fn, repeat):
+    """fn 을 repeat 번 실행한 시간 (중앙값, 최소값) 초"""
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+    return statistics.median(times), min(times)
+
+
+def _fresh_state():
+    """프로세스 전역 캐시(지표 LRU, 크로스 인덱스)를 비워 크기별 측정이 서로 섞이지 않게 한다"""
+    indicator_cache._caches.clear()
+    cross_index._indexes.clear()
+
+
+def bench_size(n_tickers, years, repeat=3, seed=0):
+    """한 크기에서 모든 케이스를 재고 {케이스: {seconds, min, calls}} 반환"""
+    started = time.perf_counter()
+    data = make_market(n_tickers, years, seed)
+    print(f"[BENCH] {n_tickers}종목 × {years}년 데이터 생성 {time.perf_counter() - started:.1f}s "
+          f"(업종 {len(data['sectors'])}개, {len(data['kospi'])}봉)")
+
+    kospi = data["kospi"]
+    sample = list(data["stocks"].values())[:SAMPLE_TICKERS]
+    dates = kospi.index
+    query_dates = dates[np.linspace(len(dates) // 2, len(dates) - 1, QUERY_DATES).astype(int)]
+    results = {}
+
+    def record(name, fn, calls, repeat=repeat):
+        median, best = _time(fn, repeat)
+        results[name] = {"seconds": round(median, 6), "min": round(best, 6), "calls": calls}
+        print(f"  {name:<32} {median * 1000:10.2f}ms  ({calls}회, {median / calls * 1e6:.1f}µs/회)")
+
+    record("calculate_supertrend", lambda: [calculate_supertrend(df) for df in sample], len(sample))
+    record("calculate_rsi", lambda: [calculate_rsi(df['종가']) for df in sample], len(sample))
+    record("calculate_rs", lambda: [calculate_rs(df, kospi) for df in sample], len(sample))
+
+    sectors = data["sectors"]
+    record("find_leading_sectors",
+           lambda: [find_leading_sectors({c: df.loc[:d] for c, df in sectors.items()}, kospi.loc[:d])
+                    for d in query_dates],
+           len(query_dates), repeat=1)
+    panel = build_sector_signal_panel(sectors, kospi)
+    record("build_sector_signal_panel", lambda: build_sector_signal_panel(sectors, kospi), 1)
+    record("find_leading_sectors_from_panel",
+           lambda: [find_leading_sectors_from_panel(panel, d) for d in dates], len(dates))
+    signals = SectorSignals(panel, dates)
+    record("sector_signals_leading", lambda: [signals.leading(t) for t in range(len(dates))], len(dates))
+
+    with tempfile.TemporaryDirectory(prefix="bench_") as tmp:
+        stocks = data["stocks"]
+        loader = lambda t, s, e: stocks[t]  # noqa: E731
+        start, end = data["start_date"], data["end_date"]
+
+        def select(index, as_of_dates):
+            for code, members in data["sector_stocks"].items():
+                for d in as_of_dates:
+                    filter_first_golden_cross_stock(members, start, end, kospi, as_of=d, index=index,
+                                                    loader=loader, verbose=False)
+
+        # cold: 인덱스를 처음 만드는 비용, warm: 만든 뒤 날짜별 조회 비용
+        record("filter_first_golden_cross_cold",
+               lambda: select(CrossEventIndex(tempfile.mkdtemp(dir=tmp)), dates[-1:]),
+               len(data["sector_stocks"]), repeat=1)
+        warm_index = CrossEventIndex(os.path.join(tmp, "warm"))
+        select(warm_index, dates[-1:])
+        record("filter_first_golden_cross_warm", lambda: select(warm_index, query_dates),
+               len(data["sector_stocks"]) * len(query_dates))
+
+        cwd = os.getcwd()
+        os.chdir(tmp)  # 지표 캐시 / 크로스 인덱스 파일을 임시 폴더에 쓴다
+        try:
+            _fresh_state()
+            record("backtest_cold", lambda: Backtester(data, verbose=False).run(), 1, repeat=1)
+            record("backtest_warm", lambda: Backtester(data, verbose=False).run(), 1)
+        finally:
+            os.chdir(cwd)
+            _fresh_state()
+
+    return results
+
+
+def bench_memory(n_tickers, years, memory_limit, seed=0):
+    """일반 모드와 compact + memory_limit 모드의 상주 메모리 / 백테스트 중 최대 메모리 (tracemalloc 기준)
+
+    상주 = 데이터를 읽은 뒤 들고 있는 바이트, 최대 = run() 동안의 최고치. 두 모드의 거래 로그가 같은지도 확인한다.
+    """
+    rows = {}
+    trades = {}
+    with tempfile.TemporaryDirectory(prefix="bench_mem_") as tmp:
+        cwd = os.getcwd()
+        os.chdir(tmp)
+        try:
+            for mode in ("plain", "compact"):
+                _fresh_state()
+                tracemalloc.start()
+                started = time.perf_counter()
+                data = make_market(n_tickers, years, seed)
+                if mode == "compact":
+                    data = compact_data(data, memory_limit, spill_dir=os.path.join(tmp, "spill"))
+                resident = tracemalloc.get_traced_memory()[0]
+                tracemalloc.reset_peak()
+                result = Backtester(data, verbose=False).run()
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                trades[mode] = result.trade_frame()
+                rows[mode] = {"seconds": round(time.perf_counter() - started, 6), "resident_bytes": resident,
+                              "peak_bytes": peak, "memory_limit": memory_limit if mode == "compact" else None}
+                print(f"  memory_{mode:<8} 상주 {resident / 1e6:9.1f}MB | run 최대 {peak / 1e6:9.1f}MB "
+                      f"({rows[mode]['seconds']:.1f}s)")
+                if hasattr(data["stocks"], "log_stats"):
+                    data["stocks"].log_stats()
+                del data, result
+        finally:
+            os.chdir(cwd)
+            _fresh_state()
+    same = trades["plain"].equals(trades["compact"])
+    rows["compact"]["same_trades"] = same
+    print(f"  거래 로그 일치: {same}")
+    return rows
+
+
+def run_suite(sizes, repeat=3, seed=0):
+    report = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "seed": seed,
+        "results": {},
+    }
+    for size in sizes:
+        n_tickers, years = parse_size(size)
+        for name, row in bench_size(n_tickers, years, repeat, seed).items():
+            report["results"][f"{name}@{size}"] = row
+    return report
+
+
+def compare(report, baseline, threshold=DEFAULT_THRESHOLD):
+    """기준값과 비교해 느려진 케이스 목록 반환 (기준값에 케이스별 threshold 가 있으면 그 값을 쓴다)"""
+    regressions = []
+    print(f"\n{'case':<44} {'base':>10} {'now':>10} {'ratio':>7}")
+    for key, row in report["results"].items():
+        base = baseline.get("results", {}).get(key)
+        if base is None:
+            print(f"{key:<44} {'-':>10} {row['seconds']:10.4f}")
+            continue
+        ratio = row["seconds"] / base["seconds"] if base["seconds"] else float("inf")
+        limit = base.get("threshold", threshold)
+        slow = ratio > limit and row["seconds"] > NOISE_FLOOR
+        print(f"{key:<44} {base['seconds']:10.4f} {row['seconds']:10.4f} {ratio:6.2f}x{'  ❌ 회귀' if slow else ''}")
+        if slow:
+            regressions.append((key, ratio, limit))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="가상 데이터 벤치마크 (오프라인)")
+    parser.add_argument("--sizes", default="100x5", help="종목수x년수 목록 (예: 100x5,1000x10,5000x20)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="bench_results.json")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--save-baseline", action="store_true", help="이번 결과를 기준값 파일로 저장")
+    parser.add_argument("--memory", help="메모리 측정 크기 목록 (예: 2500x20) — 주면 시간 벤치마크 대신 이것만")
+    parser.add_argument("--memory-limit", dest="memory_limit", default="1G", help="compact 모드 메모리 한도 (예: 2G)")
+    args = parser.parse_args(argv)
+
+    if args.memory:
+        limit = parse_memory(args.memory_limit)
+        report = {"created_at": time.strftime("%Y-%m-%dT%H:%M:%S"), "python": platform.python_version(),
+                  "seed": args.seed, "memory": {}}
+        for size in args.memory.split(","):
+            n_tickers, years = parse_size(size)
+            print(f"[BENCH] 메모리 {n_tickers}종목 × {years}년 (한도 {args.memory_limit})")
+            for mode, row in bench_memory(n_tickers, years, limit, args.seed).items():
+                report["memory"][f"memory_{mode}@{size}"] = row
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"[BENCH] 결과 저장 → {args.out}")
+        return 0
+
+    report = run_suite(args.sizes.split(","), args.repeat, args.seed)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"[BENCH] 결과 저장 → {args.out}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"[BENCH] 기준값 저장 → {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("[BENCH] 기준값 파일 없음 (--save-baseline 으로 만들 수 있음)")
+        return 0
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = compare(report, baseline, args.threshold)
+    for key, ratio, limit in regressions:
+        print(f"[BENCH] ❌ {key}: 기준값 대비 {ratio:.2f}배 (허용 {limit:.2f}배)")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
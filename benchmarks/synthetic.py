@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+
+from modules.sector_map import sector_code_map
+
+BARS_PER_YEAR = 250
+KOSPI_CODE = "1001"
+SECTOR_CODES = [code for code in sector_code_map if code != KOSPI_CODE]
+
+
+def _ohlcv(close, rng, index):
+    """종가 배열 → 시가/고가/저가/종가/거래량 DataFrame (날짜 인덱스 '날짜')"""
+    n = len(close)
+    open_ = close * (1 + rng.normal(0, 0.004, n))
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.008, n)))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.008, n)))
+    return pd.DataFrame({
+        '시가': np.round(open_, 2),
+        '고가': np.round(high, 2),
+        '저가': np.round(low, 2),
+        '종가': close,
+        '거래량': rng.integers(1_000, 1_000_000, n),
+    }, index=index)
+
+
+def make_market(n_tickers=100, years=5, seed=0, start="2005-01-03", n_sectors=None):
+    """결정적(seed 고정) 가상 시장 데이터 — load_backtest_data() 와 같은 형태의 dict
+
+    코스피 = 시장 요인, 업종 지수 = 시장 + 업종 요인 + 완만한 순환, 종목 = 업종 + 개별 요인.
+    종목 일부는 중간에 상장한 것처럼 앞부분을 잘라 봉 수가 제각각이 되게 한다.
+    업종 코드는 sector_map 의 실제 코드를 쓰고, 종목은 업종에 고르게 나눠 배정한다.
+    """
+    rng = np.random.default_rng(seed)
+    n = years * BARS_PER_YEAR
+    index = pd.bdate_range(start, periods=n, name='날짜')
+    steps = np.arange(n)
+    n_sectors = min(n_sectors or max(n_tickers // 20, 1), len(SECTOR_CODES))
+
+    market = np.cumsum(rng.normal(0.0002, 0.01, n))
+    kospi = _ohlcv(np.round(2000 * np.exp(market), 2), rng, index)
+
+    sectors, sector_stocks, stocks = {}, {}, {}
+    sector_log = {}
+    for i, code in enumerate(SECTOR_CODES[:n_sectors]):
+        cycle = 0.3 * np.sin(steps / (60 + 13 * i) + rng.uniform(0, 2 * np.pi))
+        sector_log[code] = market + np.cumsum(rng.normal(0, 0.008, n)) + cycle
+        sectors[code] = _ohlcv(np.round(1000 * np.exp(sector_log[code]), 2), rng, index)
+        sector_stocks[code] = {}
+
+    codes = list(sectors)
+    for j in range(n_tickers):
+        code = codes[j % n_sectors]
+        ticker = f"{j:06d}"
+        idio = np.cumsum(rng.normal(0, 0.015, n)) + 0.2 * np.sin(steps / (25 + 7 * (j % 9)))
+        close = np.round(rng.uniform(2_000, 50_000) * np.exp(sector_log[code] + idio))
+        listed = int(rng.integers(0, n // 10)) if rng.random() < 0.3 else 0
+        stocks[ticker] = _ohlcv(close, rng, index).iloc[listed:]
+        sector_stocks[code][ticker] = f"종목{ticker}"
+
+    return {
+        "start_date": index[0].strftime("%Y%m%d"),
+        "end_date": index[-1].strftime("%Y%m%d"),
+        "kospi": kospi,
+        "sectors": sectors,
+        "sector_stocks": sector_stocks,
+        "stocks": stocks,
+    }
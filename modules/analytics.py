@@ -0,0 +1,156 @@
+"""일별 평가자산 곡선 행렬(실행 × 거래일)의 성과 지표를 한 번의 numpy 연산으로 계산
+
+모든 리포트 / 스윕 / walk-forward 는 여기의 정의를 쓴다:
+    CAGR            첫날 대비 마지막 날 자산의 연복리 (거래일 252일 = 1년)
+    Sharpe/Sortino  일별 수익률 평균 / (표준편차 | 하방편차) × √252
+    MDD             자산곡선 고점 대비 최대 낙폭 (음수), mdd_days = 최장 수면 아래 기간 (거래일)
+    turnover        연간 매매 회전율 (전액 매수 / 매도 = 1, 교체 = 2)
+    벤치마크 대비    beta, alpha(연), 상관계수, tracking error, information ratio, 초과 CAGR
+
+    eq = stack_equity(results)                       # BacktestResult 목록 → (실행 × 거래일)
+    df = metrics_frame(eq, benchmark=kospi['종가'], dates=results[0].dates, events=stack_events(results))
+"""
+import numpy as np
+import pandas as pd
+
+from modules.engine import EVENT_BUY, EVENT_SELL, EVENT_SWITCH
+
+TRADING_DAYS = 252
+TURNOVER_WEIGHTS = {EVENT_BUY: 1.0, EVENT_SELL: 1.0, EVENT_SWITCH: 2.0}
+
+
+def _as_matrix(equity):
+    return np.atleast_2d(np.asarray(equity, dtype=float))
+
+
+def daily_returns(equity):
+    """(실행 × 거래일) 자산 → (실행 × 거래일-1) 일별 수익률"""
+    eq = _as_matrix(equity)
+    return eq[:, 1:] / eq[:, :-1] - 1
+
+
+def _sharpe(mean, std, periods):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(std > 0, mean / std * np.sqrt(periods), np.nan)
+
+
+def drawdown(equity):
+    """고점 대비 낙폭 행렬 (0 이하)"""
+    eq = _as_matrix(equity)
+    return eq / np.maximum.accumulate(eq, axis=1) - 1
+
+
+def underwater_days(dd):
+    """낙폭 행렬 → 행별 최장 수면 아래 구간 길이 (거래일). 새 고점을 찍은 날 0 으로 리셋"""
+    idx = np.arange(dd.shape[1])
+    last_peak = np.maximum.accumulate(np.where(dd >= 0, idx, -1), axis=1)
+    return (idx - last_peak).max(axis=1) if dd.shape[1] else np.zeros(len(dd), dtype=int)
+
+
+def align_benchmark(benchmark, dates):
+    """벤치마크(코스피 종가 Series) → dates 에 맞춘 배열 (휴장일 차이는 직전 값으로 채움)"""
+    if isinstance(benchmark, pd.Series):
+        return benchmark.reindex(pd.DatetimeIndex(dates), method="ffill").to_numpy(float)
+    return np.asarray(benchmark, dtype=float)
+
+
+def compute_metrics(equity, benchmark=None, dates=None, events=None, periods=TRADING_DAYS):
+    """자산곡선 행렬 → {지표: 길이 = 실행 수 배열}
+
+    benchmark: 같은 거래일의 지수 값 (Series 면 dates 로 정렬), events: engine 의 일별 이벤트 코드 행렬
+    """
+    eq = _as_matrix(equity)
+    runs, days = eq.shape
+    rets = daily_returns(eq)
+    years = max(days - 1, 1) / periods
+    mean = rets.mean(axis=1) if days > 1 else np.full(runs, np.nan)
+    std = rets.std(axis=1, ddof=1) if days > 2 else np.full(runs, np.nan)
+    downside = np.sqrt((np.minimum(rets, 0) ** 2).mean(axis=1)) if days > 1 else np.full(runs, np.nan)
+    dd = drawdown(eq)
+
+    out = {
+        "total_return": eq[:, -1] / eq[:, 0] - 1,
+        "cagr": (eq[:, -1] / eq[:, 0]) ** (1 / years) - 1,
+        "volatility": std * np.sqrt(periods),
+        "sharpe": _sharpe(mean, std, periods),
+        "sortino": _sharpe(mean, downside, periods),
+        "mdd": dd.min(axis=1),
+        "mdd_days": underwater_days(dd),
+    }
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out["calmar"] = np.where(out["mdd"] < 0, out["cagr"] / -out["mdd"], np.nan)
+
+    if events is not None:
+        ev = np.atleast_2d(np.asarray(events))
+        traded = np.zeros(ev.shape, dtype=float)
+        for code, weight in TURNOVER_WEIGHTS.items():
+            traded[ev == code] = weight
+        out["turnover"] = traded.sum(axis=1) / years
+
+    if benchmark is not None:
+        bench = align_benchmark(benchmark, dates) if dates is not None else np.asarray(benchmark, dtype=float)
+        b = bench[1:] / bench[:-1] - 1
+        b = np.where(np.isfinite(b), b, 0.0)
+        excess = rets - b
+        b_var = b.var(ddof=1) if len(b) > 1 else np.nan
+        cov = ((rets - mean[:, None]) * (b - b.mean())).sum(axis=1) / max(len(b) - 1, 1)
+        te = excess.std(axis=1, ddof=1) if days > 2 else np.full(runs, np.nan)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            beta = cov / b_var
+            out["beta"] = beta
+            out["alpha"] = (mean - beta * b.mean()) * periods
+            out["correlation"] = cov / (std * b.std(ddof=1))
+        out["tracking_error"] = te * np.sqrt(periods)
+        out["information_ratio"] = _sharpe(excess.mean(axis=1), te, periods)
+        out["excess_cagr"] = out["cagr"] - ((bench[-1] / bench[0]) ** (1 / years) - 1)
+    return out
+
+
+def metrics_frame(equity, benchmark=None, dates=None, events=None, index=None, periods=TRADING_DAYS):
+    """compute_metrics 결과를 실행별 한 줄 DataFrame 으로"""
+    return pd.DataFrame(compute_metrics(equity, benchmark, dates, events, periods), index=index)
+
+
+def rolling_metrics(equity, window=TRADING_DAYS // 2, periods=TRADING_DAYS):
+    """window 거래일 rolling 수익률 / 변동성 / Sharpe / 낙폭 → {지표: (실행 × 거래일) 배열}
+
+    누적합 차분으로 창마다 O(1) 이라 실행 수 × 거래일에 선형. 창이 안 찬 앞부분은 NaN.
+    """
+    eq = _as_matrix(equity)
+    runs, days = eq.shape
+    rets = np.concatenate([np.full((runs, 1), np.nan), daily_returns(eq)], axis=1)
+    out = {k: np.full((runs, days), np.nan) for k in ("return", "volatility", "sharpe", "drawdown")}
+    if days <= window:
+        return out
+    filled = np.nan_to_num(rets)
+    s1 = np.concatenate([np.zeros((runs, 1)), np.cumsum(filled, axis=1)], axis=1)
+    s2 = np.concatenate([np.zeros((runs, 1)), np.cumsum(filled ** 2, axis=1)], axis=1)
+    total = s1[:, window + 1:] - s1[:, 1:-window]
+    sq = s2[:, window + 1:] - s2[:, 1:-window]
+    mean = total / window
+    var = np.maximum(sq - window * mean ** 2, 0) / (window - 1)
+    std = np.sqrt(var)
+    out["return"][:, window:] = eq[:, window:] / eq[:, :-window] - 1
+    out["volatility"][:, window:] = std * np.sqrt(periods)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out["sharpe"][:, window:] = np.where(std > 0, mean / std * np.sqrt(periods), np.nan)
+    peak = pd.DataFrame(eq.T).rolling(window + 1, min_periods=1).max().to_numpy().T
+    out["drawdown"][:, window:] = (eq / peak - 1)[:, window:]
+    return out
+
+
+def stack_equity(results):
+    """BacktestResult 목록 (같은 거래일) → (실행 × 거래일) 자산 행렬 (초기자금 = 1 로 정규화)"""
+    return np.vstack([np.asarray(r.equity, dtype=float) / r.initial_cash for r in results])
+
+
+def stack_events(results):
+    return np.vstack([np.asarray(r.events) for r in results])
+
+
+def result_metrics(result, benchmark=None):
+    """BacktestResult 하나 → {지표: float}"""
+    if len(result.dates) == 0:
+        return {}
+    m = compute_metrics(np.asarray(result.equity, dtype=float), benchmark, result.dates, result.events)
+    return {k: float(v[0]) for k, v in m.items()}
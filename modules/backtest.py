@@ -1,63 +1,164 @@
+import numpy as np
 import pandas as pd
-from pykrx import stock
-from datetime import datetime, timedelta
+from datetime import timedelta
 
-def simulate_buy_and_hold(ticker, buy_date, hold_days=20):
-    start = pd.to_datetime(buy_date)
+from modules.data_loader import get_stock_ohlcv
+
+ROTATION_START = "20200101"
+ROTATION_END = "20251231"
+MIN_ROTATION_BARS = 70   # base_date 이후 봉이 이보다 적으면 평가하지 않음
+_PAD_DATE = np.iinfo(np.int64).max
+
+
+class PricePanel:
+    """미리 읽어 둔 종목 시세를 (봉 위치 × 종목) 2차원 배열로 쌓은 패널
+
+    각 열은 그 종목의 첫 봉부터 채우고 남는 뒤쪽은 NaN (날짜는 _PAD_DATE) 으로 둔다.
+    종목마다 자기 봉 기준으로 정렬돼 있어 rolling 결과가 종목별 계산과 비트 단위로 같다.
+    """
+
+    def __init__(self, prices):
+        prices = {t: df for t, df in prices.items() if df is not None and not df.empty}
+        self.tickers = list(prices)
+        self._col = {t: j for j, t in enumerate(self.tickers)}
+        self.lengths = np.array([len(df) for df in prices.values()], dtype=np.int64)
+        n = int(self.lengths.max()) if len(self.lengths) else 0
+
+        self.close = np.full((n, len(self.tickers)), np.nan)
+        self.dates = np.full((n, len(self.tickers)), _PAD_DATE, dtype=np.int64)
+        for j, df in enumerate(prices.values()):
+            self.close[:len(df), j] = df['종가'].to_numpy(dtype=float)
+            self.dates[:len(df), j] = df.index.values.astype("datetime64[ns]").view("i8")
+        self._ma = {}
+
+    @classmethod
+    def load(cls, tickers, start, end):
+        """로컬 저장소(없는 구간만 pykrx)에서 읽어 패널을 만든다"""
+        return cls({t: get_stock_ohlcv(t, start, end) for t in dict.fromkeys(tickers)})
+
+    def columns(self, tickers):
+        """종목코드 목록 → 열 번호 배열 (패널에 없으면 -1)"""
+        return np.array([self._col.get(t, -1) for t in tickers], dtype=np.int64)
+
+    def moving_average(self, window):
+        ma = self._ma.get(window)
+        if ma is None:
+            ma = self._ma[window] = pd.DataFrame(self.close).rolling(window).mean().to_numpy()
+        return ma
+
+    def positions(self, cols, when, side="left"):
+        """열마다 when 날짜의 봉 위치 (searchsorted 를 모든 열에 한 번에)"""
+        when = np.asarray(pd.to_datetime(when), dtype="datetime64[ns]").view("i8")
+        dates = self.dates[:, cols]
+        if side == "left":
+            return (dates < when).sum(axis=0)
+        return (dates <= when).sum(axis=0)
+
+    def gather(self, values, cols, first, length):
+        """열 cols[j] 의 first[j] 번째 봉부터 length 개를 (length × 종목) 으로 모은다 (범위 밖은 NaN)"""
+        rows = first[None, :] + np.arange(length)[:, None]
+        inside = rows < len(values)
+        out = np.full(rows.shape, np.nan)
+        col_idx = np.broadcast_to(cols, rows.shape)
+        out[inside] = values[rows[inside], col_idx[inside]]
+        return out
+
+
+def batch_buy_and_hold(panel, tickers, buy_dates, hold_days=20):
+    """여러 종목을 buy_date 종가에 사서 hold_days 번째 봉 종가에 판 수익률 배열 (데이터 부족은 NaN)
+
+    simulate_buy_and_hold 와 같은 규칙: buy_date ~ buy_date + hold_days*2일 안의 봉이
+    hold_days 개 미만이면 평가하지 않는다. buy_dates 는 날짜 하나 또는 종목별 날짜 목록.
+    """
+    cols = panel.columns(tickers)
+    found = cols >= 0
+    out = np.full(len(cols), np.nan)
+    if not found.any():
+        return out
+    start = pd.to_datetime(np.broadcast_to(np.asarray(buy_dates, dtype=object), cols.shape))
     end = start + timedelta(days=hold_days * 2)
-    df = stock.get_market_ohlcv_by_date(start.strftime("%Y%m%d"), end.strftime("%Y%m%d"), ticker)
-    df = df.reset_index()
-    df = df[df['날짜'] >= start]
-    if len(df) < hold_days:
-        return None
-    buy_price = df.iloc[0]['종가']
-    sell_price = df.iloc[hold_days - 1]['종가']
-    return (sell_price - buy_price) / buy_price
-
-def run_rotation_strategy(candidates, base_date, hold_days=60):
+    cols = np.where(found, cols, 0)
+
+    first = panel.positions(cols, start, "left")
+    last = panel.positions(cols, end, "right")
+    ok = found & (last - first >= hold_days)
+
+    buy = panel.close[first[ok], cols[ok]]
+    sell = panel.close[first[ok] + hold_days - 1, cols[ok]]
+    out[ok] = (sell - buy) / buy
+    return out
+
+
+def simulate_buy_and_hold(ticker, buy_date, hold_days=20, panel=None):
+    if panel is None:
+        start = pd.to_datetime(buy_date)
+        end = start + timedelta(days=hold_days * 2)
+        panel = PricePanel.load([ticker], start.strftime("%Y%m%d"), end.strftime("%Y%m%d"))
+    ret = batch_buy_and_hold(panel, [ticker], buy_date, hold_days)[0]
+    return None if np.isnan(ret) else ret
+
+
+def batch_rotation_trades(panel, candidates, base_date, hold_days=60, short=5, long=60):
+    """후보 전체의 base_date 이후 첫 골든크로스 매수 → 데드크로스 또는 hold_days 경과 시 매도를 한 번에 계산
+
+    run_rotation_strategy 와 같은 거래 로그를 후보 순서대로 반환한다. 이동평균은 패널 전체
+    기간으로 계산하므로 패널은 base_date 이전 long 봉 이상을 포함해야 한다.
+    """
+    codes = [c[0] for c in candidates]
+    cols = panel.columns(codes)
+    found = cols >= 0
+    cols = np.where(found, cols, 0)
+
+    first = panel.positions(cols, pd.to_datetime(base_date), "left")
+    rows = np.where(found, panel.lengths[cols] - first, 0)     # base_date 이후 봉 수
+    valid = found & (rows >= MIN_ROTATION_BARS)
+    if not valid.any():
+        return []
+    length = int(rows[valid].max())
+
+    ma_s = panel.gather(panel.moving_average(short), cols, first, length)
+    ma_l = panel.gather(panel.moving_average(long), cols, first, length)
+    t = np.arange(length)[:, None]
+    live = (t >= 1) & (t < rows[None, :]) & valid[None, :]
+
+    above = ma_s > ma_l
+    below = ma_s < ma_l
+    prev_le = np.zeros_like(above)
+    prev_ge = np.zeros_like(above)
+    prev_le[1:] = ma_s[:-1] <= ma_l[:-1]
+    prev_ge[1:] = ma_s[:-1] >= ma_l[:-1]
+
+    golden = live & above & prev_le
+    has_entry = golden.any(axis=0)
+    entry = golden.argmax(axis=0)
+
+    dead = live & below & prev_ge & (t > entry[None, :])
+    dead_at = np.where(dead.any(axis=0), dead.argmax(axis=0), length)
+    exit_ = np.minimum(dead_at, entry + hold_days)
+    traded = has_entry & (exit_ < rows)
+
+    close = panel.close
     result_log = []
-    for code, name, *_ in candidates:
-        df = stock.get_market_ohlcv_by_date("20200101", "20251231", code).reset_index()
-        df['MA5'] = df['종가'].rolling(5).mean()
-        df['MA60'] = df['종가'].rolling(60).mean()
-        df = df[df['날짜'] >= pd.to_datetime(base_date)].copy()
-        df.reset_index(drop=True, inplace=True)
-        if df.empty or len(df) < 70:
-            continue
-        entry_price = None
-        for i in range(1, len(df)):
-            ma5 = df.at[i, 'MA5']
-            ma60 = df.at[i, 'MA60']
-            date = df.at[i, '날짜']
-            if entry_price is None:
-                if ma5 > ma60 and df.at[i - 1, 'MA5'] <= df.at[i - 1, 'MA60']:
-                    entry_price = df.at[i, '종가']
-                    entry_index = i
-                    entry_date = date
-            else:
-                if ma5 < ma60 and df.at[i - 1, 'MA5'] >= df.at[i - 1, 'MA60']:
-                    exit_price = df.at[i, '종가']
-                    exit_date = date
-                    result_log.append({
-                        "종목": name,
-                        "매수일": entry_date.strftime("%Y-%m-%d"),
-                        "매도일": exit_date.strftime("%Y-%m-%d"),
-                        "수익률": (exit_price - entry_price) / entry_price
-                    })
-                    break
-                if i - entry_index >= hold_days:
-                    exit_price = df.at[i, '종가']
-                    exit_date = date
-                    result_log.append({
-                        "종목": name,
-                        "매수일": entry_date.strftime("%Y-%m-%d"),
-                        "매도일": exit_date.strftime("%Y-%m-%d"),
-                        "수익률": (exit_price - entry_price) / entry_price
-                    })
-                    break
+    for j in np.flatnonzero(traded):
+        col = cols[j]
+        entry_price = close[first[j] + entry[j], col]
+        exit_price = close[first[j] + exit_[j], col]
+        result_log.append({
+            "종목": candidates[j][1],
+            "매수일": pd.Timestamp(panel.dates[first[j] + entry[j], col]).strftime("%Y-%m-%d"),
+            "매도일": pd.Timestamp(panel.dates[first[j] + exit_[j], col]).strftime("%Y-%m-%d"),
+            "수익률": (exit_price - entry_price) / entry_price
+        })
     return result_log
 
+
+def run_rotation_strategy(candidates, base_date, hold_days=60, panel=None):
+    if panel is None:
+        panel = PricePanel.load([c[0] for c in candidates], ROTATION_START, ROTATION_END)
+    return batch_rotation_trades(panel, candidates, base_date, hold_days)
+
 def evaluate_backtest_results(results):
+    """거래 수익률 목록 요약 (자산곡선이 없는 매수·보유 / 로테이션 시뮬레이션용 — 일별 곡선 지표는 modules.analytics)"""
     if not results:
         return {}
     df = pd.Series(results)
@@ -75,4 +176,4 @@ def evaluate_backtest_results(results):
         "승률": win_rate,
         "MDD": mdd,
         "Sharpe": sharpe
-    }
\ No newline at end of file
+    }
@@ -0,0 +1,230 @@
+import json
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+
+from modules.engine import DEFAULT_STRATEGY_PARAMS, INDICATOR_KEYS, Backtester, BacktestState, Position
+from modules.indicator_cache import data_fingerprint, params_hash
+from modules.online_indicators import IndicatorState, advance_frame
+
+CHECKPOINT_VERSION = 2  # 저장 형식이 바뀌면 올린다 (버전이 다르면 전체 재실행) — 2: 업종 패널 / 지표 상태 포함
+DEFAULT_CHECKPOINT_PATH = "checkpoint.npz"
+PANEL_FIELDS = ('bars', 'Supertrend', 'RS', 'RS_prev')
+POSITION_COLUMNS = ('종가', 'MA5', 'MA60', 'RSI')  # 보유 종목 청산 판단에 쓰는 지표 컬럼
+
+
+def history_fingerprint(data, until):
+    """until 까지의 코스피 / 업종 지수 / 종목 시세 지문 — 과거 데이터가 정정되면 달라진다"""
+    until = pd.Timestamp(until)  # 문자열이면 .loc 마다 날짜 파싱을 다시 한다
+    frames = [data["kospi"].loc[:until]]
+    frames += [data["sectors"][c].loc[:until] for c in sorted(data["sectors"])]
+    frames += [data["stocks"][t].loc[:until] for t in sorted(data["stocks"]) if not data["stocks"][t].empty]
+    return data_fingerprint(*frames)
+
+
+def _indicator_params(params):
+    return {k: params[k] for k in INDICATOR_KEYS}
+
+
+def _new_rows(df, after, until):
+    index = df.index
+    return df.loc[(index > after) & (index <= until)] if after is not None else df.loc[index <= until]
+
+
+def sector_states(data, params, until):
+    """업종별 online 지표 상태를 until 까지의 봉으로 만든다 (체크포인트를 처음 쓸 때 한 번)"""
+    ind_params = _indicator_params(params)
+    bench = data["kospi"]['종가'].loc[:until]
+    return {code: IndicatorState.from_history(df.loc[:until], bench.to_frame(), ind_params)
+            for code, df in data["sectors"].items()}
+
+
+def advance_sector_panel(panel, states, data, params, after, until):
+    """체크포인트의 업종 패널(after 까지)에 (after, until] 새 봉 행만 online 상태로 계산해 이어 붙인다
+
+    build_sector_signal_panel 을 전체 기간으로 다시 돈 것과 같은 값 (states 는 제자리 갱신).
+    """
+    codes = list(panel['bars'].columns)
+    bench = _new_rows(data["kospi"]['종가'], after, until)
+    rs_lag = params['rs_lag']
+    new = {name: {} for name in PANEL_FIELDS}
+    for code in codes:
+        rows = advance_frame(states[code], _new_rows(data["sectors"][code], after, until), bench)
+        if rows.empty:
+            continue
+        done = panel['bars'][code].dropna()
+        rs = pd.concat([panel['RS'][code].loc[done.index].iloc[-rs_lag:], rows['RS']])
+        new['bars'][code] = pd.Series(np.arange(1, len(rows) + 1) + (done.iloc[-1] if len(done) else 0),
+                                      index=rows.index, dtype=float)
+        new['Supertrend'][code] = rows['Supertrend'].astype(float)
+        new['RS'][code] = rows['RS']
+        new['RS_prev'][code] = rs.shift(rs_lag).iloc[-len(rows):]
+    out = {}
+    for name in PANEL_FIELDS:
+        added = pd.DataFrame(new[name]).reindex(columns=codes)
+        out[name] = pd.concat([panel[name], added]) if not added.empty else panel[name]
+    return out
+
+
+def _pack_panel(panel, until):
+    rows = {name: panel[name].loc[:until] for name in PANEL_FIELDS}
+    arrays = {"panel_dates": rows['bars'].index.values.astype("datetime64[ns]"),
+              "panel_codes": np.array([str(c) for c in rows['bars'].columns])}
+    for name, df in rows.items():
+        arrays[f"panel_{name}"] = df.reindex(columns=rows['bars'].columns).to_numpy(dtype=float)
+    return arrays
+
+
+def _unpack_panel(f):
+    index = pd.DatetimeIndex(f["panel_dates"], name=None)
+    codes = [str(c) for c in f["panel_codes"]]
+    return {name: pd.DataFrame(f[f"panel_{name}"], index=index, columns=codes) for name in PANEL_FIELDS}
+
+
+def _pickled(obj):
+    return np.frombuffer(pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL), dtype=np.uint8)
+
+
+def save_checkpoint(path, backtester, states=None, position_state=None):
+    """Backtester.run() 직후의 상태를 npz 하나로 저장
+
+    포트폴리오 + 일별 기록, 업종 패널과 업종별 online 지표 상태, 보유 종목의 지표 행과 online 상태.
+    states / position_state 를 안 주면 (처음 저장할 때) 과거 봉으로 만든다.
+    """
+    state = backtester.state
+    if state is None:
+        raise ValueError("run() 을 먼저 실행해야 함")
+    last = state.dates[-1] if len(state.dates) else None
+    pos = state.position
+    params = backtester.params
+    meta = {
+        "version": CHECKPOINT_VERSION,
+        "start_date": backtester.data["start_date"],
+        "last_date": last.strftime("%Y%m%d") if last is not None else None,
+        "params": params_hash({**DEFAULT_STRATEGY_PARAMS, **params}),
+        "history": history_fingerprint(backtester.data, last) if last is not None else None,
+        "cash": state.cash,
+        "names": state.names,
+        "position": None if pos is None else {
+            "ticker": pos.ticker, "name": pos.name, "entry_date": pos.entry_date.strftime("%Y%m%d"),
+            "entry_price": float(pos.entry_price), "sector_code": pos.sector_code, "rs": float(pos.rs),
+        },
+    }
+    arrays = {}
+    if last is not None:
+        arrays.update(_pack_panel(backtester.sector_panel, last))
+        arrays["sector_states"] = _pickled(states if states is not None else sector_states(backtester.data, params, last))
+        if pos is not None:
+            ind = backtester.indicators(pos.ticker).loc[:last]
+            if position_state is None:
+                position_state = IndicatorState.from_history(backtester.stocks[pos.ticker].loc[:last],
+                                                             backtester.kospi.loc[:last], _indicator_params(params))
+            arrays["position_dates"] = ind.index.values.astype("datetime64[ns]")
+            for k, col in enumerate(POSITION_COLUMNS):
+                arrays[f"position_c{k}"] = ind[col].to_numpy(dtype=float)
+            arrays["position_state"] = _pickled(position_state)
+
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        np.savez(
+            f,
+            meta=np.array(json.dumps(meta, ensure_ascii=False)),
+            dates=state.dates.values.astype("datetime64[ns]"),
+            equity=state.equity,
+            cash_curve=state.cash_curve,
+            events=state.events,
+            labels=state.labels.astype(str),
+            trades=state.trades,
+            **arrays,
+        )
+    os.replace(tmp, path)
+    print(f"[CHECKPOINT] {meta['last_date']} 까지 저장 → {path} (현금 {state.cash:,.0f}, "
+          f"보유 {pos.name if pos else '없음'})")
+
+
+def load_checkpoint(path):
+    """→ (meta dict, BacktestState, 지표 상태 dict) 또는 파일이 없거나 버전이 다르면 None
+
+    지표 상태: {"panel", "sector_states", "position_frame", "position_state"} (저장되지 않은 것은 None)
+    """
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as f:
+        meta = json.loads(str(f["meta"]))
+        if meta.get("version") != CHECKPOINT_VERSION:
+            print(f"[CHECKPOINT] 버전 불일치 ({meta.get('version')}) → 무시")
+            return None
+        p = meta["position"]
+        position = None if p is None else Position(
+            p["ticker"], p["name"], pd.Timestamp(p["entry_date"]), p["entry_price"], p["sector_code"], p["rs"])
+        state = BacktestState(
+            pd.DatetimeIndex(f["dates"]), f["equity"], f["cash_curve"], f["events"],
+            f["labels"].astype(object), f["trades"], meta["names"], meta["cash"], position,
+        )
+        saved = {"panel": None, "sector_states": None, "position_frame": None, "position_state": None}
+        if "panel_dates" in f:
+            saved["panel"] = _unpack_panel(f)
+            saved["sector_states"] = pickle.loads(f["sector_states"].tobytes())
+        if "position_state" in f:
+            saved["position_frame"] = pd.DataFrame(
+                {col: f[f"position_c{k}"] for k, col in enumerate(POSITION_COLUMNS)},
+                index=pd.DatetimeIndex(f["position_dates"]))
+            saved["position_state"] = pickle.loads(f["position_state"].tobytes())
+    return meta, state, saved
+
+
+def run_with_checkpoint(data, params=None, path=DEFAULT_CHECKPOINT_PATH, verbose=True, sector_panel=None):
+    """체크포인트가 있으면 그 다음 거래일부터만 실행하고, 끝나면 새 체크포인트를 쓴다
+
+    시작일 / 파라미터가 다르거나 체크포인트 이전 시세가 바뀌었으면 (정정 등) 처음부터 다시 돈다.
+    이어서 돌 때는 업종 패널과 보유 종목 지표를 저장된 online 상태에서 새 봉만큼만 진행한다
+    (후보 종목의 골든크로스는 크로스 인덱스가 새 봉만 반영). 반환값은 전체 기간을 처음부터 돌린 것과 같은 BacktestResult.
+    """
+    full = {**DEFAULT_STRATEGY_PARAMS, **(params or {})}
+    state, states, position_state, position_frame = None, None, None, None
+    loaded = load_checkpoint(path)
+    if loaded is not None:
+        meta, saved_state, saved = loaded
+        dates = data["kospi"].loc[data["start_date"]:data["end_date"]].index
+        reason = None
+        if meta["start_date"] != data["start_date"]:
+            reason = f"시작일 변경 ({meta['start_date']} → {data['start_date']})"
+        elif meta["params"] != params_hash(full):
+            reason = "파라미터 변경"
+        elif meta["last_date"] is not None and history_fingerprint(data, meta["last_date"]) != meta["history"]:
+            reason = "체크포인트 이전 시세 변경"
+        elif not dates[:len(saved_state.dates)].equals(saved_state.dates):
+            reason = "거래일 불일치"
+        if reason:
+            print(f"[CHECKPOINT] {reason} → 처음부터 실행")
+        else:
+            state = saved_state
+            print(f"[CHECKPOINT] {meta['last_date']} 이후 {len(dates) - len(saved_state.dates)}거래일만 실행")
+            if saved["panel"] is not None:
+                after, until = saved_state.dates[-1], dates[-1]
+                states = saved["sector_states"]
+                if sector_panel is None:
+                    sector_panel = advance_sector_panel(saved["panel"], states, data, full, after, until)
+                else:
+                    for code, df in data["sectors"].items():
+                        advance_frame(states[code], _new_rows(df, after, until),
+                                      _new_rows(data["kospi"]['종가'], after, until))
+                pos = saved_state.position
+                if pos is not None and saved["position_state"] is not None:
+                    position_state = saved["position_state"]
+                    new = advance_frame(position_state, _new_rows(data["stocks"][pos.ticker], after, until),
+                                        _new_rows(data["kospi"]['종가'], after, until))
+                    new['종가'] = _new_rows(data["stocks"][pos.ticker], after, until)['종가'].astype(float)
+                    position_frame = pd.concat([saved["position_frame"], new[list(POSITION_COLUMNS)]])
+
+    backtester = Backtester(data, params, verbose, sector_panel)
+    if position_frame is not None:
+        backtester.preload_indicators(state.position.ticker, position_frame)
+    result = backtester.run(state)
+    end_pos = backtester.state.position
+    if end_pos is None or state is None or state.position is None or end_pos.ticker != state.position.ticker:
+        position_state = None  # 새로 산 종목은 저장할 때 과거 봉으로 만든다
+    save_checkpoint(path, backtester, states, position_state)
+    return result
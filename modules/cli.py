@@ -0,0 +1,202 @@
+"""명령줄 진입점: python -m modules run --start 20200101 --end 20250101 [--config conf.json] [--plot]
+
+pykrx / bs4 / requests 는 실제로 받아야 할 데이터가 있을 때만, matplotlib 은 차트를 요청했을 때만
+import 된다 — 로컬에 데이터가 다 있는 headless 실행은 pandas 로딩 정도의 시간에 시작한다.
+
+config (JSON) 예시 — 명령줄 인자가 config 값보다 우선한다:
+    {"start": "20200101", "end": "20250101", "params": {"rs_threshold": 1.1, "rsi_exit": 75},
+     "kospi_path": "data/index_1001_코스피.csv", "index_dir": "data", "sector_dir": "sector_data"}
+"""
+import argparse
+import json
+import os
+import sys
+
+RUN_DEFAULTS = {
+    "start": "20200101",
+    "end": "20250101",
+    "params": {},
+    "kospi_path": "data/index_1001_코스피.csv",
+    "index_dir": "data",
+    "sector_dir": "sector_data",
+    "plot": False,
+    "save_plot": None,
+    "profile": None,
+    "quiet": False,
+    "cube": False,
+    "checkpoint": None,
+    "bootstrap": 0,
+    "compact": False,
+    "memory_limit": None,
+    "store": None,
+    "strict_members": False,
+}
+
+
+def load_config(path):
+    if not path:
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _resolve(args, config):
+    """기본값 ← config ← 명령줄 순으로 덮어쓴 실행 설정"""
+    conf = {**RUN_DEFAULTS, **config}
+    for key in RUN_DEFAULTS:
+        value = getattr(args, key, None)
+        if value is not None and value is not False:
+            conf[key] = value
+    if not conf["profile"] and os.environ.get("BACKTEST_PROFILE"):
+        conf["profile"] = "memory" if os.environ["BACKTEST_PROFILE"] == "memory" else "time"
+    return conf
+
+
+def cmd_run(args):
+    from modules.engine import Backtester, load_backtest_data
+    from modules.indicator_cache import get_indicator_cache
+    from modules.report import print_report
+
+    conf = _resolve(args, load_config(args.config))
+    if conf["checkpoint"] and conf["store"]:
+        print("[ERROR] --checkpoint 와 --store 는 함께 쓸 수 없음 (체크포인트 실행 결과는 저장소에 넣지 않음)")
+        return 2
+    perf = None
+    if conf["profile"]:
+        from modules.instrumentation import enable_instrumentation
+        perf = enable_instrumentation(track_memory=conf["profile"] == "memory", profile=True)
+
+    # 시세/업종 데이터는 한 번만 읽고, 일별 루프는 modules.engine.Backtester 에서 수행
+    cube = None
+    if conf["cube"]:
+        from modules.price_cube import load_price_cube
+        cube = load_price_cube(index_dir=conf["index_dir"])
+    from modules.compact import parse_memory
+    data = load_backtest_data(conf["start"], conf["end"], conf["kospi_path"], conf["index_dir"], conf["sector_dir"],
+                              cube=cube, compact=conf["compact"] or bool(conf["memory_limit"]),
+                              memory_limit=parse_memory(conf["memory_limit"]),
+                              members_fallback=not conf["strict_members"])
+    if conf["checkpoint"]:
+        from modules.checkpoint import run_with_checkpoint
+        result = run_with_checkpoint(data, conf["params"], conf["checkpoint"], verbose=not conf["quiet"])
+    elif conf["store"]:
+        from modules.result_store import cached_backtest, get_result_store
+        result = cached_backtest(data, conf["params"], get_result_store(conf["store"]), verbose=not conf["quiet"])
+    else:
+        result = Backtester(data, conf["params"], verbose=not conf["quiet"]).run()
+
+    print_report(result, data["kospi"])
+    if conf["bootstrap"]:
+        from modules.robustness import print_robustness, run_robustness
+        print_robustness(run_robustness(result.returns, n=conf["bootstrap"])[1])
+    get_indicator_cache().log_stats()
+    if hasattr(data["stocks"], "log_stats"):
+        data["stocks"].log_stats()
+        data["stocks"].close()
+    if perf:
+        perf.print_summary()
+        perf.write_json("perf_report.json")
+        perf.write_csv("perf_stages.csv")
+        perf.dump_profile("perf_profile.pstats")
+
+    if conf["plot"] or conf["save_plot"]:
+        from modules.report import plot_report
+        plot_report(result, data["kospi"], conf["save_plot"])
+    return 0
+
+
+def cmd_runs(args):
+    from modules.result_store import get_result_store
+    df = get_result_store(args.store).runs(current_code=args.current)
+    if df.empty:
+        print("[STORE] 저장된 실행 없음")
+        return 0
+    if args.sort in df:
+        df = df.sort_values(args.sort, ascending=False)
+    columns = [c for c in ("key", "created_at", "start_date", "end_date", *args.columns.split(","), "elapsed")
+               if c in df]
+    print(df[columns].head(args.limit).to_string(index=False))
+    return 0
+
+
+def cmd_ingest(args):
+    from modules.intraday import ingest_intraday
+    for path in args.paths:
+        key = args.key or os.path.splitext(os.path.basename(path))[0]
+        ingest_intraday(path, key, args.rule, chunk_rows=args.chunk_rows)
+    return 0
+
+
+def cmd_update(args):
+    from modules.updater import run_update
+    if args.members:
+        from modules.membership import get_membership_store
+        from modules.naver_upjong_map import naver_upjong_map
+        store = get_membership_store(os.path.join(args.sector_dir, "snapshots"), ttl=args.members_ttl * 3600)
+        store.refresh_all(naver_upjong_map)
+    df = run_update(args.stock_dir, args.index_dir, args.today, args.workers, report_path=args.report)
+    return 1 if (not df.empty and (df["status"] == "error").any()) else 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m modules", description="업종 로테이션 추세추종 백테스트")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="백테스트 실행")
+    run.add_argument("--start", help="시작일 YYYYMMDD (기본 20200101)")
+    run.add_argument("--end", help="종료일 YYYYMMDD (기본 20250101)")
+    run.add_argument("--config", help="설정 JSON 경로 (기간, 전략 파라미터, 데이터 경로)")
+    run.add_argument("--kospi-path", dest="kospi_path")
+    run.add_argument("--index-dir", dest="index_dir")
+    run.add_argument("--sector-dir", dest="sector_dir")
+    run.add_argument("--plot", action="store_true", help="차트 표시")
+    run.add_argument("--save-plot", dest="save_plot", help="차트를 파일로 저장 (예: result.png)")
+    run.add_argument("--profile", choices=["time", "memory"], help="단계별 성능 측정 리포트 저장")
+    run.add_argument("--quiet", action="store_true", help="일별 매매 로그 생략")
+    run.add_argument("--cube", action="store_true", help="price_cube/ (memmap) 에서 시세 읽기 (없거나 낡으면 생성)")
+    run.add_argument("--checkpoint", help="체크포인트 경로 — 있으면 이후 거래일만 실행하고, 끝나면 갱신 (일일 운영용)")
+    run.add_argument("--bootstrap", type=int, metavar="N", help="거래 수익률 재표본 N 회로 지표 분포(신뢰구간) 출력")
+    run.add_argument("--compact", action="store_true", help="종목 시세 float32 / 정수 거래량, 필요한 지표 컬럼만 보관")
+    run.add_argument("--memory-limit", dest="memory_limit",
+                     help="종목 시세 메모리 한도 (예: 4G, 512M) — 넘으면 오래 안 쓴 종목을 디스크로 (--compact 포함)")
+    run.add_argument("--store", help="결과 저장소 (sqlite) — 같은 조건의 실행이 있으면 다시 돌리지 않음")
+    run.add_argument("--strict-members", dest="strict_members", action="store_true",
+                     help="시작일 이전 업종 구성 스냅샷이 없으면 가장 오래된 스냅샷으로 대신하지 않음 (생존 편향 제거)")
+    run.set_defaults(func=cmd_run)
+
+    runs = sub.add_parser("runs", help="저장된 실행 결과 비교 (--store 로 저장한 것)")
+    runs.add_argument("--store", default="results.sqlite")
+    runs.add_argument("--sort", default="sharpe", help="정렬 기준 지표 (내림차순)")
+    runs.add_argument("--columns", default="rs_threshold,rsi_exit,final_cash,cagr,mdd,sharpe,trades",
+                      help="표시할 파라미터/지표 컬럼 (쉼표 구분)")
+    runs.add_argument("--limit", type=int, default=20)
+    runs.add_argument("--current", action="store_true", help="지금 코드 버전의 결과만")
+    runs.set_defaults(func=cmd_runs)
+
+    ingest = sub.add_parser("ingest", help="분봉 CSV 를 청크 단위로 읽어 리샘플 후 저장소에 저장")
+    ingest.add_argument("paths", nargs="+", help="분봉 CSV 경로 (파일 이름 = 종목코드)")
+    ingest.add_argument("--key", help="종목코드 (기본: 파일 이름)")
+    ingest.add_argument("--rule", default="60min", help="봉 간격 (예: 5min, 60min, 1D)")
+    ingest.add_argument("--chunk-rows", dest="chunk_rows", type=int, default=200_000)
+    ingest.set_defaults(func=cmd_ingest)
+
+    update = sub.add_parser("update", help="종목/지수 CSV 증분 갱신")
+    update.add_argument("--today", help="갱신 기준일 (YYYYMMDD, 기본: 오늘)")
+    update.add_argument("--workers", type=int, default=4)
+    update.add_argument("--stock-dir", default="stock_data")
+    update.add_argument("--index-dir", default="data")
+    update.add_argument("--report", help="변경 내역 CSV 저장 경로")
+    update.add_argument("--members", action="store_true", help="업종 구성 종목 스냅샷도 갱신 (TTL 지난 업종만 조건부 요청)")
+    update.add_argument("--members-ttl", dest="members_ttl", type=float, default=24, help="업종 구성 확인 주기 (시간)")
+    update.add_argument("--sector-dir", dest="sector_dir", default="sector_data")
+    update.set_defaults(func=cmd_update)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,261 @@
+"""전 종목(코스피 + 코스닥) 유니버스용 메모리 절약 모드
+
+- 종목 시세: 가격 float32 (원 단위 정수 가격은 2^24 까지 float32 로 정확히 표현됨), 거래량 정수
+- 지표: 단계가 실제로 쓰는 컬럼만 남기고, 신호 컬럼(GoldenCross / DeadCross / Supertrend)은 bool
+- CompactStore: 메모리 한도를 넘으면 오래 안 쓴 종목을 디스크(npz, bool 컬럼은 비트 단위 packbits)로 내린다
+
+계산은 항상 float64 로 올려서 하므로 (지표, 크로스 인덱스 모두) 결과는 일반 모드와 같다.
+"""
+import os
+import shutil
+import tempfile
+from collections import OrderedDict
+from collections.abc import Mapping
+
+import numpy as np
+import pandas as pd
+
+from modules.instrumentation import DISK_READ, count, file_size
+
+PRICE_COLUMNS = ['시가', '고가', '저가', '종가']
+VOLUME_COLUMN = '거래량'
+SIGNAL_COLUMNS = ('GoldenCross', 'DeadCross', 'Supertrend')
+EXIT_COLUMNS = ('종가', 'MA5', 'MA60', 'RSI')  # 보유 종목 청산 판단 (should_exit_stock + 청산가) 에 필요한 컬럼
+WORKING_MEMORY_SHARE = 0.25  # 메모리 한도 중 실행 중 캐시(종목 커서 / 지표)에 쓰는 몫, 나머지는 CompactStore
+
+
+def _volume_dtype(values):
+    if len(values) == 0 or np.isnan(values).any():
+        return np.float32
+    if values.min() >= 0 and values.max() < 2 ** 32:
+        return np.uint32
+    return np.int64
+
+
+def compact_prices(df):
+    """OHLCV DataFrame → 가격 float32 / 거래량 정수 DataFrame (없는 컬럼은 건너뜀)"""
+    if df is None or df.empty:
+        return df
+    dtypes = {c: np.float32 for c in PRICE_COLUMNS if c in df}
+    if VOLUME_COLUMN in df:
+        dtypes[VOLUME_COLUMN] = _volume_dtype(df[VOLUME_COLUMN].to_numpy(dtype=float))
+    return df.astype(dtypes)
+
+
+def widen_prices(df):
+    """compact_prices 의 역: 가격/거래량을 float64 로 (지표 계산 직전 임시로)"""
+    narrow = [c for c in (*PRICE_COLUMNS, VOLUME_COLUMN) if c in df and df[c].dtype != np.float64]
+    return df.astype({c: float for c in narrow}) if narrow else df
+
+
+def compact_indicators(df, columns=None):
+    """calculate_indicators 결과 → columns 만 남기고 신호는 bool, 가격은 float32 (지표 값은 float64 그대로)"""
+    if columns is not None:
+        df = df[[c for c in columns if c in df]]
+    dtypes = {c: bool for c in SIGNAL_COLUMNS if c in df}
+    dtypes.update({c: np.float32 for c in PRICE_COLUMNS if c in df})
+    return df.astype(dtypes)
+
+
+def frame_bytes(df):
+    return int(df.memory_usage(index=True).sum()) if df is not None else 0
+
+
+def pack_frame(df):
+    """DataFrame → np.savez 용 배열 dict (bool 컬럼은 packbits 로 1/8 크기)"""
+    arrays = {"__dates": df.index.values.astype("datetime64[ns]").view("i8"),
+              "__index_name": np.array(df.index.name or "")}
+    for k, col in enumerate(df.columns):
+        values = df[col].to_numpy()
+        if values.dtype == bool:
+            arrays[f"b{k}_{col}"] = np.packbits(values)
+        else:
+            arrays[f"v{k}_{col}"] = values
+    return arrays
+
+
+def unpack_frame(arrays):
+    """pack_frame 의 역 (컬럼 순서 유지)"""
+    dates = arrays["__dates"]
+    index = pd.DatetimeIndex(dates.view("datetime64[ns]"), name=str(arrays["__index_name"]) or None)
+    columns = {}
+    keys = sorted((k for k in arrays if not k.startswith("__")), key=lambda k: int(k[1:k.index("_")]))
+    for key in keys:
+        kind, name = key[0], key[key.index("_") + 1:]
+        values = arrays[key]
+        columns[name] = np.unpackbits(values, count=len(dates)).astype(bool) if kind == "b" else values
+    return pd.DataFrame(columns, index=index)
+
+
+class CompactStore(Mapping):
+    """{종목코드: DataFrame} 처럼 쓰는 메모리 한도 저장소
+
+    memory_limit(바이트)를 넘으면 가장 오래 안 쓴 종목을 spill_dir 에 npz 로 내리고 메모리에서 뺀다.
+    다시 조회하면 디스크에서 읽어 올린다 (한 번 내린 파일은 불변이라 다시 쓰지 않음).
+    memory_limit=None 이면 모두 메모리에 둔다. 반환된 DataFrame 은 제자리 수정하지 않는다.
+    """
+
+    def __init__(self, memory_limit=None, spill_dir=None):
+        self.memory_limit = memory_limit
+        self._spill_dir = spill_dir
+        self._own_dir = spill_dir is None
+        self._mem = OrderedDict()
+        self._sizes = {}
+        self._spilled = set()
+        self._order = []
+        self._bytes = 0
+        self.spills = 0
+        self.loads = 0
+
+    @property
+    def spill_dir(self):
+        if self._spill_dir is None:
+            self._spill_dir = tempfile.mkdtemp(prefix="compact_")
+        elif not self._own_dir:
+            os.makedirs(self._spill_dir, exist_ok=True)
+        return self._spill_dir
+
+    def _path(self, key):
+        return os.path.join(self.spill_dir, f"{key}.npz")
+
+    def __setitem__(self, key, df):
+        if key not in self._sizes:
+            self._order.append(key)
+        self._drop(key)
+        self._spilled.discard(key)
+        self._remember(key, df)
+
+    def __getitem__(self, key):
+        df = self._mem.get(key)
+        if df is not None:
+            self._mem.move_to_end(key)
+            return df
+        if key not in self._spilled:
+            raise KeyError(key)
+        path = self._path(key)
+        with np.load(path) as f:
+            df = unpack_frame(dict(f))
+        count(DISK_READ, file_size(path))
+        self.loads += 1
+        self._remember(key, df)
+        return df
+
+    def __contains__(self, key):
+        return key in self._sizes
+
+    def __iter__(self):
+        return iter(self._order)
+
+    def __len__(self):
+        return len(self._order)
+
+    def _drop(self, key):
+        if key in self._mem:
+            del self._mem[key]
+            self._bytes -= self._sizes[key]
+
+    def _remember(self, key, df):
+        size = frame_bytes(df)
+        self._mem[key] = df
+        self._sizes[key] = size
+        self._bytes += size
+        if self.memory_limit is None:
+            return
+        while self._bytes > self.memory_limit and len(self._mem) > 1:
+            old_key, old = self._mem.popitem(last=False)
+            self._bytes -= self._sizes[old_key]
+            if old_key not in self._spilled:
+                path = self._path(old_key)
+                tmp = f"{path}.{os.getpid()}.tmp"
+                with open(tmp, "wb") as f:
+                    np.savez(f, **pack_frame(old))
+                os.replace(tmp, path)
+                self._spilled.add(old_key)
+                self.spills += 1
+
+    def stats(self):
+        return {"entries": len(self), "in_memory": len(self._mem), "spilled": len(self._spilled),
+                "bytes": self._bytes, "spills": self.spills, "loads": self.loads}
+
+    def log_stats(self):
+        s = self.stats()
+        limit = f"{self.memory_limit / 1e6:.0f}MB" if self.memory_limit else "없음"
+        print(f"[COMPACT] 종목 {s['entries']}개 (메모리 {s['in_memory']}, 디스크 {s['spilled']}) | "
+              f"{s['bytes'] / 1e6:.1f}MB / 한도 {limit} | spill {s['spills']} / reload {s['loads']}")
+
+    def close(self):
+        """직접 만든 spill 폴더 삭제"""
+        if self._own_dir and self._spill_dir is not None:
+            shutil.rmtree(self._spill_dir, ignore_errors=True)
+            self._spill_dir = None
+            self._spilled.clear()
+
+
+class BoundedCache:
+    """바이트 한도 LRU (get / [] 대입만) — 넘으면 오래 안 쓴 항목을 버린다 (다시 만들 수 있는 값 전용)
+
+    sizeof(value) 로 항목 크기를 잰다. 방금 넣은 항목 하나는 한도를 넘어도 남긴다.
+    """
+
+    def __init__(self, max_bytes, sizeof=frame_bytes):
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self._items = OrderedDict()
+        self._bytes = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        item = self._items.get(key)
+        if item is None:
+            return default
+        self._items.move_to_end(key)
+        return item[0]
+
+    def __setitem__(self, key, value):
+        if key in self._items:
+            self._bytes -= self._items.pop(key)[1]
+        size = self.sizeof(value)
+        self._items[key] = (value, size)
+        self._bytes += size
+        while self._bytes > self.max_bytes and len(self._items) > 1:
+            _, (_, old_size) = self._items.popitem(last=False)
+            self._bytes -= old_size
+            self.evictions += 1
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def __len__(self):
+        return len(self._items)
+
+    @property
+    def bytes(self):
+        return self._bytes
+
+
+def split_memory(memory_limit):
+    """메모리 한도 → (CompactStore 한도, 실행 중 캐시 한도) — 한도가 없으면 (None, None)"""
+    if not memory_limit:
+        return None, None
+    working = int(memory_limit * WORKING_MEMORY_SHARE)
+    return memory_limit - working, working
+
+
+def compact_data(data, memory_limit=None, spill_dir=None):
+    """일반 모드 데이터 dict (load_backtest_data / 가상 시장) → 같은 내용의 compact 모드 dict"""
+    store_limit, working = split_memory(memory_limit)
+    stocks = CompactStore(store_limit, spill_dir)
+    for ticker, df in data["stocks"].items():
+        stocks[ticker] = compact_prices(df)
+    return {**data, "stocks": stocks, "compact": True, "working_memory": working}
+
+
+def parse_memory(value):
+    """'4G' / '512M' / '1500000000' → 바이트 (None 은 그대로)"""
+    if value is None or isinstance(value, (int, float)):
+        return value
+    value = str(value).strip().upper()
+    units = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+    if value[-1:] in units:
+        return int(float(value[:-1]) * units[value[-1]])
+    return int(value)
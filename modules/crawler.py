@@ -1,32 +1,39 @@
 import os
-import requests
+import re
+
 import pandas as pd
-from bs4 import BeautifulSoup
+from modules.data_loader import load_sector_stock_csv
+from modules.fetcher import get_http_client
 from modules.naver_upjong_map import naver_upjong_map
 from modules.sector_map import sector_code_map
 
-def get_sector_stocks(sector_code):
-    """네이버 업종 페이지에서 종목 코드 + 이름 크롤링"""
-    naver_code = naver_upjong_map.get(sector_code)
-    if not naver_code:
-        print(f"[SKIP] KRX 업종 코드 {sector_code}는 네이버 업종 번호로 매핑되지 않음")
-        return {}
+NAVER_BASE_URL = "https://finance.naver.com"
 
-    url = f"https://finance.naver.com/sise/sise_group_detail.naver?type=upjong&no={naver_code}"
-    try:
-        res = requests.get(url, headers={"User-Agent": "Mozilla/5.0"})
-        if res.status_code != 200:
-            print(f"[ERROR] 네이버 요청 실패: status {res.status_code}")
-            return {}
-    except Exception as e:
-        print(f"[ERROR] 네이버 업종 페이지 요청 실패: {e}")
-        return {}
 
-    soup = BeautifulSoup(res.text, "html.parser")
+def _parse_sector_table_lxml(html):
+    from lxml import html as lxml_html
+    doc = lxml_html.fromstring(html)
+    tables = doc.xpath('//table[contains(concat(" ", normalize-space(@class), " "), " type_5 ")]')
+    if not tables:
+        return None
+    stock_dict = {}
+    for row in tables[0].xpath(".//tr")[2:]:
+        cols = row.xpath("./td")
+        if len(cols) < 2:
+            continue
+        links = cols[0].xpath(".//a")
+        href = links[0].get("href") if links else None
+        if href and "code" in href:
+            stock_dict[href.split("code=")[-1]] = links[0].text_content().strip()
+    return stock_dict
+
+
+def _parse_sector_table_bs4(html):
+    from bs4 import BeautifulSoup  # 실제로 크롤링할 때만 로딩
+    soup = BeautifulSoup(html, "html.parser")
     table = soup.select_one("table.type_5")
     if not table:
-        print(f"[ERROR] 네이버 업종 코드 {naver_code}의 종목 테이블을 찾을 수 없습니다.")
-        return {}
+        return None
 
     stock_dict = {}
     for row in table.select("tr")[2:]:
@@ -38,11 +45,105 @@ def get_sector_stocks(sector_code):
             code = a_tag.get("href").split("code=")[-1]
             name = a_tag.text.strip()
             stock_dict[code] = name
-
     return stock_dict
 
 
-def ensure_sector_stock_csv(sector_code):
+def parse_sector_table(html):
+    """네이버 업종 상세 페이지 HTML → {종목코드: 종목명} (lxml 이 있으면 lxml, 없으면 bs4 html.parser)"""
+    try:
+        return _parse_sector_table_lxml(html)
+    except ImportError:
+        return _parse_sector_table_bs4(html)
+    except ValueError:  # 인코딩 선언이 붙은 문서 등 lxml 이 str 로 못 읽는 경우
+        return _parse_sector_table_bs4(html)
+
+
+def _page_links_lxml(html):
+    from lxml import html as lxml_html
+    doc = lxml_html.fromstring(html)
+    navs = doc.xpath('//table[contains(concat(" ", normalize-space(@class), " "), " Nnavi ")]')
+    return navs[0].xpath(".//a/@href") if navs else []
+
+
+def _page_links_bs4(html):
+    from bs4 import BeautifulSoup
+    nav = BeautifulSoup(html, "html.parser").select_one("table.Nnavi")
+    return [a.get("href") or "" for a in nav.select("a")] if nav else []
+
+
+def parse_page_count(html):
+    """종목 테이블 아래 페이지 이동 블록(table.Nnavi, 맨뒤 링크 td.pgRR 포함)의 page=N 중 가장 큰 번호 (없으면 1)
+
+    문서의 다른 링크(뉴스 목록 등)의 page= 는 보지 않는다.
+    """
+    try:
+        hrefs = _page_links_lxml(html)
+    except (ImportError, ValueError):
+        hrefs = _page_links_bs4(html)
+    pages = [int(m.group(1)) for m in (re.search(r"[?&;]page=(\d+)", h) for h in hrefs) if m]
+    return max(pages, default=1)
+
+
+def sector_url(naver_code, base_url=NAVER_BASE_URL, page=1):
+    url = f"{base_url}/sise/sise_group_detail.naver?type=upjong&no={naver_code}"
+    return url if page == 1 else f"{url}&page={page}"
+
+
+def fetch_sector_members(sector_code, http=None, base_url=NAVER_BASE_URL, validators=None):
+    """업종 구성 종목을 모든 페이지에서 받는다 → (status, {종목코드: 종목명} | None, 새 validators)
+
+    validators({"etag", "last_modified"}) 를 주면 첫 페이지를 조건부 요청으로 보내고,
+    바뀐 게 없으면 (304, None, validators) 를 돌려준다. 실패하면 status 는 None.
+    """
+    naver_code = naver_upjong_map.get(sector_code)
+    if not naver_code:
+        print(f"[SKIP] KRX 업종 코드 {sector_code}는 네이버 업종 번호로 매핑되지 않음")
+        return None, None, validators
+    http = http or get_http_client()
+    headers = {}
+    if validators and validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators and validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+
+    try:
+        url = sector_url(naver_code, base_url)
+        res = http.get(url, headers=headers) if headers else http.get(url)
+        if res.status_code == 304:
+            return 304, None, validators
+        if res.status_code != 200:
+            print(f"[ERROR] 네이버 요청 실패: status {res.status_code}")
+            return None, None, validators
+        stock_dict = parse_sector_table(res.text)
+        if stock_dict is None:
+            print(f"[ERROR] 네이버 업종 코드 {naver_code}의 종목 테이블을 찾을 수 없습니다.")
+            return None, None, validators
+        for page in range(2, parse_page_count(res.text) + 1):
+            page_res = http.get(sector_url(naver_code, base_url, page))
+            if page_res.status_code != 200:
+                print(f"[ERROR] 네이버 업종 {naver_code} {page}페이지 요청 실패: status {page_res.status_code}")
+                return None, None, validators
+            stock_dict.update(parse_sector_table(page_res.text) or {})
+    except Exception as e:
+        print(f"[ERROR] 네이버 업종 페이지 요청 실패: {e}")
+        return None, None, validators
+
+    res_headers = getattr(res, "headers", None) or {}
+    return 200, stock_dict, {"etag": res_headers.get("ETag"), "last_modified": res_headers.get("Last-Modified")}
+
+
+def get_sector_stocks(sector_code, http=None, base_url=NAVER_BASE_URL):
+    """네이버 업종 페이지(전체 페이지)에서 종목 코드 + 이름 크롤링"""
+    status, stock_dict, _ = fetch_sector_members(sector_code, http, base_url)
+    return stock_dict if status == 200 else {}
+
+
+def load_sector_members(sector_code):
+    """sector_data/ 에 저장된 업종 구성 종목 → {종목코드: 종목명}"""
+    return load_sector_stock_csv(f"sector_data/sector_{sector_code}.csv")
+
+
+def ensure_sector_stock_csv(sector_code, http=None, base_url=NAVER_BASE_URL):
     """해당 업종 코드의 종목 리스트를 sector_data/에 저장 (이미 있으면 생략)"""
     path = f"sector_data/sector_{sector_code}.csv"
 
@@ -57,7 +158,7 @@ def ensure_sector_stock_csv(sector_code):
             print(f"[WARN] {sector_code} CSV 검증 실패, 재다운로드 시도: {e}")
 
     # ✅ 실제 크롤링 진행
-    stock_dict = get_sector_stocks(sector_code)
+    stock_dict = get_sector_stocks(sector_code, http, base_url)
     if stock_dict:
         os.makedirs("sector_data", exist_ok=True)
         df = pd.DataFrame(list(stock_dict.items()), columns=["code", "name"])
@@ -0,0 +1,222 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from modules.indicator_cache import data_fingerprint
+
+DEFAULT_INDEX_PATH = "cross_index"
+TAIL_EXTRA = 4  # 증분 갱신 시 장기 MA 창 크기 + 여유분만큼 최근 종가를 보관
+
+
+def detect_crosses(close, short=5, long=60):
+    """종가 배열에서 MA 골든/데드크로스 위치를 벡터 연산으로 계산 (calculate_ma 와 같은 규칙)"""
+    close = pd.Series(np.asarray(close, dtype=float))
+    ma_s = close.rolling(short).mean().to_numpy()
+    ma_l = close.rolling(long).mean().to_numpy()
+    prev_s = np.roll(ma_s, 1)
+    prev_l = np.roll(ma_l, 1)
+    prev_s[0] = prev_l[0] = np.nan
+    with np.errstate(invalid="ignore"):
+        golden = (ma_s > ma_l) & (prev_s <= prev_l)
+        dead = (ma_s < ma_l) & (prev_s >= prev_l)
+    return golden, dead, ma_s, ma_l
+
+
+def close_fingerprint(df):
+    """인덱스가 다룬 봉의 날짜 + 종가 지문 (날짜 범위가 같아도 가격이 바뀌면 달라짐)"""
+    return data_fingerprint(df[['종가']])
+
+
+class CrossEventEntry:
+    """종목 하나의 골든/데드크로스 이벤트 (날짜 오름차순 배열)"""
+
+    __slots__ = ("first_date", "last_date", "bars", "golden_dates", "golden_ma5", "golden_ma60",
+                 "dead_dates", "tail_close", "fingerprint")
+
+    def __init__(self, first_date, last_date, bars, golden_dates, golden_ma5, golden_ma60,
+                 dead_dates, tail_close, fingerprint=None):
+        self.first_date = first_date
+        self.last_date = last_date
+        self.bars = bars
+        self.golden_dates = golden_dates
+        self.golden_ma5 = golden_ma5
+        self.golden_ma60 = golden_ma60
+        self.dead_dates = dead_dates
+        self.tail_close = tail_close
+        self.fingerprint = fingerprint
+
+    def first_golden(self, start, as_of=None):
+        """[start, as_of] 구간의 첫 골든크로스 → (날짜, ma5, ma60) 또는 None (이진 탐색)"""
+        i = np.searchsorted(self.golden_dates, np.datetime64(pd.Timestamp(start), "ns"), side="left")
+        if i >= len(self.golden_dates):
+            return None
+        date = self.golden_dates[i]
+        if as_of is not None and date > np.datetime64(pd.Timestamp(as_of), "ns"):
+            return None
+        return pd.Timestamp(date), self.golden_ma5[i], self.golden_ma60[i]
+
+    def next_dead(self, after):
+        """after 이후 첫 데드크로스 날짜 또는 None"""
+        i = np.searchsorted(self.dead_dates, np.datetime64(pd.Timestamp(after), "ns"), side="right")
+        return pd.Timestamp(self.dead_dates[i]) if i < len(self.dead_dates) else None
+
+
+class CrossEventIndex:
+    """종목별 MA5/MA60 골든·데드크로스 날짜 인덱스 ({root}/{ticker}.npz)
+
+    한 번 벡터 연산으로 만들고, 새 봉이 들어오면 보관해 둔 최근 종가에 이어
+    새 봉 구간만 계산해 이벤트를 덧붙인다.
+    """
+
+    def __init__(self, root=DEFAULT_INDEX_PATH, short=5, long=60):
+        self.root = root
+        self.short = short
+        self.long = long
+        self.tail_size = long + TAIL_EXTRA
+        self._entries = {}
+        self._synced = set()
+
+    def _path(self, ticker):
+        return os.path.join(self.root, f"{ticker}.npz")
+
+    def _save(self, ticker, entry):
+        os.makedirs(self.root, exist_ok=True)
+        path = self._path(ticker)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            np.savez(
+                f,
+                first_date=np.datetime64(entry.first_date, "ns"),
+                last_date=np.datetime64(entry.last_date, "ns"),
+                bars=entry.bars,
+                golden_dates=entry.golden_dates,
+                golden_ma5=entry.golden_ma5,
+                golden_ma60=entry.golden_ma60,
+                dead_dates=entry.dead_dates,
+                tail_close=entry.tail_close,
+                fingerprint=np.array(entry.fingerprint),
+            )
+        os.replace(tmp, path)
+
+    def get(self, ticker):
+        if ticker in self._entries:
+            return self._entries[ticker]
+        path = self._path(ticker)
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as data:
+            entry = CrossEventEntry(
+                pd.Timestamp(data["first_date"][()]), pd.Timestamp(data["last_date"][()]), int(data["bars"]),
+                data["golden_dates"], data["golden_ma5"], data["golden_ma60"],
+                data["dead_dates"], data["tail_close"],
+                str(data["fingerprint"]) if "fingerprint" in data else None,  # 예전 파일 → ensure() 가 다시 만든다
+            )
+        self._entries[ticker] = entry
+        return entry
+
+    def build(self, ticker, df):
+        """전체 봉으로 인덱스를 새로 만든다"""
+        close = df['종가'].to_numpy(dtype=float)
+        dates = df.index.values.astype("datetime64[ns]")
+        golden, dead, ma5, ma60 = detect_crosses(close, self.short, self.long)
+        entry = CrossEventEntry(
+            df.index[0], df.index[-1], len(df),
+            dates[golden], ma5[golden], ma60[golden], dates[dead],
+            close[-self.tail_size:].copy(), close_fingerprint(df),
+        )
+        self._entries[ticker] = entry
+        self._save(ticker, entry)
+        return entry
+
+    def update(self, ticker, df):
+        """df(first_date 부터의 전체 시세) 중 last_date 이후의 새 봉만 반영 (증분 갱신)
+
+        보관한 최근 종가와 df 의 겹치는 구간이 다르거나 봉 수가 맞지 않으면 새로 만든다.
+        """
+        entry = self.get(ticker)
+        if entry is None:
+            return self.build(ticker, df)
+        old = df.loc[df.index <= entry.last_date, '종가'].to_numpy(dtype=float)
+        tail = entry.tail_close[max(len(entry.tail_close) - len(old), 0):]
+        if len(old) != entry.bars or not np.array_equal(old[len(old) - len(tail):], tail, equal_nan=True):
+            return self.build(ticker, df)
+        new_df = df.loc[df.index > entry.last_date]
+        if new_df.empty:
+            return entry
+
+        new_close = new_df['종가'].to_numpy(dtype=float)
+        close = np.concatenate([entry.tail_close, new_close])
+        golden, dead, ma5, ma60 = detect_crosses(close, self.short, self.long)
+        k = len(entry.tail_close)
+        golden, dead, ma5, ma60 = golden[k:], dead[k:], ma5[k:], ma60[k:]
+        dates = new_df.index.values.astype("datetime64[ns]")
+
+        entry.golden_dates = np.concatenate([entry.golden_dates, dates[golden]])
+        entry.golden_ma5 = np.concatenate([entry.golden_ma5, ma5[golden]])
+        entry.golden_ma60 = np.concatenate([entry.golden_ma60, ma60[golden]])
+        entry.dead_dates = np.concatenate([entry.dead_dates, dates[dead]])
+        entry.last_date = new_df.index[-1]
+        entry.bars += len(new_df)
+        entry.tail_close = close[-self.tail_size:].copy()
+        entry.fingerprint = close_fingerprint(df)
+        self._save(ticker, entry)
+        return entry
+
+    def ensure(self, ticker, df):
+        """df 와 인덱스를 맞춘다 (없거나 다룬 봉의 날짜·종가가 다르면 새로 만들고, 새 봉만 있으면 증분 갱신)"""
+        if df is None or df.empty:
+            # 시세가 없으면 이번 프로세스에서는 디스크의 예전 인덱스도 쓰지 않는다
+            self._entries[ticker] = None
+            return None
+        entry = self.get(ticker)
+        if (entry is None or entry.first_date != df.index[0] or entry.bars > len(df)
+                or entry.fingerprint != close_fingerprint(df.iloc[:entry.bars])):
+            # 날짜 범위가 같아도 가격이 바뀌었으면 (정정, CSV 재생성, 다른 데이터 원천) 예전 크로스를 쓰지 않는다
+            return self.build(ticker, df)
+        if df.index[-1] > entry.last_date:
+            return self.update(ticker, df)
+        return entry
+
+    def ensure_range(self, ticker, start, end, loader, token=None):
+        """(ticker, start, end, token) 조합은 프로세스당 한 번만 loader 로 시세를 읽어 동기화한다
+
+        token 은 시세 묶음 하나를 가리키는 객체 (data_token()) — 같은 기간이라도 다른 시세 묶음이면 다시 맞춘다.
+        """
+        key = (ticker, start, end, token)
+        if key not in self._synced:
+            self.ensure(ticker, loader(ticker, start, end))
+            self._synced.add(key)
+        return self.get(ticker)
+
+    def earliest_golden(self, tickers, start, as_of=None, min_bars=0):
+        """여러 종목 중 [start, as_of] 구간에서 가장 먼저 골든크로스가 난 종목
+
+        반환값: (ticker, 날짜, ma5, ma60) 또는 None
+        """
+        best = None
+        for ticker in tickers:
+            entry = self.get(ticker)
+            if entry is None or entry.bars < min_bars:
+                continue
+            hit = entry.first_golden(start, as_of)
+            if hit and (best is None or hit[0] < best[1]):
+                best = (ticker, *hit)
+        return best
+
+
+def data_token(data):
+    """load_backtest_data() 형태의 dict 하나에 붙는 동기화 토큰 (얕은 복사본끼리는 공유)"""
+    return data.setdefault("cross_token", object())
+
+
+_indexes = {}
+
+
+def get_cross_index(short=5, long=60):
+    """MA 창 크기별 프로세스 전역 크로스 인덱스 (기본값은 cross_index/, 그 외는 하위 폴더)"""
+    key = (short, long)
+    if key not in _indexes:
+        root = DEFAULT_INDEX_PATH if key == (5, 60) else os.path.join(DEFAULT_INDEX_PATH, f"ma{short}_{long}")
+        _indexes[key] = CrossEventIndex(root, short, long)
+    return _indexes[key]
@@ -1,5 +1,7 @@
 import pandas as pd, os
-from pykrx import stock
+from modules.price_store import get_price_store
+from modules.fetcher import call_with_retry, get_rate_limiter
+from modules.instrumentation import KRX, count
 
 def load_sector_stock_csv(filepath):
     try:
@@ -10,21 +12,35 @@ def load_sector_stock_csv(filepath):
         return {}
 
     
+def _fetch_index_ohlcv(code, start, end):
+    from pykrx import stock  # 저장소에 없는 구간을 받을 때만 로딩 (import 가 무거움)
+    df = call_with_retry(stock.get_index_ohlcv_by_date, start, end, code, limiter=get_rate_limiter(), key="krx")
+    df.columns.name = None
+    count(KRX, int(df.memory_usage().sum()))
+    return df
+
+
+def _fetch_stock_ohlcv(code, start, end):
+    from pykrx import stock
+    df = call_with_retry(stock.get_market_ohlcv_by_date, start, end, code, limiter=get_rate_limiter(), key="krx")
+    df.columns.name = None
+    count(KRX, int(df.memory_usage().sum()))
+    return df
+
+
 def get_sector_index_ohlcv(code: str, start: str, end: str) -> pd.DataFrame:
+    """업종 지수 시세 (로컬 저장소 우선, 빠진 구간만 pykrx 조회)"""
     try:
-        df = stock.get_index_ohlcv_by_date(start, end, code)
-        df.columns.name = None
-        return df
+        return get_price_store().get("index", code, start, end, lambda s, e: _fetch_index_ohlcv(code, s, e))
     except Exception as e:
         print(f"[ERROR] 업종 코드 {code} 데이터 로딩 실패: {e}")
         return pd.DataFrame()
 
 
 def get_stock_ohlcv(code, start, end):
+    """종목 시세 (로컬 저장소 우선, 빠진 구간만 pykrx 조회)"""
     try:
-        df = stock.get_market_ohlcv_by_date(start, end, code)
-        df.columns.name = None
-        return df
+        return get_price_store().get("stock", code, start, end, lambda s, e: _fetch_stock_ohlcv(code, s, e))
     except Exception as e:
         print(f"[ERROR] 종목 코드 {code} 데이터 로딩 실패: {e}")
         return pd.DataFrame()
@@ -0,0 +1,476 @@
+import glob
+import os
+
+import numpy as np
+import pandas as pd
+
+from modules.compact import EXIT_COLUMNS, BoundedCache, CompactStore, compact_prices, split_memory
+from modules.cross_index import data_token, get_cross_index
+from modules.data_loader import get_stock_ohlcv, extract_sector_code_from_filename
+from modules.indicator_cache import IndicatorCache
+from modules.indicators import DEFAULT_INDICATOR_PARAMS, ensure_indicators_cached
+from modules.instrumentation import DISK_READ, count, file_size, stage
+from modules.membership import get_membership_store
+from modules.sector_map import valid_sector_codes
+from modules.signal_logic import SectorSignals, build_sector_signal_panel
+from modules.stock_filter import filter_first_golden_cross_stock
+from modules.strategy import should_exit_stock
+from modules.trading_calendar import TradingCalendar
+
+# 전략 파라미터 기본값 (지표 파라미터 + 매매 규칙)
+DEFAULT_STRATEGY_PARAMS = {
+    **DEFAULT_INDICATOR_PARAMS,
+    'rs_threshold': 1.05,   # 주도 업종 RS 하한
+    'rs_lag': 5,            # RS 상승 여부 비교 시차 (봉)
+    'rsi_exit': 80,         # RSI 과매수 청산 기준
+    'min_bars': 60,         # 업종/종목 최소 봉 수
+    'fee': 0.998,           # 매수·매도 각각 적용되는 수수료 계수
+    'initial_cash': 100_000_000,
+}
+
+INDICATOR_KEYS = tuple(DEFAULT_INDICATOR_PARAMS)
+
+
+def load_backtest_data(start_date, end_date, kospi_path="data/index_1001_코스피.csv", index_dir="data",
+                       sector_dir="sector_data", cube=None, compact=False, memory_limit=None,
+                       members_fallback=True):
+    """백테스트에 필요한 시세를 한 번에 읽어 dict 로 반환 (루프 안에서는 디스크/네트워크 접근 없음)
+
+    - kospi: 코스피 지수, sectors: {업종코드: 지수}, sector_stocks: {업종코드: {종목코드: 종목명}} (기간 중 구성 전체)
+    - sector_history: {업종코드: [(스냅샷 날짜, 구성 종목)]} — 매매일에는 그 시점 구성만 후보로 쓴다
+    - stocks: {종목코드: OHLCV} — 업종 구성 종목 전부 (로컬 저장소 → 빠진 구간만 pykrx)
+    cube(PriceCube) 를 주면 지수/종목 시세를 CSV 파싱 없이 cube 의 view 로 가져온다.
+    compact=True 면 종목 시세를 float32/정수로 줄여 CompactStore 에 담는다. memory_limit(바이트)는
+    CompactStore(넘으면 디스크로)와 실행 중 캐시(종목 커서 / 지표, working_memory)가 나눠 쓴다.
+    start_date 이전 구성 스냅샷이 없는 업종은 members_fallback=True 면 가장 오래된 스냅샷을 기간 처음부터
+    쓰고 (경고 출력, 생존 편향), False 면 첫 스냅샷 날짜 전까지는 후보 종목 없이 돌린다.
+    """
+    with stage("load_data"):
+        with stage("index_csv"):
+            if cube is not None:
+                kospi_df = cube.frame(extract_sector_code_from_filename(kospi_path), "index", start_date, end_date)
+                sectors = {code: cube.frame(code, "index", start_date, end_date)
+                           for code in cube.keys("index") if code in valid_sector_codes}
+            else:
+                kospi_df = pd.read_csv(kospi_path, index_col=0, parse_dates=True)[start_date:end_date]
+                count(DISK_READ, file_size(kospi_path))
+
+                sectors = {}
+                for path in glob.glob(f"{index_dir}/index_*.csv"):
+                    code = extract_sector_code_from_filename(path)
+                    if code in valid_sector_codes:
+                        df = pd.read_csv(path, index_col=0, parse_dates=True)
+                        count(DISK_READ, file_size(path))
+                        sectors[code] = df[start_date:end_date]
+
+        with stage("sector_members"):
+            # 시점별 스냅샷에서 기간 중 유효했던 구성만 읽는다 (스냅샷이 하나도 없는 업종만 크롤링)
+            members_store = get_membership_store(os.path.join(sector_dir, "snapshots"))
+            sector_stocks, sector_history, late = {}, {}, []
+            for code in sectors:
+                if not members_store.snapshot_dates(code) and not members_store.import_legacy(code):
+                    members_store.refresh(code)
+                history = members_store.history(code, start_date, end_date, fallback=members_fallback)
+                dates = members_store.snapshot_dates(code)
+                if dates and dates[0] > pd.Timestamp(start_date).strftime("%Y%m%d"):
+                    late.append(f"{code}({dates[0]})")
+                if history:
+                    sector_history[code] = history
+                    sector_stocks[code] = {t: name for _, members in history for t, name in members.items()}
+            if late:
+                how = "가장 오래된 스냅샷을 기간 처음부터 사용 (생존 편향)" if members_fallback else "첫 스냅샷 전까지 후보 없음"
+                print(f"[WARN] {start_date} 이전 구성 스냅샷이 없는 업종 {len(late)}개 → {how}: "
+                      f"{', '.join(sorted(late)[:10])}{' …' if len(late) > 10 else ''}")
+
+        with stage("stock_prices"):
+            store_limit, working_memory = split_memory(memory_limit) if compact else (None, None)
+            stocks = CompactStore(store_limit) if compact else {}
+            for members in sector_stocks.values():
+                for ticker in members:
+                    if ticker in stocks:
+                        continue
+                    if cube is not None and ("stock", ticker) in cube:
+                        stocks[ticker] = cube.frame(ticker, "stock", start_date, end_date)
+                    elif compact:
+                        stocks[ticker] = compact_prices(get_stock_ohlcv(ticker, start_date, end_date))
+                    else:
+                        stocks[ticker] = get_stock_ohlcv(ticker, start_date, end_date)
+
+    return {
+        "start_date": start_date,
+        "end_date": end_date,
+        "kospi": kospi_df,
+        "sectors": sectors,
+        "sector_stocks": sector_stocks,
+        "sector_history": sector_history,
+        "members_fallback": members_fallback,
+        "stocks": stocks,
+        "compact": compact,
+        "working_memory": working_memory,
+    }
+
+
+class Position:
+    """보유 포지션 (한 번에 한 종목)"""
+
+    __slots__ = ("ticker", "name", "entry_date", "entry_price", "sector_code", "rs")
+
+    def __init__(self, ticker, name, entry_date, entry_price, sector_code, rs):
+        self.ticker = ticker
+        self.name = name
+        self.entry_date = entry_date
+        self.entry_price = entry_price
+        self.sector_code = sector_code
+        self.rs = rs
+
+
+# 거래 기록 (미리 할당한 구조화 배열의 한 행)
+TRADE_DTYPE = np.dtype([
+    ("ticker", "U16"),
+    ("sector_code", "U8"),
+    ("entry_date", "M8[ns]"),
+    ("exit_date", "M8[ns]"),
+    ("entry_price", "f8"),
+    ("exit_price", "f8"),
+    ("rs", "f8"),
+    ("return", "f8"),
+])
+
+# 일별 이벤트 코드
+EVENT_NONE, EVENT_BUY, EVENT_SELL, EVENT_SWITCH = 0, 1, 2, 3
+EVENT_LABELS = {EVENT_BUY: "buy", EVENT_SELL: "sell", EVENT_SWITCH: "sell/buy"}
+
+
+class BacktestResult:
+    """Backtester.run() 결과. 일별 배열(equity/cash/events)과 거래 배열(trades)을 그대로 들고 있다"""
+
+    __slots__ = ("dates", "equity", "cash", "events", "labels", "trades", "names", "initial_cash")
+
+    def __init__(self, dates, equity, cash, events, labels, trades, names, initial_cash):
+        self.dates = dates
+        self.equity = equity
+        self.cash = cash
+        self.events = events
+        self.labels = labels
+        self.trades = trades
+        self.names = names
+        self.initial_cash = initial_cash
+
+    @property
+    def final_cash(self):
+        return float(self.cash[-1]) if len(self.cash) else float(self.initial_cash)
+
+    @property
+    def returns(self):
+        return self.trades["return"]
+
+    def trade_frame(self):
+        """거래 로그 DataFrame (main.py 의 portfolio 와 같은 컬럼)"""
+        df = pd.DataFrame(self.trades)
+        df.insert(1, "name", [self.names.get(t, t) for t in self.trades["ticker"]])
+        return df
+
+    def equity_frame(self):
+        """일별 평가자산 DataFrame (asset=시가평가, cash=실현 현금, event/label=매매 표시)"""
+        events = pd.Series(self.events).map(EVENT_LABELS)
+        return pd.DataFrame({
+            "asset": self.equity,
+            "cash": self.cash,
+            "event": events.to_numpy(),
+            "label": self.labels,
+        }, index=self.dates)
+
+
+class BacktestState:
+    """run() 이 마지막 날 장 마감 후 (기간 종료 청산 전) 남긴 상태 — 이어서 실행할 때 넘겨준다"""
+
+    __slots__ = ("dates", "equity", "cash_curve", "events", "labels", "trades", "names", "cash", "position")
+
+    def __init__(self, dates, equity, cash_curve, events, labels, trades, names, cash, position):
+        self.dates = dates
+        self.equity = equity
+        self.cash_curve = cash_curve
+        self.events = events
+        self.labels = labels
+        self.trades = trades
+        self.names = names
+        self.cash = cash
+        self.position = position
+
+
+class Backtester:
+    """일별 업종 로테이션 백테스트 엔진
+
+    load_backtest_data() 로 읽은 데이터를 받아 여러 번 run() 할 수 있다. 일별 평가자산은
+    보유 종목 종가 기준 청산가치(cash × 종가/매수가 × 수수료²)로 매일 계산한다.
+    jump_ahead=True 면 보유 중에는 미리 계산한 청산 신호일 / 업종 역전일로 바로 건너뛰고
+    그 사이 시가평가는 구간 단위로 한다 (거래 로그와 자산곡선은 하루씩 돈 것과 같음).
+    """
+
+    def __init__(self, data, params=None, verbose=True, sector_panel=None, jump_ahead=True):
+        self.data = data
+        self.jump_ahead = jump_ahead
+        self.params = {**DEFAULT_STRATEGY_PARAMS, **(params or {})}
+        self.verbose = verbose
+        p = self.params
+        self.ind_params = {k: p[k] for k in INDICATOR_KEYS}
+        self.kospi = data["kospi"]
+        # 데이터가 start_date 이전 구간까지 들고 있으면 (walk-forward 등) 지표 워밍업에만 쓰고 매매는 기간 안에서만
+        self.dates = self.kospi.loc[data["start_date"]:data["end_date"]].index
+        self.stocks = data["stocks"]
+        if sector_panel is None:
+            with stage("sector_panel"):
+                sector_panel = build_sector_signal_panel(
+                    data["sectors"], self.kospi, {**self.ind_params, 'rs_lag': p['rs_lag']})
+        self.sector_panel = sector_panel
+        # 루프는 날짜 대신 달력 위치 t 로 돈다 (업종 신호는 달력에 맞춘 배열, 종목은 커서)
+        self.calendar = TradingCalendar(self.dates)
+        self.sector_signals = SectorSignals(sector_panel, self.dates)
+        self.cross_index = get_cross_index(p['ma_short'], p['ma_long'])
+        self._cross_token = data_token(data)
+        # 메모리 한도 모드에서는 실행 중 캐시도 한도 안에서 LRU 로 버린다 (커서는 종가 배열만 보관)
+        working = data.get("working_memory")
+        self._indicators = BoundedCache(working // 2) if working else {}
+        # 전역 지표 캐시의 한도는 건드리지 않고, 이 실행만 같은 몫 안의 자체 메모리 캐시를 쓴다 (디스크 캐시는 공유)
+        self._indicator_cache = IndicatorCache(max_bytes=working // 2) if working else None
+        self._cursors = BoundedCache(working // 2, lambda cur: cur.nbytes) if working else {}
+        self._cursor_columns = ('종가',) if working else None
+        self._empty = pd.DataFrame()
+        self._code_pos = {code: j for j, code in enumerate(self.sector_signals.codes)}
+        self._leaders = None
+        self._exit_days = {}
+        self._watch = None
+        self._member_history = {code: (pd.DatetimeIndex([d for d, _ in h]), [m for _, m in h])
+                                for code, h in data.get("sector_history", {}).items() if h}
+        self.state = None
+
+    def indicators(self, ticker):
+        """종목 지표 (실행 중에는 인스턴스에 보관해 날짜마다 캐시 조회도 하지 않음)"""
+        df = self._indicators.get(ticker)
+        if df is None:
+            with stage("indicators"):
+                df = ensure_indicators_cached(ticker, self.stocks[ticker], self.kospi, params=self.ind_params,
+                                              columns=EXIT_COLUMNS if self.data.get("compact") else None,
+                                              cache=self._indicator_cache)
+            self._indicators[ticker] = df
+        return df
+
+    def preload_indicators(self, ticker, df):
+        """이미 계산해 둔 종목 지표 (체크포인트에서 이어 붙인 것 등) 를 넣어 indicators() 가 다시 계산하지 않게 한다"""
+        self._indicators[ticker] = df
+
+    def members(self, code, date):
+        """date 시점의 업종 구성 종목 (sector_history 가 없으면 sector_stocks)"""
+        history = self._member_history.get(code)
+        if history is None:
+            return self.data["sector_stocks"].get(code)
+        dates, snapshots = history
+        k = int(dates.searchsorted(date, side="right")) - 1
+        if k < 0:
+            return snapshots[0] if self.data.get("members_fallback", True) else {}
+        return snapshots[k]
+
+    def cursor(self, ticker):
+        """종목 시세의 as-of 커서 (달력 위치 → 봉 수를 종목당 한 번만 계산)"""
+        cur = self._cursors.get(ticker)
+        if cur is None:
+            cur = self._cursors[ticker] = self.calendar.cursor(self.stocks[ticker], self._cursor_columns)
+        return cur
+
+    def exit_triggers(self, ticker):
+        """달력 위치별로 보유 시 should_exit_stock 이 True 가 되는 날 (데드크로스 또는 RSI 과매수) — 종목당 한 번 계산"""
+        trig = self._exit_days.get(ticker)
+        if trig is None:
+            df = self.indicators(ticker)
+            k = self.cursor(ticker).counts
+            if len(df) < 2:
+                trig = np.zeros(len(k), dtype=bool)
+            else:
+                ma_s, ma_l, rsi = (df[c].to_numpy(dtype=float) for c in ('MA5', 'MA60', 'RSI'))
+                bar = np.zeros(len(df), dtype=bool)
+                with np.errstate(invalid='ignore'):
+                    bar[1:] = ((ma_s[1:] < ma_l[1:]) & (ma_s[:-1] >= ma_l[:-1])) | (rsi[1:] > self.params['rsi_exit'])
+                trig = (k >= 2) & bar[np.maximum(k - 1, 0)]
+            self._exit_days[ticker] = trig
+        return trig
+
+    def _next_decision(self, t, position):
+        """t 이후 보유 중 매매가 일어날 수 있는 첫 날 (청산 신호 또는 다른 업종이 더 높은 RS 로 1위) — 없으면 n
+
+        그 사이의 날은 _decide 가 항상 None 이므로 건너뛰어도 거래 로그가 같다.
+        """
+        if self._watch is None or self._watch[0] is not position:
+            if self._leaders is None:
+                self._leaders = self.sector_signals.leaders(self.params['min_bars'], self.params['rs_threshold'])
+            best, best_rs = self._leaders
+            with np.errstate(invalid='ignore'):
+                switch = (best >= 0) & (best != self._code_pos.get(position.sector_code, -1)) & (best_rs > position.rs)
+            self._watch = (position, np.flatnonzero(switch | self.exit_triggers(position.ticker)))
+        days = self._watch[1]
+        j = days.searchsorted(t)
+        return int(days[j]) if j < len(days) else len(self.dates)
+
+    def run(self, state=None):
+        """백테스트 실행. state(BacktestState) 를 주면 그 마지막 날 다음 거래일부터만 돌고 앞부분은 이어 붙인다
+
+        실행 후 self.state 에 다음 실행용 상태가 남는다 (모든 판단이 과거 봉만 보므로 결과는 전체 재실행과 같음).
+        """
+        with stage("backtest"):
+            return self._run(state)
+
+    def _run(self, state=None):
+        p = self.params
+        fee = p['fee']
+        n = len(self.dates)
+        start_date, end_date = self.data["start_date"], self.data["end_date"]
+
+        equity = np.empty(n)
+        cash_curve = np.empty(n)
+        events = np.zeros(n, dtype=np.int8)
+        labels = np.full(n, "", dtype=object)
+        trades = np.empty(n + 1, dtype=TRADE_DTYPE)  # 하루 최대 1건 청산 + 기간 종료 청산
+        names = {}
+        n_trades = 0
+
+        cash = float(p['initial_cash'])
+        position = None
+        first = 0
+        if state is not None:
+            first = len(state.dates)
+            if first > n or not self.dates[:first].equals(state.dates):
+                raise ValueError("이전 상태의 거래일이 현재 데이터와 맞지 않음")
+            equity[:first] = state.equity
+            cash_curve[:first] = state.cash_curve
+            events[:first] = state.events
+            labels[:first] = state.labels
+            n_trades = len(state.trades)
+            trades[:n_trades] = state.trades
+            names = dict(state.names)
+            cash, position = state.cash, state.position
+
+        def close_position(exit_date, exit_price):
+            nonlocal cash, n_trades
+            exit_price = float(exit_price)  # compact 모드의 float32 가격도 float64 로 계산
+            ret = (exit_price / position.entry_price) * fee * fee
+            trades[n_trades] = (position.ticker, position.sector_code, position.entry_date, exit_date,
+                                position.entry_price, exit_price, position.rs, ret - 1)
+            n_trades += 1
+            cash *= ret
+
+        i = first
+        while i < n:
+            if position is not None and self.jump_ahead:
+                nxt = self._next_decision(i, position)
+                if nxt > i:
+                    # 다음 판단일 전까지는 매매가 없으므로 시가평가만 구간 단위로
+                    cur = self.cursor(position.ticker)
+                    k = cur.counts[i:nxt]
+                    closes = np.asarray(cur.column('종가'), dtype=float)
+                    last_close = np.where(k > 0, closes[np.maximum(k - 1, 0)], position.entry_price) \
+                        if len(closes) else np.full(nxt - i, position.entry_price)
+                    equity[i:nxt] = cash * ((last_close / position.entry_price) * fee * fee)
+                    cash_curve[i:nxt] = cash
+                    i = nxt
+                    continue
+
+            current_date = self.dates[i]
+            event, label = EVENT_NONE, ""
+            decision = self._decide(i, current_date, position)
+            if decision is not None:
+                action, candidate, df_pos = decision
+                if action == EVENT_BUY:
+                    position = candidate
+                    names[position.ticker] = position.name
+                    event, label = EVENT_BUY, position.name
+                else:
+                    close_position(current_date, df_pos['종가'].iloc[-1])
+                    event, label = action, position.name
+                    position = None
+                    if action == EVENT_SWITCH:
+                        position = candidate
+                        names[position.ticker] = position.name
+                        label = f"{label} → {position.name}"
+
+            # 일별 시가평가
+            if position is not None:
+                last_close = float(self.cursor(position.ticker).last('종가', i, position.entry_price))
+                equity[i] = cash * ((last_close / position.entry_price) * fee * fee)
+            else:
+                equity[i] = cash
+            cash_curve[i] = cash
+            events[i] = event
+            labels[i] = label
+            i += 1
+
+        self.state = BacktestState(self.dates, equity.copy(), cash_curve.copy(), events.copy(), labels.copy(),
+                                   trades[:n_trades].copy(), dict(names), cash, position)
+
+        # 기간 종료 시 보유 종목은 마지막 종가로 청산
+        if position is not None:
+            df_pos = self.stocks[position.ticker].loc[:end_date]
+            if not df_pos.empty:
+                close_position(df_pos.index[-1], df_pos['종가'].iloc[-1])
+                if n:
+                    equity[-1] = cash_curve[-1] = cash
+                    events[-1] = EVENT_SELL if events[-1] == EVENT_NONE else events[-1]
+                    labels[-1] = labels[-1] or position.name
+
+        return BacktestResult(self.dates, equity, cash_curve, events, labels, trades[:n_trades].copy(),
+                              names, p['initial_cash'])
+
+    def _decide(self, t, current_date, position):
+        """하루치(달력 위치 t) 매매 판단 → None 또는 (EVENT_BUY|EVENT_SELL|EVENT_SWITCH, 새 포지션, 보유 종목 지표)"""
+        p = self.params
+        count("days")
+        with stage("rank_sectors"):
+            leading_sectors = self.sector_signals.leading(t, p['min_bars'], p['rs_threshold'])
+        if not leading_sectors:
+            return None
+
+        best_code, sector_name, rs = leading_sectors[0]
+        stock_dict = self.members(best_code, current_date)
+        if not stock_dict:
+            return None
+
+        with stage("select_candidate"):
+            candidates = filter_first_golden_cross_stock(
+                stock_dict, self.data["start_date"], self.data["end_date"], self.kospi, as_of=current_date,
+                index=self.cross_index, loader=lambda t, s, e: self.stocks.get(t, self._empty), verbose=self.verbose,
+                token=self._cross_token,
+            )
+        if not candidates:
+            return None
+
+        ticker, name, cross_date, *_ = candidates[0]
+        if cross_date > current_date:
+            return None
+        if self.verbose:
+            print(f"[SELECT @ {current_date.date()}] ✅ 골든크로스 가장 빠른 종목: {ticker} | {name} | 날짜: {cross_date.date()}")
+
+        if self.stocks.get(ticker) is None or self.stocks[ticker].empty:
+            return None
+        cur = self.cursor(ticker)
+        if cur.bars(t) < p['min_bars']:
+            return None
+        candidate = Position(ticker, name, current_date, float(cur.last('종가', t)), best_code, rs)
+
+        if position is None:
+            return EVENT_BUY, candidate, None
+
+        k = self.cursor(position.ticker).bars(t)
+        if k < 2:
+            return None
+        df_pos = self.indicators(position.ticker).iloc[k - 2:k]  # should_exit_stock 은 마지막 두 봉만 본다
+
+        with stage("exit_check"):
+            should_exit = should_exit_stock(df_pos, p['rsi_exit'], verbose=self.verbose)
+        if should_exit:
+            return EVENT_SELL, None, df_pos
+        if best_code != position.sector_code and rs > position.rs:
+            return EVENT_SWITCH, candidate, df_pos
+        return None
+
+
+def run_backtest(data, params=None, verbose=True, sector_panel=None, state=None):
+    """Backtester 한 번 실행 (편의 함수)"""
+    return Backtester(data, params, verbose, sector_panel).run(state)
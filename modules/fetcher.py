@@ -0,0 +1,222 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse
+
+from modules.instrumentation import KRX, NET, count
+from modules.price_store import get_price_store
+
+DEFAULT_TIMEOUT = 10          # HTTP 요청 타임아웃 (초)
+DEFAULT_RETRIES = 3           # 실패 시 재시도 횟수
+DEFAULT_BACKOFF = 0.5         # 재시도 대기 시간 (0.5, 1, 2 … 초)
+DEFAULT_RATE = {              # 호스트별 초당 요청 수
+    "finance.naver.com": 5.0,
+    "krx": 2.0,               # pykrx (KRX 정보데이터시스템) 호출
+}
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class RateLimiter:
+    """호스트(키)별 속도 제한기 — 키마다 다음 요청 가능 시각을 예약한다 (스레드 안전)"""
+
+    def __init__(self, rates=None, default_rate=5.0):
+        self.rates = {**DEFAULT_RATE, **(rates or {})}
+        self.default_rate = default_rate
+        self._lock = threading.Lock()
+        self._next = {}
+
+    def acquire(self, key):
+        rate = self.rates.get(key, self.default_rate)
+        if not rate:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next.get(key, now))
+            self._next[key] = slot + 1.0 / rate
+        wait = slot - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+
+
+def call_with_retry(fn, *args, retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF, limiter=None, key=None, **kwargs):
+    """fn 호출을 재시도 + 지수 백오프로 감싼다 (limiter 가 있으면 호출마다 속도 제한)"""
+    for attempt in range(retries + 1):
+        if limiter is not None:
+            limiter.acquire(key)
+        try:
+            return fn(*args, **kwargs)
+        except Exception as e:
+            if attempt == retries:
+                raise
+            wait = backoff * (2 ** attempt)
+            print(f"[RETRY] {key or getattr(fn, '__name__', 'call')} 실패 ({e}) → {wait:.1f}s 후 재시도 {attempt + 1}/{retries}")
+            time.sleep(wait)
+
+
+class HttpClient:
+    """연결 재사용 세션 + 타임아웃 + 재시도 + 호스트별 속도 제한"""
+
+    def __init__(self, limiter=None, timeout=DEFAULT_TIMEOUT, retries=DEFAULT_RETRIES,
+                 backoff=DEFAULT_BACKOFF, pool_size=16, headers=None):
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.limiter = limiter or RateLimiter()
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.session = requests.Session()
+        self.session.headers.update(headers or {"User-Agent": "Mozilla/5.0"})
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _get_once(self, url, **kwargs):
+        res = self.session.get(url, timeout=kwargs.pop("timeout", self.timeout), **kwargs)
+        count(NET, len(res.content))
+        if res.status_code in RETRY_STATUS:
+            raise RuntimeError(f"status {res.status_code}")
+        return res
+
+    def get(self, url, **kwargs):
+        host = urlparse(url).netloc
+        return call_with_retry(self._get_once, url, retries=self.retries, backoff=self.backoff,
+                               limiter=self.limiter, key=host, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+
+_default_client = None
+_default_limiter = None
+_client_lock = threading.Lock()
+
+
+def get_rate_limiter():
+    """프로세스 전역 속도 제한기 (HTTP, pykrx 공용)"""
+    global _default_limiter
+    with _client_lock:
+        if _default_limiter is None:
+            _default_limiter = RateLimiter()
+        return _default_limiter
+
+
+def get_http_client():
+    """프로세스 전역 HTTP 클라이언트 (커넥션 풀 공유)"""
+    global _default_client
+    limiter = get_rate_limiter()
+    with _client_lock:
+        if _default_client is None:
+            _default_client = HttpClient(limiter)
+        return _default_client
+
+
+class Fetcher:
+    """업종 구성 종목 + 지수/종목 시세를 스레드 풀로 병렬 수집
+
+    krx 는 pykrx.stock 과 같은 인터페이스(get_market_ohlcv_by_date, get_index_ohlcv_by_date)를
+    가진 객체, http 는 HttpClient, base_url 은 네이버 주소 — 모두 테스트용으로 바꿔 끼울 수 있다.
+    시세는 PriceStore 를 거치므로 이미 받은 구간은 다시 받지 않는다.
+    """
+
+    def __init__(self, max_workers=8, krx=None, http=None, store=None, limiter=None, base_url=None,
+                 retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF):
+        self.max_workers = max_workers
+        self.limiter = limiter or (http.limiter if http is not None else get_rate_limiter())
+        self.http = http
+        self.store = store or get_price_store()
+        self.base_url = base_url
+        self.retries = retries
+        self.backoff = backoff
+        self._krx = krx
+
+    @property
+    def krx(self):
+        if self._krx is None:
+            from pykrx import stock
+            self._krx = stock
+        return self._krx
+
+    def _krx_call(self, fn, *args):
+        df = call_with_retry(fn, *args, retries=self.retries, backoff=self.backoff,
+                             limiter=self.limiter, key="krx")
+        if df is not None:
+            df.columns.name = None
+            count(KRX, int(df.memory_usage().sum()))
+        return df
+
+    def stock_ohlcv(self, code, start, end):
+        return self.store.get("stock", code, start, end,
+                              lambda s, e: self._krx_call(self.krx.get_market_ohlcv_by_date, s, e, code))
+
+    def index_ohlcv(self, code, start, end):
+        return self.store.get("index", code, start, end,
+                              lambda s, e: self._krx_call(self.krx.get_index_ohlcv_by_date, s, e, code))
+
+    def sector_stocks(self, sector_code):
+        """업종 구성 종목 스냅샷 갱신 (TTL 안이면 요청 없음, 지나면 조건부 요청) → 최신 구성"""
+        from modules.membership import get_membership_store
+        store = get_membership_store()
+        outcome = store.refresh(sector_code, self.http or get_http_client(), self.base_url)
+        members = store.latest(sector_code)
+        if outcome == "failed" and not members:
+            raise RuntimeError("업종 구성 종목 크롤링 실패")
+        return members
+
+    def index_ohlcv_csv(self, code, start, end, index_dir="data"):
+        """지수 시세를 저장소에 받고 main.py 가 읽는 data/index_{code}_{이름}.csv 로도 내보낸다"""
+        from modules.sector_map import sector_code_map
+        df = self.index_ohlcv(code, start, end)
+        if df is None or df.empty:
+            raise RuntimeError("지수 시세 없음")
+        os.makedirs(index_dir, exist_ok=True)
+        df.to_csv(os.path.join(index_dir, f"index_{code}_{sector_code_map.get(code, code)}.csv"))
+        return df
+
+    def _run_all(self, label, jobs):
+        """jobs: [(이름, 함수, 인자…)] → {이름: 결과}, 실패한 이름 목록"""
+        results, failed = {}, []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {pool.submit(fn, *args): name for name, fn, *args in jobs}
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    results[name] = future.result()
+                except Exception as e:
+                    print(f"[ERROR] {label} {name} 수집 실패: {e}")
+                    failed.append(name)
+        print(f"[PREFETCH] {label} {len(results)}/{len(jobs)} 완료")
+        return results, failed
+
+    def prefetch(self, start, end, sector_codes=None, include_stocks=True, kospi_code="1001"):
+        """start..end 백테스트에 필요한 데이터를 한꺼번에 받아둔다
+
+        1) naver_upjong_map 의 모든 업종 구성 종목 (sector_data/snapshots/)
+        2) 코스피 + 업종 지수 시세 (저장소 + data/index_*.csv)  3) 구성 종목 시세 (저장소)
+        반환값: 단계별 성공/실패 개수 요약 dict
+        """
+        from modules.naver_upjong_map import naver_upjong_map
+        sector_codes = list(sector_codes or naver_upjong_map)
+        started = time.perf_counter()
+
+        members, failed_sectors = self._run_all(
+            "업종 구성", [(code, self.sector_stocks, code) for code in sector_codes])
+        _, failed_index = self._run_all(
+            "지수 시세", [(code, self.index_ohlcv_csv, code, start, end) for code in [kospi_code, *sector_codes]])
+
+        tickers = sorted({t for stocks in members.values() for t in stocks})
+        failed_stocks = []
+        if include_stocks:
+            _, failed_stocks = self._run_all(
+                "종목 시세", [(t, self.stock_ohlcv, t, start, end) for t in tickers])
+
+        summary = {
+            "sectors": len(members), "sector_failures": failed_sectors,
+            "indexes": len(sector_codes) + 1 - len(failed_index), "index_failures": failed_index,
+            "stocks": len(tickers) - len(failed_stocks) if include_stocks else 0, "stock_failures": failed_stocks,
+            "elapsed": time.perf_counter() - started,
+        }
+        print(f"[PREFETCH] 업종 {summary['sectors']} / 지수 {summary['indexes']} / 종목 {summary['stocks']} "
+              f"({summary['elapsed']:.1f}s)")
+        return summary
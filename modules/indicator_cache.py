@@ -0,0 +1,132 @@
+import glob
+import hashlib
+import json
+import os
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from modules.instrumentation import DISK_READ, count, file_size
+
+CACHE_VERSION = 1  # 지표 계산 로직이 바뀌면 올려서 기존 캐시를 무효화
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+PRICE_COLUMNS = ['시가', '고가', '저가', '종가', '거래량']
+
+
+def params_hash(params):
+    """지표 파라미터 dict → 짧은 해시 (캐시 버전 포함)"""
+    payload = json.dumps({"version": CACHE_VERSION, **params}, sort_keys=True, default=str)
+    return hashlib.blake2b(payload.encode(), digest_size=8).hexdigest()
+
+
+def data_fingerprint(*frames):
+    """시세 DataFrame 들의 날짜 + OHLCV 값으로 만든 지문 (데이터가 바뀌면 달라짐)"""
+    h = hashlib.blake2b(digest_size=8)
+    for df in frames:
+        if df is None:
+            continue
+        h.update(np.ascontiguousarray(df.index.values.astype("datetime64[ns]").view("i8")).tobytes())
+        for col in PRICE_COLUMNS:
+            if col in df:
+                h.update(col.encode())
+                h.update(np.ascontiguousarray(df[col].to_numpy(dtype=float)).tobytes())
+    return h.hexdigest()
+
+
+class IndicatorCache:
+    """지표 DataFrame 캐시 (메모리 LRU + 디스크 pickle)
+
+    키: (ticker, 파라미터 해시, 원천 데이터 지문). 가격이나 파라미터가 바뀌면
+    키가 달라지므로 예전 결과가 재사용되지 않고, 디스크의 예전 파일은 지운다.
+    반환되는 DataFrame 은 캐시와 공유되므로 제자리 수정하지 않는다.
+    """
+
+    def __init__(self, path='indicators', max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lru = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _file_path(self, ticker, p_hash, fingerprint):
+        return os.path.join(self.path, str(ticker), f"{p_hash}_{fingerprint}.pkl")
+
+    def _remember(self, key, df):
+        size = int(df.memory_usage(index=True).sum())
+        if key in self._lru:
+            self._bytes -= self._lru.pop(key)[1]
+        self._lru[key] = (df, size)
+        self._bytes += size
+        while self._bytes > self.max_bytes and len(self._lru) > 1:
+            _, (_, old_size) = self._lru.popitem(last=False)
+            self._bytes -= old_size
+            self.evictions += 1
+
+    def get_or_compute(self, ticker, df, kospi_df, params, compute):
+        p_hash = params_hash(params)
+        key = (str(ticker), p_hash, data_fingerprint(df, kospi_df))
+
+        if key in self._lru:
+            self._lru.move_to_end(key)
+            self.hits += 1
+            return self._lru[key][0]
+
+        file_path = self._file_path(*key)
+        if os.path.exists(file_path):
+            df_ind = pd.read_pickle(file_path)
+            self.disk_hits += 1
+            count(DISK_READ, file_size(file_path))
+        else:
+            self.misses += 1
+            df_ind = compute(df, kospi_df, params)
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            # 같은 종목·파라미터의 예전 데이터 기준 캐시는 무효화
+            for stale in glob.glob(self._file_path(ticker, p_hash, "*")):
+                try:
+                    os.remove(stale)
+                except FileNotFoundError:
+                    pass  # 다른 프로세스가 먼저 지운 경우
+            tmp = f"{file_path}.{os.getpid()}.tmp"
+            df_ind.to_pickle(tmp)
+            os.replace(tmp, file_path)
+
+        self._remember(key, df_ind)
+        return df_ind
+
+    def clear_memory(self):
+        self._lru.clear()
+        self._bytes = 0
+
+    def stats(self):
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+            "entries": len(self._lru),
+            "bytes": self._bytes,
+        }
+
+    def log_stats(self):
+        s = self.stats()
+        print(f"[CACHE] 지표 캐시 hit {s['hits']} / disk {s['disk_hits']} / miss {s['misses']} / "
+              f"evict {s['evictions']} (적중률 {s['hit_rate']:.1%}, {s['bytes'] / 1e6:.1f}MB)")
+
+
+_caches = {}
+
+
+def get_indicator_cache(path='indicators', max_bytes=None):
+    """경로별 프로세스 전역 캐시. max_bytes 를 주면 메모리 한도를 바꾼다"""
+    cache = _caches.get(path)
+    if cache is None:
+        cache = _caches[path] = IndicatorCache(path, max_bytes or DEFAULT_MAX_BYTES)
+    elif max_bytes is not None:
+        cache.max_bytes = max_bytes
+    return cache
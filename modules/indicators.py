@@ -1,43 +1,82 @@
+import numpy as np
 import pandas as pd
-import os
+from modules.compact import compact_indicators, widen_prices
+from modules.indicator_cache import get_indicator_cache
 
-def calculate_ma(df):
+# 지표 파라미터 기본값 (캐시 키에 포함됨)
+DEFAULT_INDICATOR_PARAMS = {
+    'st_period': 10,
+    'st_multiplier': 3,
+    'ma_short': 5,
+    'ma_long': 60,
+    'rsi_period': 14,
+    'rs_window': 20,
+}
+
+def calculate_ma(df, short=5, long=60):
+    """MA 컬럼 이름은 창 크기와 무관하게 MA5 / MA60 으로 유지"""
     df = df.copy()
-    df.loc[:, 'MA5'] = df['종가'].rolling(5).mean()
-    df.loc[:, 'MA60'] = df['종가'].rolling(60).mean()
+    df.loc[:, 'MA5'] = df['종가'].rolling(short).mean()
+    df.loc[:, 'MA60'] = df['종가'].rolling(long).mean()
     df.loc[:, 'GoldenCross'] = (df['MA5'] > df['MA60']) & (df['MA5'].shift(1) <= df['MA60'].shift(1))
     df.loc[:, 'DeadCross'] = (df['MA5'] < df['MA60']) & (df['MA5'].shift(1) >= df['MA60'].shift(1))
     return df
 
-def calculate_supertrend(df, period=10, multiplier=3):
-    df = df.copy()
-    hl2 = (df['고가'] + df['저가']) / 2
-    tr = pd.concat([
-        df['고가'] - df['저가'],
-        abs(df['고가'] - df['종가'].shift()),
-        abs(df['저가'] - df['종가'].shift())
-    ], axis=1).max(axis=1)
-    atr = tr.rolling(period).mean()
+def supertrend_kernel(high, low, close, period=10, multiplier=3):
+    """여러 종목의 Supertrend 를 한 번에 계산 (bars × instruments 2차원 배열).
+
+    calculate_supertrend 의 밴드 래칫 규칙을 그대로 따르며, 봉(행) 단위로만
+    루프를 돌고 종목(열) 방향은 NumPy 로 벡터화한다.
+    반환값: (supertrend bool 배열, upperband, lowerband) — 모두 입력과 같은 shape
+    """
+    high = np.asarray(high, dtype=float)
+    low = np.asarray(low, dtype=float)
+    close = np.asarray(close, dtype=float)
+    squeeze = high.ndim == 1
+    if squeeze:
+        high, low, close = high[:, None], low[:, None], close[:, None]
+
+    n = close.shape[0]
+    prev_close = np.empty_like(close)
+    prev_close[0] = np.nan
+    prev_close[1:] = close[:-1]
+    # pandas max(axis=1) 와 동일하게 NaN 은 건너뛴다 (첫 봉은 고가-저가)
+    with np.errstate(invalid='ignore'):
+        tr = np.fmax(np.fmax(high - low, np.abs(high - prev_close)), np.abs(low - prev_close))
+    # ATR 은 pandas rolling 과 비트 단위로 같게 하기 위해 pandas 로 계산
+    atr = pd.DataFrame(tr).rolling(period).mean().to_numpy()
+
+    hl2 = (high + low) / 2
     upperband = hl2 + multiplier * atr
     lowerband = hl2 - multiplier * atr
-    supertrend = [True] * len(df)
-    for i in range(1, len(df)):
-        if df['종가'].iloc[i] > upperband.iloc[i - 1]:
-            supertrend[i] = True
-        elif df['종가'].iloc[i] < lowerband.iloc[i - 1]:
-            supertrend[i] = False
-        else:
-            supertrend[i] = supertrend[i - 1]
-            if supertrend[i] and lowerband.iloc[i] < lowerband.iloc[i - 1]:
-                lowerband.iloc[i] = lowerband.iloc[i - 1]
-            if not supertrend[i] and upperband.iloc[i] > upperband.iloc[i - 1]:
-                upperband.iloc[i] = upperband.iloc[i - 1]
+    supertrend = np.ones(close.shape, dtype=bool)
+
+    for i in range(1, n):
+        up_break = close[i] > upperband[i - 1]
+        down_break = ~up_break & (close[i] < lowerband[i - 1])
+        keep = ~(up_break | down_break)
+
+        st = np.where(keep, supertrend[i - 1], up_break)
+        supertrend[i] = st
+
+        ratchet_low = keep & st & (lowerband[i] < lowerband[i - 1])
+        lowerband[i] = np.where(ratchet_low, lowerband[i - 1], lowerband[i])
+        ratchet_up = keep & ~st & (upperband[i] > upperband[i - 1])
+        upperband[i] = np.where(ratchet_up, upperband[i - 1], upperband[i])
+
+    if squeeze:
+        return supertrend[:, 0], upperband[:, 0], lowerband[:, 0]
+    return supertrend, upperband, lowerband
+
+def calculate_supertrend(df, period=10, multiplier=3):
+    df = df.copy()
+    supertrend, _, _ = supertrend_kernel(df['고가'], df['저가'], df['종가'], period, multiplier)
     df.loc[:, 'Supertrend'] = supertrend
     return df
 
-def calculate_rs(sector_df, kospi_df):
+def calculate_rs(sector_df, kospi_df, window=20):
     rs_raw = sector_df['종가'] / kospi_df['종가']
-    rs_index = rs_raw / rs_raw.rolling(20).mean()
+    rs_index = rs_raw / rs_raw.rolling(window).mean()
     return rs_index
 
 def calculate_rsi(close, period=14):
@@ -50,19 +89,27 @@ def calculate_rsi(close, period=14):
     rsi = 100 - (100 / (1 + rs))
     return rsi
 
-def calculate_indicators(df, kospi_df):
+def calculate_indicators(df, kospi_df, params=None):
+    p = {**DEFAULT_INDICATOR_PARAMS, **(params or {})}
     df = df.copy()
-    df = calculate_supertrend(df)
-    df = calculate_ma(df)
-    df.loc[:, 'RSI'] = calculate_rsi(df['종가'])
-    df.loc[:, 'RS'] = calculate_rs(df, kospi_df)
+    df = calculate_supertrend(df, p['st_period'], p['st_multiplier'])
+    df = calculate_ma(df, p['ma_short'], p['ma_long'])
+    df.loc[:, 'RSI'] = calculate_rsi(df['종가'], p['rsi_period'])
+    df.loc[:, 'RS'] = calculate_rs(df, kospi_df, p['rs_window'])
     return df
 
-def ensure_indicators_cached(ticker, df, kospi_df, path='indicators'):
-    os.makedirs(path, exist_ok=True)
-    file_path = os.path.join(path, f"{ticker}.csv")
-    if os.path.exists(file_path):
-        return pd.read_csv(file_path, index_col=0, parse_dates=True)
-    df_ind = calculate_indicators(df, kospi_df)
-    df_ind.to_csv(file_path)
-    return df_ind
+def ensure_indicators_cached(ticker, df, kospi_df, path='indicators', params=None, columns=None, cache=None):
+    """지표 캐시 조회 (종목 + 파라미터 + 시세 지문 기준, 메모리 LRU → 디스크 → 계산)
+
+    columns 를 주면 compact 모드: float64 로 계산한 뒤 그 컬럼만 작은 dtype 으로 남긴다 (캐시 키도 따로).
+    cache 를 주면 경로별 전역 캐시 대신 그 IndicatorCache 를 쓴다 (실행마다 메모리 한도가 다를 때).
+    """
+    p = {**DEFAULT_INDICATOR_PARAMS, **(params or {})}
+    cache = cache or get_indicator_cache(path)
+    if columns is None:
+        return cache.get_or_compute(ticker, df, kospi_df, p, calculate_indicators)
+
+    def compute(df, kospi_df, params):
+        return compact_indicators(calculate_indicators(widen_prices(df), kospi_df, p), columns)
+
+    return cache.get_or_compute(ticker, df, kospi_df, {**p, 'columns': list(columns)}, compute)
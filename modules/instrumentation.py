@@ -0,0 +1,204 @@
+import contextlib
+import csv
+import json
+import os
+import platform
+import threading
+import time
+import tracemalloc
+
+# 단계별 바이트 카운터 이름
+DISK_READ = "disk_read_bytes"
+NET = "net_bytes"
+KRX = "krx_bytes"  # pykrx 응답 (DataFrame 크기 기준)
+
+
+class StageStats:
+    """단계 하나의 누적 통계"""
+
+    __slots__ = ("path", "calls", "total", "max", "peak_mem", "counters")
+
+    def __init__(self, path):
+        self.path = path
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.peak_mem = 0
+        self.counters = {}
+
+    def as_dict(self):
+        return {
+            "stage": self.path,
+            "calls": self.calls,
+            "total_s": round(self.total, 6),
+            "mean_ms": round(self.total / self.calls * 1000, 4) if self.calls else 0.0,
+            "max_ms": round(self.max * 1000, 4),
+            "peak_mem_bytes": self.peak_mem,
+            **self.counters,
+        }
+
+
+class _Frame:
+    __slots__ = ("stats", "started", "carried_peak")
+
+    def __init__(self, stats, started):
+        self.stats = stats
+        self.started = started
+        self.carried_peak = 0
+
+
+class Instrumentation:
+    """백테스트 단계별 시간 / 호출 수 / 캐시 적중률 / 디스크·네트워크 바이트 / 최대 메모리 측정
+
+    stage("이름") 을 중첩하면 "상위/하위" 경로로 집계된다. track_memory 를 켜면 tracemalloc 으로
+    단계별 최대 메모리를 재고 (느려짐), profile 을 켜면 cProfile 결과를 pstats 파일로 남길 수 있다.
+    """
+
+    def __init__(self, track_memory=False, profile=False):
+        self.track_memory = track_memory
+        self.stages = {}
+        self.counters = {}
+        self._stack = []
+        self._lock = threading.Lock()  # fetcher / updater 작업 스레드도 count() 를 부른다
+        self._started = time.perf_counter()
+        self._profiler = None
+        if track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if profile:
+            import cProfile
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        path = f"{self._stack[-1].stats.path}/{name}" if self._stack else name
+        stats = self.stages.get(path)
+        if stats is None:
+            stats = self.stages[path] = StageStats(path)
+        if self.track_memory:
+            tracemalloc.reset_peak()
+        frame = _Frame(stats, time.perf_counter())
+        self._stack.append(frame)
+        try:
+            yield stats
+        finally:
+            elapsed = time.perf_counter() - frame.started
+            self._stack.pop()
+            stats.calls += 1
+            stats.total += elapsed
+            stats.max = max(stats.max, elapsed)
+            if self.track_memory:
+                # 하위 단계에서 reset 된 최대치는 carried_peak 로 상위 단계에 넘긴다
+                peak = max(tracemalloc.get_traced_memory()[1], frame.carried_peak)
+                stats.peak_mem = max(stats.peak_mem, peak)
+                if self._stack:
+                    self._stack[-1].carried_peak = max(self._stack[-1].carried_peak, peak)
+                tracemalloc.reset_peak()
+
+    def count(self, name, n=1):
+        """전역 + 현재 단계 카운터 증가 (바이트 수, 호출 수 등)"""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+            if self._stack:
+                c = self._stack[-1].stats.counters
+                c[name] = c.get(name, 0) + n
+
+    def _snapshot_counters(self):
+        with self._lock:
+            return dict(self.counters)
+
+    def report(self):
+        from modules.indicator_cache import _caches
+        return {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "wall_s": round(time.perf_counter() - self._started, 6),
+            "counters": self._snapshot_counters(),
+            "caches": {f"indicators:{path}": cache.stats() for path, cache in _caches.items()},
+            "stages": [s.as_dict() for s in self.stages.values()],
+        }
+
+    def write_json(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, ensure_ascii=False, indent=2)
+        print(f"[PERF] 성능 리포트 저장 → {path}")
+
+    def write_csv(self, path):
+        rows = [s.as_dict() for s in self.stages.values()]
+        fields = []
+        for row in rows:
+            fields += [k for k in row if k not in fields]
+        with open(path, "w", newline="", encoding="utf-8-sig") as f:
+            writer = csv.DictWriter(f, fieldnames=fields)
+            writer.writeheader()
+            writer.writerows(rows)
+        print(f"[PERF] 단계별 통계 저장 → {path}")
+
+    def dump_profile(self, path):
+        if self._profiler is None:
+            return
+        self._profiler.disable()
+        self._profiler.dump_stats(path)
+        print(f"[PERF] cProfile 결과 저장 → {path} (python -m pstats {path})")
+
+    def close(self):
+        if self._profiler is not None:
+            self._profiler.disable()
+        if self.track_memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def print_summary(self, top=15):
+        rows = sorted(self.stages.values(), key=lambda s: s.total, reverse=True)[:top]
+        print("\n⏱️ 단계별 소요 시간")
+        for s in rows:
+            mem = f" | peak {s.peak_mem / 1e6:.1f}MB" if self.track_memory else ""
+            print(f"  {s.path:<40} {s.total:8.3f}s  {s.calls:>7}회{mem}")
+
+
+class _NullInstrumentation:
+    """측정을 끈 상태의 빈 구현 (호출 비용 최소화)"""
+
+    def stage(self, name):
+        return contextlib.nullcontext()
+
+    def count(self, name, n=1):
+        pass
+
+
+_NULL = _NullInstrumentation()
+_active = None
+
+
+def enable_instrumentation(track_memory=False, profile=False):
+    """측정을 켜고 Instrumentation 객체를 돌려준다 (프로세스 전역)"""
+    global _active
+    _active = Instrumentation(track_memory, profile)
+    return _active
+
+
+def disable_instrumentation():
+    global _active
+    if _active is not None:
+        _active.close()
+    _active = None
+
+
+def get_instrumentation():
+    return _active or _NULL
+
+
+def stage(name):
+    """with stage("이름"): … — 측정이 꺼져 있으면 아무 일도 하지 않는다"""
+    return (_active or _NULL).stage(name)
+
+
+def count(name, n=1):
+    if _active is not None:
+        _active.count(name, n)
+
+
+def file_size(path):
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
@@ -0,0 +1,185 @@
+"""분봉 / 시간봉 CSV 스트리밍 수집 — 파일 전체를 메모리에 올리지 않는다
+
+    from modules.intraday import ingest_intraday, load_intraday
+    ingest_intraday("minute/005930.csv", "005930", rule="60min")   # 청크 단위로 읽어 60분봉으로 저장
+    df = load_intraday("005930", "60min", "20240101", "20241231")   # calculate_indicators 에 바로 넣을 수 있음
+
+- 입력: 첫 컬럼이 시각, OHLCV 컬럼은 시가/고가/저가/종가/거래량 또는 open/high/low/close/volume. 시각 오름차순.
+- 리샘플: pandas resample(rule) 기본값과 같은 구간(왼쪽 닫힘, 왼쪽 라벨, 첫날 자정 기준) —
+  시가=first, 고가=max, 저가=min, 종가=last, 거래량=sum. 봉이 하나도 없는 구간은 만들지 않는다.
+- 청크 경계에 걸친 구간은 다음 청크와 합친 뒤에 내보내므로 결과는 파일 전체를 한 번에
+  resample 한 것과 같고, 메모리는 청크 크기 + 저장 버퍼 크기로 고정된다.
+"""
+import numpy as np
+import pandas as pd
+
+from modules.instrumentation import DISK_READ, count, file_size, stage
+from modules.online_indicators import IndicatorState, advance_frame
+from modules.price_store import _to_ts, get_price_store
+
+DEFAULT_CHUNK_ROWS = 200_000   # 한 번에 읽는 원본 행 수
+DEFAULT_FLUSH_ROWS = 100_000   # 이만큼 모이면 저장소에 쓴다 (리샘플된 봉 기준)
+OHLCV = ['시가', '고가', '저가', '종가', '거래량']
+COLUMN_ALIASES = {"open": '시가', "high": '고가', "low": '저가', "close": '종가', "volume": '거래량'}
+
+
+def intraday_kind(rule):
+    """저장소 kind 이름 (예: '60min' → 'intraday_60min')"""
+    return f"intraday_{rule}"
+
+
+class BarResampler:
+    """시각 오름차순으로 들어오는 청크를 rule 간격 OHLCV 봉으로 묶는다
+
+    push(chunk) 는 완성된 봉만 돌려주고, 마지막(아직 열려 있을 수 있는) 봉은 보관했다가
+    다음 청크와 합친다. 끝나면 flush() 로 남은 봉을 받는다.
+    """
+
+    def __init__(self, rule):
+        self.rule = rule
+        self.freq = pd.Timedelta(rule)  # 고정 간격만 (예: 1min, 5min, 60min, 1h, 1D)
+        self._origin = None     # 첫 봉 날짜의 자정 (resample origin='start_day')
+        self._pending = None    # 아직 닫히지 않은 마지막 봉 (1행 DataFrame)
+        self._last_ts = None
+
+    def _aggregate(self, chunk):
+        index = chunk.index
+        if self._origin is None:
+            self._origin = index[0].normalize()
+        ts = index.values.astype("datetime64[ns]").view("i8")
+        origin, step = self._origin.value, self.freq.value
+        buckets = origin + (ts - origin) // step * step
+        grouped = chunk.groupby(buckets, sort=False)
+        bars = pd.DataFrame({
+            '시가': grouped['시가'].first(),
+            '고가': grouped['고가'].max(),
+            '저가': grouped['저가'].min(),
+            '종가': grouped['종가'].last(),
+            '거래량': grouped['거래량'].sum(),
+        })
+        bars.index = pd.DatetimeIndex(bars.index.values.astype("datetime64[ns]"), name=index.name)
+        return bars.dropna(subset=['종가'])
+
+    def _combine(self, old, new):
+        """같은 구간의 (앞 청크 봉, 뒤 청크 봉) → 한 봉"""
+        row = new.copy()
+        row['시가'] = old['시가'].iloc[0] if old['시가'].notna().iloc[0] else new['시가'].iloc[0]
+        row['고가'] = np.fmax(old['고가'].iloc[0], new['고가'].iloc[0])
+        row['저가'] = np.fmin(old['저가'].iloc[0], new['저가'].iloc[0])
+        row['거래량'] = old['거래량'].iloc[0] + new['거래량'].iloc[0]
+        return row
+
+    def push(self, chunk):
+        if chunk.empty:
+            return chunk.iloc[0:0]
+        if not chunk.index.is_monotonic_increasing or (self._last_ts is not None and chunk.index[0] < self._last_ts):
+            raise ValueError("분봉 데이터가 시각 오름차순이 아님 (스트리밍 리샘플은 정렬된 입력만 지원)")
+        self._last_ts = chunk.index[-1]
+        bars = self._aggregate(chunk)
+        if bars.empty:
+            return bars
+        if self._pending is not None:
+            if bars.index[0] == self._pending.index[0]:
+                bars = pd.concat([self._combine(self._pending, bars.iloc[:1]), bars.iloc[1:]])
+            else:
+                bars = pd.concat([self._pending, bars])
+        self._pending = bars.iloc[-1:]
+        return bars.iloc[:-1]
+
+    def flush(self):
+        out, self._pending = self._pending, None
+        return out if out is not None else pd.DataFrame(columns=OHLCV)
+
+
+def read_intraday_chunks(path, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """분봉 CSV 를 chunk_rows 행씩 읽어 (시각 index, 한글 OHLCV 컬럼) DataFrame 으로 내보낸다"""
+    count(DISK_READ, file_size(path))
+    for chunk in pd.read_csv(path, index_col=0, parse_dates=True, chunksize=chunk_rows):
+        chunk = chunk.rename(columns=lambda c: COLUMN_ALIASES.get(str(c).strip().lower(), c))
+        missing = [c for c in OHLCV if c not in chunk]
+        if missing:
+            raise ValueError(f"{path}: OHLCV 컬럼 없음 {missing}")
+        chunk.index = pd.DatetimeIndex(chunk.index)
+        yield chunk[OHLCV]
+
+
+def resample_stream(chunks, rule):
+    """청크 iterator → rule 간격 봉 DataFrame iterator (완성된 봉만, 마지막에 남은 봉)"""
+    resampler = BarResampler(rule)
+    for chunk in chunks:
+        bars = resampler.push(chunk)
+        if not bars.empty:
+            yield bars
+    tail = resampler.flush()
+    if not tail.empty:
+        yield tail
+
+
+def ingest_intraday(path, key, rule="60min", store=None, chunk_rows=DEFAULT_CHUNK_ROWS,
+                    flush_rows=DEFAULT_FLUSH_ROWS):
+    """분봉 CSV 한 파일을 rule 간격으로 리샘플해 저장소(kind=intraday_{rule})에 저장 → 저장한 봉 수"""
+    store = store or get_price_store()
+    kind = intraday_kind(rule)
+    buffer, buffered, written = [], 0, 0
+    first = last = None
+
+    def flush():
+        nonlocal buffer, buffered, written
+        if buffer:
+            store.write(kind, key, pd.concat(buffer))
+            written += buffered
+            buffer, buffered = [], 0
+
+    with stage("intraday_ingest"):
+        for bars in resample_stream(read_intraday_chunks(path, chunk_rows), rule):
+            first = bars.index[0] if first is None else first
+            last = bars.index[-1]
+            buffer.append(bars)
+            buffered += len(bars)
+            if buffered >= flush_rows:
+                flush()
+        flush()
+        if first is not None:
+            store.add_coverage(kind, key, _to_ts(first), _to_ts(last))
+    print(f"[INTRADAY] {key} {rule} 봉 {written:,}개 저장 ({path})")
+    return written
+
+
+def load_intraday(key, rule="60min", start=None, end=None, store=None):
+    """저장된 rule 간격 봉 [start 일 00:00, end 일 24:00) → DataFrame (calculate_indicators 입력 형식)"""
+    store = store or get_price_store()
+    end_excl = _to_ts(end) + pd.Timedelta(days=1) if end is not None else None
+    df = store.read(intraday_kind(rule), key, start, end_excl)
+    if end_excl is not None and not df.empty:
+        df = df.loc[df.index < end_excl]
+    return df
+
+
+def iter_intraday(key, rule="60min", store=None):
+    """저장된 봉을 연도 파티션 단위로 하나씩 (전 기간을 한 번에 올리지 않고 online 지표에 흘려 넣을 때)"""
+    store = store or get_price_store()
+    kind = intraday_kind(rule)
+    for year in store.years(kind, key):
+        part = store._read_partition(kind, key, year)
+        if part is not None and not part.empty:
+            yield part
+
+
+def stream_indicators(bars_iter, bench_close=None, params=None):
+    """봉 청크 iterator → 청크마다 calculate_indicators 와 같은 컬럼을 붙인 DataFrame
+
+    IndicatorState 를 청크 사이에 이어 가므로 전 기간을 한 번에 계산한 값과 같다 (메모리는 청크 크기).
+    bench_close(기준지수 종가 Series)는 calculate_rs 처럼 두 시각의 합집합 위에서 RS 창을 진행한다. 없으면 RS 는 NaN.
+    """
+    state = IndicatorState(params)
+    bench = bench_close.sort_index() if bench_close is not None else None
+    prev = None
+    for bars in bars_iter:
+        if bars.empty:
+            continue
+        window = None
+        if bench is not None:
+            window = bench.loc[bench.index > prev] if prev is not None else bench
+            window = window.loc[window.index <= bars.index[-1]]
+        prev = bars.index[-1]
+        yield pd.concat([bars, advance_frame(state, bars, window)], axis=1)
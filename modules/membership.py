@@ -0,0 +1,187 @@
+"""업종 구성 종목 시점별 스냅샷 저장소
+
+    sector_data/snapshots/{업종코드}/{YYYYMMDD}.csv   그날 받은 구성 종목 (code,name) — 바뀐 날만 새 파일
+    sector_data/snapshots/{업종코드}/meta.json        마지막 조회 시각, ETag / Last-Modified
+
+refresh() 는 TTL 이 지난 업종만 네이버에 조건부 요청(If-None-Match / If-Modified-Since)을 보내고,
+구성이 바뀌었을 때만 새 스냅샷을 쓴다. 백테스트는 as_of(업종, 날짜) 로 그 시점에 유효했던
+(그 날짜 이전 마지막) 스냅샷을 로컬에서만 읽는다.
+"""
+import bisect
+import json
+import os
+import time
+
+import pandas as pd
+
+from modules.data_loader import load_sector_stock_csv
+
+DEFAULT_SNAPSHOT_PATH = os.path.join("sector_data", "snapshots")
+DEFAULT_TTL = 24 * 3600  # 초 — 이보다 최근에 확인한 업종은 요청하지 않음
+
+
+def _to_key(date):
+    return pd.Timestamp(date).strftime("%Y%m%d")
+
+
+class MembershipStore:
+    """업종별 스냅샷 폴더. legacy_dir(기본: root 의 상위 폴더)의 예전 sector_{code}.csv 는 첫 스냅샷으로 가져온다"""
+
+    def __init__(self, root=DEFAULT_SNAPSHOT_PATH, ttl=DEFAULT_TTL, legacy_dir=None):
+        self.root = root
+        self.ttl = ttl
+        self.legacy_dir = legacy_dir or os.path.dirname(os.path.normpath(root))
+        self._dates = {}
+        self._members = {}
+
+    def _dir(self, code):
+        return os.path.join(self.root, str(code))
+
+    def _meta_path(self, code):
+        return os.path.join(self._dir(code), "meta.json")
+
+    def _read_meta(self, code):
+        try:
+            with open(self._meta_path(code), encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _write_meta(self, code, meta):
+        os.makedirs(self._dir(code), exist_ok=True)
+        path = self._meta_path(code)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    def snapshot_dates(self, code):
+        """저장된 스냅샷 날짜 (YYYYMMDD, 오름차순)"""
+        dates = self._dates.get(code)
+        if dates is None:
+            try:
+                names = os.listdir(self._dir(code))
+            except FileNotFoundError:
+                names = []
+            dates = self._dates[code] = sorted(n[:-4] for n in names if n.endswith(".csv") and n[:-4].isdigit())
+        return dates
+
+    def snapshot(self, code, date_key):
+        key = (code, date_key)
+        members = self._members.get(key)
+        if members is None:
+            members = self._members[key] = load_sector_stock_csv(os.path.join(self._dir(code), f"{date_key}.csv"))
+        return members
+
+    def save_snapshot(self, code, members, date=None):
+        """구성 종목을 date(기본: 오늘) 스냅샷으로 저장"""
+        date_key = _to_key(date or pd.Timestamp.today())
+        os.makedirs(self._dir(code), exist_ok=True)
+        path = os.path.join(self._dir(code), f"{date_key}.csv")
+        tmp = f"{path}.{os.getpid()}.tmp"
+        pd.DataFrame(list(members.items()), columns=["code", "name"]).to_csv(tmp, index=False)
+        os.replace(tmp, path)
+        self._members[(code, date_key)] = dict(members)
+        dates = self.snapshot_dates(code)
+        if date_key not in dates:
+            bisect.insort(dates, date_key)
+        return date_key
+
+    def import_legacy(self, code):
+        """예전 sector_data/sector_{code}.csv 를 파일 수정일자 스냅샷으로 가져온다 (스냅샷이 없을 때만)"""
+        path = os.path.join(self.legacy_dir, f"sector_{code}.csv")
+        if self.snapshot_dates(code) or not os.path.exists(path):
+            return False
+        members = load_sector_stock_csv(path)
+        if not members:
+            return False
+        self.save_snapshot(code, members, pd.Timestamp(os.path.getmtime(path), unit="s"))
+        return True
+
+    def history(self, code, start=None, end=None, fallback=True):
+        """[(스냅샷 날짜 Timestamp, {종목코드: 종목명})] 오름차순
+
+        start/end 를 주면 그 기간에 유효했던 것만: start 시점 스냅샷 + 기간 중 바뀐 것.
+        start 이전 스냅샷이 없으면 fallback=True 일 때 가장 오래된 스냅샷을 기간 처음부터 쓰고 (생존 편향 주의),
+        False 면 기간 중 처음 찍힌 스냅샷부터만 돌려준다 (그 전 날짜는 구성 종목 없음).
+        """
+        self.import_legacy(code)
+        dates = self.snapshot_dates(code)
+        if start is not None and dates:
+            dates = dates[max(bisect.bisect_right(dates, _to_key(start)) - 1, 0):]
+        if end is not None and dates:
+            keep = bisect.bisect_right(dates, _to_key(end))
+            dates = dates[:max(keep, 1) if fallback else keep]
+        return [(pd.Timestamp(d), self.snapshot(code, d)) for d in dates]
+
+    def as_of(self, code, date, fallback=True):
+        """date 시점에 유효했던 구성 종목 (그 이전 마지막 스냅샷)
+
+        date 보다 이른 스냅샷이 없으면 fallback=True 일 때 가장 오래된 스냅샷을 (생존 편향 주의), 아니면 {}.
+        """
+        self.import_legacy(code)
+        dates = self.snapshot_dates(code)
+        if not dates:
+            return {}
+        k = bisect.bisect_right(dates, _to_key(date)) - 1
+        if k < 0:
+            if not fallback:
+                return {}
+            k = 0
+        return self.snapshot(code, dates[k])
+
+    def latest(self, code):
+        """가장 최근 스냅샷 (없으면 {})"""
+        self.import_legacy(code)
+        dates = self.snapshot_dates(code)
+        return self.snapshot(code, dates[-1]) if dates else {}
+
+    def is_fresh(self, code, now=None):
+        meta = self._read_meta(code)
+        checked = meta.get("checked_at")
+        return checked is not None and (now or time.time()) - checked < self.ttl
+
+    def refresh(self, code, http=None, base_url=None, force=False):
+        """TTL 이 지났으면 조건부 요청으로 구성 종목 확인 → 'fresh' | 'not_modified' | 'unchanged' | 'updated' | 'failed'"""
+        from modules.crawler import NAVER_BASE_URL, fetch_sector_members
+        self.import_legacy(code)
+        if not force and self.is_fresh(code):
+            return "fresh"
+        meta = self._read_meta(code)
+        validators = meta if self.snapshot_dates(code) else None
+        status, members, validators = fetch_sector_members(code, http, base_url or NAVER_BASE_URL, validators)
+        if status is None or (status == 200 and not members):
+            return "failed"
+
+        outcome = "not_modified"
+        if status == 200:
+            dates = self.snapshot_dates(code)
+            if dates and self.snapshot(code, dates[-1]) == members:
+                outcome = "unchanged"
+            else:
+                self.save_snapshot(code, members)
+                outcome = "updated"
+        self._write_meta(code, {**meta, **(validators or {}), "checked_at": time.time()})
+        return outcome
+
+    def refresh_all(self, codes, http=None, base_url=None, force=False):
+        """여러 업종 refresh → {결과: 개수}"""
+        counts = {}
+        for code in codes:
+            outcome = self.refresh(code, http, base_url, force)
+            counts[outcome] = counts.get(outcome, 0) + 1
+        print("[MEMBERS] 업종 구성 확인 " + ", ".join(f"{k} {v}" for k, v in sorted(counts.items())))
+        return counts
+
+
+_stores = {}
+
+
+def get_membership_store(root=DEFAULT_SNAPSHOT_PATH, ttl=None):
+    """경로별 프로세스 전역 스냅샷 저장소 (ttl 을 주면 바꾼다)"""
+    store = _stores.get(root)
+    if store is None:
+        store = _stores[root] = MembershipStore(root, DEFAULT_TTL if ttl is None else ttl)
+    elif ttl is not None:
+        store.ttl = ttl
+    return store
@@ -0,0 +1,284 @@
+"""봉 하나씩 받아 갱신하는 (online) 지표 — 새 봉마다 O(1) 시간·메모리
+
+modules.indicators 의 배치 함수와 같은 입력이면 비트 단위로 같은 값을 낸다. 이를 위해
+RollingMean 은 pandas rolling().mean() 의 누적 방식(Kahan 보정 합, 같은 값 연속 / 부호 보정)을
+그대로 따른다. 0 으로 나누기는 numpy 와 같이 inf / NaN 을 돌려준다.
+"""
+import math
+
+import numpy as np
+import pandas as pd
+
+from modules.indicators import DEFAULT_INDICATOR_PARAMS
+
+NAN = float("nan")
+INF = float("inf")
+
+
+def _div(a, b):
+    """IEEE 나눗셈 (파이썬 float 는 0 으로 나누면 예외라 numpy 규칙으로 맞춤)"""
+    if b == 0:
+        if a != a or a == 0:
+            return NAN
+        return math.copysign(INF, a) * math.copysign(1.0, b)
+    return a / b
+
+
+def _fmax(a, b):
+    """np.fmax: 한쪽이 NaN 이면 다른 쪽"""
+    if a != a:
+        return b
+    if b != b:
+        return a
+    return a if a >= b else b
+
+
+class RollingMean:
+    """pandas Series.rolling(window).mean() 의 online 버전"""
+
+    __slots__ = ("window", "_buf", "_i", "_nobs", "_sum", "_comp_add", "_comp_remove", "_neg", "_same", "_prev")
+
+    def __init__(self, window):
+        self.window = window
+        self._buf = [NAN] * window
+        self._i = 0
+        self._nobs = 0
+        self._sum = 0.0
+        self._comp_add = 0.0
+        self._comp_remove = 0.0
+        self._neg = 0
+        self._same = 0
+        self._prev = NAN
+
+    def update(self, value):
+        value = float(value)
+        slot = self._i % self.window
+        if self._i == 0:
+            self._prev = value
+        elif self._i >= self.window:
+            old = self._buf[slot]
+            if old == old:
+                self._nobs -= 1
+                y = -old - self._comp_remove
+                t = self._sum + y
+                self._comp_remove = t - self._sum - y
+                self._sum = t
+                if math.copysign(1.0, old) < 0:
+                    self._neg -= 1
+        self._buf[slot] = value
+        self._i += 1
+
+        if value == value:
+            self._nobs += 1
+            y = value - self._comp_add
+            t = self._sum + y
+            self._comp_add = t - self._sum - y
+            self._sum = t
+            if math.copysign(1.0, value) < 0:
+                self._neg += 1
+            self._same = self._same + 1 if value == self._prev else 1
+            self._prev = value
+
+        nobs = self._nobs
+        if nobs < self.window or nobs == 0:
+            return NAN
+        if self._same >= nobs:
+            return self._prev
+        result = self._sum / nobs
+        if self._neg == 0 and result < 0:
+            return 0.0
+        if self._neg == nobs and result > 0:
+            return 0.0
+        return result
+
+
+class MovingAverageCross:
+    """MA(short) / MA(long) 와 골든·데드크로스 (calculate_ma, detect_crosses 와 같은 규칙)"""
+
+    __slots__ = ("short", "long", "_prev_s", "_prev_l")
+
+    def __init__(self, short=5, long=60):
+        self.short = RollingMean(short)
+        self.long = RollingMean(long)
+        self._prev_s = NAN
+        self._prev_l = NAN
+
+    def update(self, close):
+        """→ (ma_short, ma_long, golden, dead)"""
+        ma_s = self.short.update(close)
+        ma_l = self.long.update(close)
+        golden = ma_s > ma_l and self._prev_s <= self._prev_l
+        dead = ma_s < ma_l and self._prev_s >= self._prev_l
+        self._prev_s, self._prev_l = ma_s, ma_l
+        return ma_s, ma_l, golden, dead
+
+
+class OnlineRSI:
+    """calculate_rsi 의 online 버전 (단순 이동평균 RSI)"""
+
+    __slots__ = ("_gain", "_loss", "_prev_close")
+
+    def __init__(self, period=14):
+        self._gain = RollingMean(period)
+        self._loss = RollingMean(period)
+        self._prev_close = NAN
+
+    def update(self, close):
+        close = float(close)
+        delta = close - self._prev_close
+        self._prev_close = close
+        # Series.where(cond, 0) 과 같이 조건 밖(NaN 포함)은 0, 손실은 부호를 뒤집어 -0.0 이 된다
+        gain = delta if delta > 0 else 0.0
+        loss = -(delta if delta < 0 else 0.0)
+        rs = _div(self._gain.update(gain), self._loss.update(loss))
+        return 100 - _div(100, 1 + rs)
+
+
+class OnlineRS:
+    """calculate_rs 의 online 버전: (종가 / 기준지수 종가) / 그 비율의 window 봉 평균
+
+    배치 함수는 두 시리즈의 날짜 합집합 위에서 rolling 하므로, 한쪽에만 봉이 있는 날도
+    없는 쪽 값을 NaN 으로 넣어 update 해야 같은 값이 나온다.
+    """
+
+    __slots__ = ("_mean",)
+
+    def __init__(self, window=20):
+        self._mean = RollingMean(window)
+
+    def update(self, close, bench_close):
+        ratio = _div(float(close), float(bench_close))
+        return _div(ratio, self._mean.update(ratio))
+
+
+class OnlineATR:
+    """supertrend_kernel 의 ATR (TR 의 period 봉 단순평균, 첫 봉 TR 은 고가-저가)"""
+
+    __slots__ = ("_mean", "_prev_close")
+
+    def __init__(self, period=10):
+        self._mean = RollingMean(period)
+        self._prev_close = NAN
+
+    def update(self, high, low, close):
+        high, low = float(high), float(low)
+        prev = self._prev_close
+        tr = _fmax(_fmax(high - low, abs(high - prev)), abs(low - prev))
+        self._prev_close = float(close)
+        return self._mean.update(tr)
+
+
+class OnlineSupertrend:
+    """calculate_supertrend / supertrend_kernel 의 online 버전 (밴드 래칫 규칙 동일)"""
+
+    __slots__ = ("multiplier", "_atr", "_upper", "_lower", "_trend", "_started")
+
+    def __init__(self, period=10, multiplier=3):
+        self.multiplier = multiplier
+        self._atr = OnlineATR(period)
+        self._upper = NAN
+        self._lower = NAN
+        self._trend = True
+        self._started = False
+
+    def update(self, high, low, close):
+        """→ (supertrend, upperband, lowerband)"""
+        high, low, close = float(high), float(low), float(close)
+        atr = self._atr.update(high, low, close)
+        hl2 = (high + low) / 2
+        upper = hl2 + self.multiplier * atr
+        lower = hl2 - self.multiplier * atr
+
+        if self._started:
+            up_break = close > self._upper
+            down_break = not up_break and close < self._lower
+            if up_break or down_break:
+                self._trend = up_break
+            else:
+                if self._trend and lower < self._lower:
+                    lower = self._lower
+                if not self._trend and upper > self._upper:
+                    upper = self._upper
+        self._started = True
+        self._upper, self._lower = upper, lower
+        return self._trend, upper, lower
+
+
+class IndicatorState:
+    """종목 하나의 calculate_indicators 컬럼(Supertrend, MA5, MA60, GoldenCross, DeadCross, RSI, RS)을 online 으로 유지
+
+    update() 는 종목 봉이 있는 날, skip() 은 기준지수에만 봉이 있는 날 (RS 창만 한 칸 진행).
+    """
+
+    __slots__ = ("supertrend", "cross", "rsi", "rs", "last")
+
+    COLUMNS = ('Supertrend', 'MA5', 'MA60', 'GoldenCross', 'DeadCross', 'RSI', 'RS')
+
+    def __init__(self, params=None):
+        p = {**DEFAULT_INDICATOR_PARAMS, **(params or {})}
+        self.supertrend = OnlineSupertrend(p['st_period'], p['st_multiplier'])
+        self.cross = MovingAverageCross(p['ma_short'], p['ma_long'])
+        self.rsi = OnlineRSI(p['rsi_period'])
+        self.rs = OnlineRS(p['rs_window'])
+        self.last = None
+
+    def update(self, high, low, close, bench_close=NAN):
+        """새 봉 반영 → COLUMNS 순서의 tuple"""
+        trend, _, _ = self.supertrend.update(high, low, close)
+        ma_s, ma_l, golden, dead = self.cross.update(close)
+        self.last = (trend, ma_s, ma_l, golden, dead, self.rsi.update(close), self.rs.update(close, bench_close))
+        return self.last
+
+    def skip(self, bench_close):
+        self.rs.update(NAN, bench_close)
+
+    @classmethod
+    def from_history(cls, df, kospi_df, params=None):
+        """과거 시세를 봉 단위로 흘려 넣어 상태를 만든다 (이후 새 봉만 update)"""
+        state = cls(params)
+        advance_frame(state, df, kospi_df['종가'])
+        return state
+
+
+def advance_frame(state, df, bench_close=None):
+    """state 를 df 의 봉만큼 진행 → df 와 같은 index 의 calculate_indicators 지표 컬럼 DataFrame
+
+    bench_close(기준지수 종가 Series, df 와 같은 구간)를 주면 calculate_rs 처럼 두 시각의 합집합 위에서
+    진행한다 — 기준지수에만 있는 날은 skip() 으로 RS 창만 민다. 없으면 RS 는 NaN.
+    """
+    high, low, close = (df[c].to_numpy(float) for c in ('고가', '저가', '종가'))
+    rows = []
+    if bench_close is None:
+        rows = [state.update(h, l, c) for h, l, c in zip(high, low, close)]
+    else:
+        timeline = df.index.union(bench_close.index)
+        b_values = bench_close.reindex(timeline).to_numpy(float)
+        for k, b in zip(df.index.get_indexer(timeline), b_values):
+            if k >= 0:
+                rows.append(state.update(high[k], low[k], close[k], b))
+            else:
+                state.skip(b)
+    columns = list(zip(*rows)) if rows else [()] * len(IndicatorState.COLUMNS)
+    return pd.DataFrame({
+        name: np.array(values, dtype=bool if name in ('Supertrend', 'GoldenCross', 'DeadCross') else float)
+        for name, values in zip(IndicatorState.COLUMNS, columns)
+    }, index=df.index)
+
+
+def update_market(states, bars, bench_close, params=None):
+    """하루치 전 종목 봉 반영 (장 마감 피드용)
+
+    states: {종목코드: IndicatorState} — 처음 보는 종목은 새로 만든다 (제자리 갱신)
+    bars: {종목코드: (고가, 저가, 종가)} — 오늘 봉이 없는 종목은 skip() 으로 RS 창만 진행
+    반환값: {종목코드: 지표 tuple} (오늘 봉이 있는 종목만)
+    """
+    out = {}
+    for ticker, (high, low, close) in bars.items():
+        state = states.get(ticker)
+        if state is None:
+            state = states[ticker] = IndicatorState(params)
+        out[ticker] = state.update(high, low, close, bench_close)
+    for ticker, state in states.items():
+        if ticker not in bars:
+            state.skip(bench_close)
+    return out
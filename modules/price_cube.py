@@ -0,0 +1,228 @@
+import contextlib
+import glob
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from modules.data_loader import extract_sector_code_from_filename
+
+DEFAULT_CUBE_PATH = "price_cube"
+CUBE_VERSION = 2  # 2: 세대별 values / index 파일 + meta.json 의 generation
+FIELDS = ['시가', '고가', '저가', '종가', '거래량']
+LOCK_STALE = 60  # 초 — 이보다 오래된 publish.lock 은 죽은 프로세스가 남긴 것으로 보고 지운다
+
+
+def _sources(stock_dir, index_dir):
+    """(kind, key, path) 목록 — stock_data/{code}.csv 와 data/index_{code}_{이름}.csv"""
+    sources = []
+    for path in sorted(glob.glob(os.path.join(index_dir, "index_*.csv"))):
+        code = extract_sector_code_from_filename(path)
+        if code:
+            sources.append(("index", code, path))
+    for path in sorted(glob.glob(os.path.join(stock_dir, "*.csv"))):
+        sources.append(("stock", os.path.basename(path)[:-4], path))
+    return sources
+
+
+def _signature(sources):
+    return [[path, os.stat(path).st_mtime_ns, os.stat(path).st_size] for _, _, path in sources]
+
+
+def _generation_paths(path, generation):
+    return os.path.join(path, f"values.{generation}.npy"), os.path.join(path, f"index.{generation}.npz")
+
+
+@contextlib.contextmanager
+def _publish_lock(path):
+    """세대 파일 rename / meta.json 교체 / 예전 세대 삭제를 프로세스 사이에서 한 번에 하나만 하게 하는 잠금 파일"""
+    lock = os.path.join(path, "publish.lock")
+    while True:
+        try:
+            fd = os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(lock) > LOCK_STALE:
+                    os.remove(lock)
+                    continue
+            except OSError:
+                continue  # 그 사이 다른 프로세스가 풀었음
+            time.sleep(0.01)
+    try:
+        yield
+    finally:
+        os.close(fd)
+        os.remove(lock)
+
+
+def _remove_old_generations(path, keep):
+    """meta.json 이 가리키지 않는 예전 세대 파일 삭제 (이미 열린 memmap 은 계속 읽힌다)
+
+    _publish_lock 안에서만 부른다 — 다른 빌더의 세대 파일은 잠금 안에서 meta.json 과 함께 자리를 잡으므로
+    여기서 보이는 values.* / index.* 는 게시된 세대뿐이다 (쓰는 중인 파일은 *.tmp).
+    """
+    for old in glob.glob(os.path.join(path, "values*.npy")) + glob.glob(os.path.join(path, "index*.npz")):
+        if os.path.basename(old).split(".")[-2] != keep:
+            try:
+                os.remove(old)
+            except OSError:
+                pass
+
+
+def build_price_cube(path=DEFAULT_CUBE_PATH, stock_dir="stock_data", index_dir="data"):
+    """모든 종목/지수 CSV 를 날짜 × 종목 × 필드 float64 배열 하나로 묶어 파일로 저장
+
+    날짜 축은 모든 CSV 날짜의 합집합(거래일 달력)이고, 거래가 없는 칸은 NaN.
+    values.{세대}.npy 는 np.load(mmap_mode='r') 로 여러 프로세스가 복사·파싱 없이 같이 읽는다.
+    세대마다 새 파일에 쓰고 마지막에 meta.json 을 교체하므로, 읽는 쪽은 항상 같은 세대의
+    values / index / meta 를 본다 (교체 도중에 열어도 이전 세대 전체 또는 새 세대 전체).
+    여러 프로세스가 동시에 만들어도 tmp → 세대 파일 rename 과 게시 / 정리는 잠금 안에서 한 번에 한다.
+    """
+    sources = _sources(stock_dir, index_dir)
+    frames = [pd.read_csv(p, index_col=0, parse_dates=True) for _, _, p in sources]
+    dates = pd.DatetimeIndex(np.unique(np.concatenate(
+        [df.index.values.astype("datetime64[ns]") for df in frames] or [np.array([], "datetime64[ns]")])))
+
+    os.makedirs(path, exist_ok=True)
+    generation = f"{time.time_ns():x}{os.getpid():x}"
+    values_path, index_path = _generation_paths(path, generation)
+    values_tmp = f"{values_path}.{os.getpid()}.tmp"
+    cube = np.lib.format.open_memmap(values_tmp, mode="w+", dtype=np.float64, shape=(len(dates), len(frames), len(FIELDS)))
+    cube[:] = np.nan
+    first = np.zeros(len(frames), dtype=np.int64)
+    last = np.zeros(len(frames), dtype=np.int64)
+    gaps = np.zeros(len(frames), dtype=bool)
+    for j, df in enumerate(frames):
+        df = df[~df.index.duplicated(keep="last")].sort_index()
+        rows = dates.get_indexer(df.index)
+        for f, field in enumerate(FIELDS):
+            if field in df:
+                cube[rows, j, f] = df[field].to_numpy(dtype=float)
+        if len(rows):
+            first[j], last[j] = rows[0], rows[-1] + 1
+            gaps[j] = last[j] - first[j] != len(rows)  # 상장 기간 중 빠진 날짜가 있음
+    cube.flush()
+    del cube
+
+    index_tmp = f"{index_path}.{os.getpid()}.tmp"
+    with open(index_tmp, "wb") as f:
+        np.savez(f, dates=dates.values.astype("datetime64[ns]"), first=first, last=last, gaps=gaps)
+    meta = {
+        "version": CUBE_VERSION,
+        "generation": generation,
+        "fields": FIELDS,
+        "kinds": [kind for kind, _, _ in sources],
+        "keys": [key for _, key, _ in sources],
+        "sources": _signature(sources),
+    }
+    meta_path = os.path.join(path, "meta.json")
+    meta_tmp = f"{meta_path}.{os.getpid()}.tmp"
+    with open(meta_tmp, "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False)
+    with _publish_lock(path):
+        os.replace(values_tmp, values_path)
+        os.replace(index_tmp, index_path)
+        os.replace(meta_tmp, meta_path)
+        _remove_old_generations(path, generation)
+    print(f"[CUBE] {len(dates)}일 × {len(frames)}종목 × {len(FIELDS)}필드 → {values_path}")
+    return PriceCube(path)
+
+
+class PriceCube:
+    """build_price_cube() 결과를 읽기 전용 memmap 으로 연다 (프로세스마다 열어도 메모리는 OS 페이지 캐시 하나)
+
+    pickle 하면 경로만 넘어가므로 spawn 워커에도 복사 없이 전달된다.
+    frame() 은 기존 코드가 기대하는 OHLCV DataFrame 을 배열의 view 로 돌려준다.
+    """
+
+    def __init__(self, path=DEFAULT_CUBE_PATH):
+        self.path = path
+        for attempt in range(3):
+            try:
+                self._open()
+                break
+            except FileNotFoundError:
+                # meta.json 을 읽은 직후 다른 프로세스가 새 세대로 교체하며 이전 파일을 지운 경우 → 다시 읽는다
+                if attempt == 2:
+                    raise
+
+    def _open(self):
+        with open(os.path.join(self.path, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("version") != CUBE_VERSION:
+            raise ValueError(f"price cube 버전 불일치: {meta.get('version')} (기대 {CUBE_VERSION})")
+        values_path, index_path = _generation_paths(self.path, meta["generation"])
+        with np.load(index_path) as index:
+            dates = pd.DatetimeIndex(index["dates"], name='날짜')
+            first, last, gaps = index["first"], index["last"], index["gaps"]
+        values = np.load(values_path, mmap_mode="r")
+        if values.shape[:2] != (len(dates), len(meta["keys"])):
+            raise ValueError(f"price cube 파일 크기 불일치: {values.shape} (세대 {meta['generation']})")
+        self.meta = meta
+        self.fields = meta["fields"]
+        self._col = {(kind, key): j for j, (kind, key) in enumerate(zip(meta["kinds"], meta["keys"]))}
+        self.dates = dates
+        self._first, self._last, self._gaps = first, last, gaps
+        self.values = values
+
+    def __getstate__(self):
+        return {"path": self.path}
+
+    def __setstate__(self, state):
+        self.__init__(state["path"])
+
+    def keys(self, kind="stock"):
+        return [key for k, key in self._col if k == kind]
+
+    def __contains__(self, item):
+        return item in self._col
+
+    def is_stale(self, stock_dir="stock_data", index_dir="data"):
+        """원천 CSV 가 추가/변경/삭제됐으면 True"""
+        return _signature(_sources(stock_dir, index_dir)) != self.meta["sources"]
+
+    def frame(self, key, kind="stock", start=None, end=None):
+        """(kind, key) 의 OHLCV DataFrame — 상장 기간 [첫 봉, 마지막 봉] 을 잘라낸 view
+
+        상장 기간 중간에 빠진 날짜가 있는 종목만 NaN 행을 뺀 복사본을 만든다. 없는 종목은 빈 DataFrame.
+        """
+        j = self._col.get((kind, str(key)))
+        if j is None:
+            return pd.DataFrame(columns=self.fields)
+        lo, hi = int(self._first[j]), int(self._last[j])
+        if start is not None:
+            lo = max(lo, int(self.dates.searchsorted(pd.Timestamp(start), side="left")))
+        if end is not None:
+            hi = min(hi, int(self.dates.searchsorted(pd.Timestamp(end), side="right")))
+        hi = max(hi, lo)
+        df = pd.DataFrame(self.values[lo:hi, j, :], index=self.dates[lo:hi], columns=self.fields, copy=False)
+        if self._gaps[j]:
+            df = df[df['종가'].notna().to_numpy()]
+        return df
+
+    def frames(self, keys, kind="stock", start=None, end=None):
+        """{key: DataFrame view} (load_backtest_data()['stocks'] 대용)"""
+        return {key: self.frame(key, kind, start, end) for key in keys}
+
+    def field(self, name, kind="stock", start=None, end=None):
+        """필드 하나의 날짜 × 종목 DataFrame (정렬된 달력 기준, 없는 칸은 NaN)"""
+        cols = [j for (k, _), j in self._col.items() if k == kind]
+        lo = 0 if start is None else int(self.dates.searchsorted(pd.Timestamp(start), side="left"))
+        hi = len(self.dates) if end is None else int(self.dates.searchsorted(pd.Timestamp(end), side="right"))
+        f = self.fields.index(name)
+        return pd.DataFrame(self.values[lo:hi, cols, f], index=self.dates[lo:hi], columns=self.keys(kind))
+
+
+def load_price_cube(path=DEFAULT_CUBE_PATH, stock_dir="stock_data", index_dir="data", rebuild=True):
+    """저장된 cube 를 열고, 없거나 원천 CSV 가 바뀌었으면 (rebuild=True 일 때) 다시 만든다"""
+    if os.path.exists(os.path.join(path, "meta.json")):
+        try:
+            cube = PriceCube(path)
+            if not rebuild or not cube.is_stale(stock_dir, index_dir):
+                return cube
+        except ValueError as e:
+            print(f"[CUBE] {e} → 재생성")
+    return build_price_cube(path, stock_dir, index_dir)
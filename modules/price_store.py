@@ -0,0 +1,262 @@
+import glob
+import json
+import os
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from modules.instrumentation import DISK_READ, count, file_size
+
+DEFAULT_STORE_PATH = "price_store"
+RECENT_DAYS = 7  # 이 기간에 걸친 구간은 원천 반영이 늦거나 일시 실패일 수 있어 받은 봉까지만 coverage 로 기록
+
+
+def _to_ts(value):
+    """'20200101' / datetime / Timestamp → 자정 기준 Timestamp"""
+    if isinstance(value, str) and len(value) == 8 and value.isdigit():
+        return pd.Timestamp(datetime.strptime(value, "%Y%m%d"))
+    return pd.Timestamp(value).normalize()
+
+
+def _to_krx(ts):
+    return ts.strftime("%Y%m%d")
+
+
+def settled_end(df, start, end, today=None):
+    """fetch(start, end) 결과 중 '확정'으로 coverage 에 기록할 수 있는 마지막 날짜 (없으면 None)
+
+    - 오늘 봉은 장중 값일 수 있으므로 coverage 는 최대 전날까지
+    - 구간이 최근 RECENT_DAYS 에 걸치면 실제로 받은 마지막 봉까지만 (빈 결과는 기록하지 않음)
+    """
+    start, end = _to_ts(start), _to_ts(end)
+    today = _to_ts(today) if today is not None else pd.Timestamp.today().normalize()
+    last = min(end, today - timedelta(days=1))
+    if end >= today - timedelta(days=RECENT_DAYS):
+        if df is None or df.empty:
+            return None
+        last = min(last, _to_ts(df.index.max()))
+    return last if last >= start else None
+
+
+def _merge_ranges(ranges):
+    """겹치거나 하루 차이로 붙어있는 구간을 하나로 합친다"""
+    merged = []
+    for s, e in sorted(ranges):
+        if merged and s <= merged[-1][1] + timedelta(days=1):
+            merged[-1] = (merged[-1][0], max(merged[-1][1], e))
+        else:
+            merged.append((s, e))
+    return merged
+
+
+class PriceStore:
+    """종목/지수 OHLCV 로컬 저장소 (티커 × 연도 단위 컬럼형 .npz 파티션)
+
+    디렉터리 구조: {root}/{kind}/{key}/{year}.npz + coverage.json
+    - kind: "stock" (개별 종목) / "index" (업종·코스피 지수)
+    - coverage.json: 원천에서 이미 받아온 날짜 구간 목록 (거래일이 없는 구간도 포함)
+    get() 은 디스크에서 먼저 읽고, coverage 에 없는 구간만 fetch 로 받아 채운다.
+    """
+
+    def __init__(self, root=DEFAULT_STORE_PATH):
+        self.root = root
+
+    # ---------- 경로 / 메타데이터 ----------
+    def _dir(self, kind, key):
+        return os.path.join(self.root, kind, str(key))
+
+    def _partition_path(self, kind, key, year):
+        return os.path.join(self._dir(kind, key), f"{year}.npz")
+
+    def _coverage_path(self, kind, key):
+        return os.path.join(self._dir(kind, key), "coverage.json")
+
+    def _halts_path(self, kind, key):
+        return os.path.join(self._dir(kind, key), "halts.json")
+
+    def coverage(self, kind, key):
+        path = self._coverage_path(kind, key)
+        if not os.path.exists(path):
+            return []
+        with open(path, encoding="utf-8") as f:
+            return [(_to_ts(s), _to_ts(e)) for s, e in json.load(f)]
+
+    def _save_coverage(self, kind, key, ranges):
+        os.makedirs(self._dir(kind, key), exist_ok=True)
+        path = self._coverage_path(kind, key)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump([[_to_krx(s), _to_krx(e)] for s, e in _merge_ranges(ranges)], f)
+        os.replace(tmp, path)
+
+    def add_coverage(self, kind, key, start, end):
+        self._save_coverage(kind, key, self.coverage(kind, key) + [(_to_ts(start), _to_ts(end))])
+
+    def halts(self, kind, key):
+        """원천에 다시 요청해도 봉이 없던 날짜 구간 (거래정지 등) — 결측 보정 대상에서 뺀다"""
+        path = self._halts_path(kind, key)
+        if not os.path.exists(path):
+            return []
+        with open(path, encoding="utf-8") as f:
+            return [(_to_ts(s), _to_ts(e)) for s, e in json.load(f)]
+
+    def add_halt(self, kind, key, start, end):
+        os.makedirs(self._dir(kind, key), exist_ok=True)
+        path = self._halts_path(kind, key)
+        ranges = _merge_ranges(self.halts(kind, key) + [(_to_ts(start), _to_ts(end))])
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump([[_to_krx(s), _to_krx(e)] for s, e in ranges], f)
+        os.replace(tmp, path)
+
+    def missing_ranges(self, kind, key, start, end):
+        """[start, end] 중 아직 원천에서 받아오지 않은 구간 목록"""
+        start, end = _to_ts(start), _to_ts(end)
+        missing = []
+        cursor = start
+        for s, e in _merge_ranges(self.coverage(kind, key)):
+            if e < cursor:
+                continue
+            if s > end:
+                break
+            if s > cursor:
+                missing.append((cursor, s - timedelta(days=1)))
+            cursor = max(cursor, e + timedelta(days=1))
+            if cursor > end:
+                break
+        if cursor <= end:
+            missing.append((cursor, end))
+        return missing
+
+    def years(self, kind, key):
+        return sorted(
+            int(os.path.basename(p)[:-4])
+            for p in glob.glob(os.path.join(self._dir(kind, key), "*.npz"))
+        )
+
+    def keys(self, kind):
+        base = os.path.join(self.root, kind)
+        if not os.path.isdir(base):
+            return []
+        return sorted(os.listdir(base))
+
+    # ---------- 파티션 입출력 ----------
+    def _read_partition(self, kind, key, year):
+        path = self._partition_path(kind, key, year)
+        if not os.path.exists(path):
+            return None
+        count(DISK_READ, file_size(path))
+        with np.load(path, allow_pickle=False) as data:
+            columns = data["columns"].tolist()
+            index = pd.DatetimeIndex(data["dates"].astype("datetime64[ns]"), name=str(data["index_name"]) or None)
+            return pd.DataFrame({c: data[f"c{i}"] for i, c in enumerate(columns)}, index=index)
+
+    def _write_partition(self, kind, key, year, df):
+        os.makedirs(self._dir(kind, key), exist_ok=True)
+        path = self._partition_path(kind, key, year)
+        arrays = {f"c{i}": df[c].to_numpy() for i, c in enumerate(df.columns)}
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            np.savez(
+                f,
+                dates=df.index.values.astype("datetime64[ns]").view("i8"),
+                columns=np.array([str(c) for c in df.columns]),
+                index_name=np.array(df.index.name or ""),
+                **arrays,
+            )
+        os.replace(tmp, path)
+
+    def read(self, kind, key, start=None, end=None):
+        """디스크에 있는 데이터만 [start, end] 구간으로 읽는다 (원천 조회 없음)"""
+        start = _to_ts(start) if start is not None else None
+        end = _to_ts(end) if end is not None else None
+        frames = []
+        for year in self.years(kind, key):
+            if (start is not None and year < start.year) or (end is not None and year > end.year):
+                continue
+            part = self._read_partition(kind, key, year)
+            if part is None or part.empty:
+                continue
+            dates = part.index.values
+            lo = 0 if start is None else np.searchsorted(dates, start.to_datetime64(), side="left")
+            hi = len(dates) if end is None else np.searchsorted(dates, end.to_datetime64(), side="right")
+            frames.append(part.iloc[lo:hi])
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames) if len(frames) > 1 else frames[0]
+
+    def write(self, kind, key, df, start=None, end=None):
+        """df 를 연도별 파티션에 병합 저장 (같은 날짜는 새 값으로 덮어씀)
+
+        start/end 를 주면 그 구간을 coverage 에 기록한다.
+        """
+        if df is not None and not df.empty:
+            df = df.sort_index()
+            df.index = pd.DatetimeIndex(df.index, name=df.index.name)
+            for year, chunk in df.groupby(df.index.year):
+                old = self._read_partition(kind, key, year)
+                if old is not None and not old.empty:
+                    chunk = pd.concat([old, chunk])
+                    chunk = chunk[~chunk.index.duplicated(keep="last")].sort_index()
+                self._write_partition(kind, key, year, chunk)
+        if start is not None and end is not None:
+            self.add_coverage(kind, key, start, end)
+
+    def get(self, kind, key, start, end, fetch):
+        """read-through 조회: 빠진 구간만 fetch(start, end) 로 받아 저장한 뒤 디스크에서 읽는다
+
+        fetch 는 'YYYYMMDD' 문자열 두 개를 받아 DataFrame 을 돌려주는 함수이며,
+        실패 시 예외를 던져야 한다. 지난 구간의 빈 결과는 '해당 구간 거래 없음' 으로 기록되지만,
+        오늘 봉과 최근 구간의 빈 결과는 확정이 아니므로 coverage 에 넣지 않고 다음 조회 때 다시 받는다.
+        """
+        today = pd.Timestamp.today().normalize()
+        for s, e in self.missing_ranges(kind, key, start, end):
+            # 아직 오지 않은 날짜는 받지도, coverage 에 넣지도 않는다
+            if s > today:
+                continue
+            df = fetch(_to_krx(s), _to_krx(e))
+            last = settled_end(df, s, e, today)
+            self.write(kind, key, df, s if last is not None else None, last)
+        return self.read(kind, key, start, end)
+
+    # ---------- 기존 CSV 가져오기 ----------
+    def import_csv(self, kind, key, path):
+        df = pd.read_csv(path, index_col=0, parse_dates=True)
+        if df.empty:
+            return 0
+        self.write(kind, key, df, df.index.min(), df.index.max())
+        return len(df)
+
+    def import_legacy_csvs(self, stock_dir="stock_data", index_dir="data"):
+        """stock_data/{ticker}.csv, data/index_{code}_{name}.csv 를 저장소로 가져온다"""
+        imported = 0
+        for path in sorted(glob.glob(os.path.join(stock_dir, "*.csv"))):
+            ticker = os.path.basename(path)[:-4]
+            try:
+                self.import_csv("stock", ticker, path)
+                imported += 1
+            except Exception as e:
+                print(f"[ERROR] {path} 가져오기 실패: {e}")
+        for path in sorted(glob.glob(os.path.join(index_dir, "index_*.csv"))):
+            parts = os.path.basename(path)[:-4].split("_")
+            if len(parts) < 2:
+                continue
+            try:
+                self.import_csv("index", parts[1], path)
+                imported += 1
+            except Exception as e:
+                print(f"[ERROR] {path} 가져오기 실패: {e}")
+        print(f"[IMPORT] CSV {imported}개 저장소로 가져오기 완료 → {self.root}")
+        return imported
+
+
+_default_store = None
+
+
+def get_price_store():
+    """프로세스 전역 기본 저장소 (price_store/)"""
+    global _default_store
+    if _default_store is None:
+        _default_store = PriceStore()
+    return _default_store
@@ -0,0 +1,116 @@
+import pandas as pd
+
+from modules.analytics import result_metrics
+
+
+def print_report(result, kospi_df=None):
+    """거래 로그 + 일별 자산곡선 기준 성과 지표 (modules.analytics) 출력. kospi_df 가 있으면 코스피 대비 지표도"""
+    df_summary = result.trade_frame()
+    if df_summary.empty:
+        print("\n📊 거래 없음")
+        return
+
+    print("\n📊 최종 성과 요약:")
+    print(df_summary[['name', 'entry_date', 'exit_date', 'entry_price', 'exit_price', 'return']])
+
+    m = result_metrics(result, None if kospi_df is None else kospi_df['종가'])
+    print(f"\n💰 누적 수익률: {m['total_return']:.2%} (CAGR {m['cagr']:.2%})")
+    print(f"📉 MDD: {m['mdd']:.2%} (최장 {m['mdd_days']:.0f}거래일)")
+    print(f"📈 Sharpe Ratio: {m['sharpe']:.2f} | Sortino: {m['sortino']:.2f}")
+    print(f"🎯 승률: {(df_summary['return'] > 0).mean():.2%} | 연 회전율: {m['turnover']:.1f}")
+    if kospi_df is not None:
+        print(f"📊 코스피 대비: 초과 CAGR {m['excess_cagr']:.2%}, beta {m['beta']:.2f}, "
+              f"IR {m['information_ratio']:.2f}")
+
+
+def plot_report(result, kospi_df, save_path=None):
+    """자산 곡선 차트 2장 (코스피 비교 + 지표 요약). save_path 가 있으면 파일로 저장, 없으면 화면 표시
+
+    matplotlib 은 여기서만 import 한다 (차트를 그리지 않는 실행은 로딩 비용 없음).
+    """
+    import matplotlib
+    if save_path:
+        matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    df_summary = result.trade_frame()
+    returns = list(result.returns)
+    figures = []
+
+    if not df_summary.empty:
+        pnl_df = result.equity_frame()
+
+        # ✅ 날짜 필터링: 포트폴리오 진입~청산 시점 기준으로 잘라줌
+        backtest_start = df_summary['entry_date'].min()
+        backtest_end = df_summary['exit_date'].max()
+        pnl_df = pnl_df.loc[backtest_start:backtest_end]
+
+        kospi_base_slice = kospi_df['종가'].loc[backtest_start:backtest_end]
+        kospi_base_slice = kospi_base_slice / kospi_base_slice.iloc[0] * result.initial_cash  # 전략과 동일 기준으로 정규화
+
+        fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(14, 10), sharex=True)
+        figures.append(fig)
+        ax1.plot(pnl_df.index, pnl_df['asset'], label="전략 평가자산", color='blue')
+        ax1.plot(kospi_base_slice.index, kospi_base_slice, label="코스피 100 지수 (정규화)", color='gray', linestyle='--')
+
+        for i, row in pnl_df.iterrows():
+            if row['event'] in ('buy', 'sell', 'sell/buy'):
+                color = 'green' if row['event'] == 'buy' else 'red'
+                yoffset = 5 if row['event'] == 'buy' else -10
+                ax1.annotate(f"{row['event'].upper()}\n{row.get('label', '')}",
+                             xy=(i, row['asset']),
+                             xytext=(0, yoffset),
+                             textcoords='offset points',
+                             ha='center', fontsize=8, color=color,
+                             arrowprops=dict(arrowstyle='->', color=color))
+        ax1.set_title("전략 수익률 vs 코스피 100 비교")
+        ax1.set_ylabel("자산 (KRW)")
+        ax1.grid(True)
+        ax1.legend()
+
+        if returns:
+            pnl_series = pd.Series(returns, name="PnL")
+            ax2.plot(range(len(pnl_series)), pnl_series.cumsum(), label="누적 PnL", color='purple')
+            ax2.set_title("PnL 곡선")
+            ax2.set_ylabel("누적 수익률")
+            ax2.grid(True)
+            ax2.legend()
+
+    # 수익률 지표 시각화
+    pnl_df = result.equity_frame()
+
+    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(14, 10), sharex=True)
+    figures.append(fig)
+    ax1.plot(pnl_df.index, pnl_df['asset'], label="전략 평가자산", color='blue')
+    ax1.set_title("자산 변화 추이")
+    ax1.set_ylabel("자산 (KRW)")
+    ax1.grid(True)
+    ax1.legend()
+
+    if returns:
+        pnl_series = pd.Series(returns)
+        m = result_metrics(result)
+        win_rate = (pnl_series > 0).mean()
+
+        textstr = (f"누적 수익률: {m['total_return']:.2%}\nCAGR: {m['cagr']:.2%}\n승률: {win_rate:.2%}\n"
+                   f"MDD: {m['mdd']:.2%}\nSharpe: {m['sharpe']:.2f}")
+        ax1.text(0.01, 0.99, textstr, transform=ax1.transAxes, fontsize=10,
+                 verticalalignment='top', bbox=dict(boxstyle='round', facecolor='white', alpha=0.5))
+
+        ax2.plot(pnl_series.cumsum(), label="PnL 누적 합계", color='purple')
+        ax2.set_title("누적 PnL")
+        ax2.set_ylabel("수익률")
+        ax2.grid(True)
+        ax2.legend()
+
+    plt.xlabel("날짜")
+    plt.tight_layout()
+    if save_path:
+        root, ext = save_path.rsplit(".", 1) if "." in save_path else (save_path, "png")
+        for k, fig in enumerate(figures, 1):
+            path = f"{root}_{k}.{ext}" if len(figures) > 1 else f"{root}.{ext}"
+            fig.savefig(path)
+            print(f"[PLOT] 차트 저장 → {path}")
+        plt.close("all")
+    else:
+        plt.show()
@@ -0,0 +1,206 @@
+"""백테스트 결과 저장소 (sqlite 한 파일, 내용 주소 기반)
+
+키 = hash(전략 파라미터 전체 + 기간 + 코드 버전 + 입력 데이터 지문). 같은 키의 실행은 다시 돌리지 않고
+저장된 거래 로그 / 일별 자산곡선 / 지표 / 소요 시간을 바로 돌려준다.
+
+    from modules.result_store import cached_backtest, get_result_store
+    result = cached_backtest(data, {"rsi_exit": 75})          # 두 번째부터는 저장소에서
+    get_result_store().runs(rsi_exit=75).sort_values("sharpe")  # 저장된 실행 비교
+"""
+import hashlib
+import io
+import json
+import os
+import sqlite3
+import time
+
+import numpy as np
+import pandas as pd
+
+from modules.analytics import result_metrics
+from modules.checkpoint import history_fingerprint
+from modules.engine import DEFAULT_STRATEGY_PARAMS, Backtester, BacktestResult
+
+DEFAULT_STORE_PATH = "results.sqlite"
+STORE_VERSION = 1
+# 결과 / 저장 지표에 영향을 주는 모듈 — 이 파일들이 바뀌면 코드 버전이 달라져 예전 결과를 재사용하지 않는다
+CODE_MODULES = ("engine", "indicators", "signal_logic", "stock_filter", "strategy", "cross_index",
+                "trading_calendar", "sector_map", "membership", "analytics")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    key TEXT PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    label TEXT,
+    start_date TEXT NOT NULL,
+    end_date TEXT NOT NULL,
+    params TEXT NOT NULL,
+    code_version TEXT NOT NULL,
+    data_fingerprint TEXT NOT NULL,
+    metrics TEXT NOT NULL,
+    elapsed REAL NOT NULL,
+    payload BLOB NOT NULL
+)
+"""
+
+_code_version = None
+
+
+def code_version():
+    """CODE_MODULES 소스 파일 내용의 해시 (프로세스당 한 번 계산)"""
+    global _code_version
+    if _code_version is None:
+        h = hashlib.blake2b(f"store-{STORE_VERSION}".encode(), digest_size=8)
+        here = os.path.dirname(os.path.abspath(__file__))
+        for name in CODE_MODULES:
+            with open(os.path.join(here, f"{name}.py"), "rb") as f:
+                h.update(f.read())
+        _code_version = h.hexdigest()
+    return _code_version
+
+
+def input_fingerprint(data):
+    """시세(코스피 / 업종 / 종목) + 업종 구성 종목 목록의 지문"""
+    h = hashlib.blake2b(digest_size=8)
+    h.update(history_fingerprint(data, data["end_date"]).encode())
+    members = {code: sorted(stocks) for code, stocks in data["sector_stocks"].items()}
+    if data.get("sector_history"):
+        members["__history"] = {code: [(d.strftime("%Y%m%d"), sorted(m)) for d, m in hist]
+                                for code, hist in data["sector_history"].items()}
+        members["__fallback"] = data.get("members_fallback", True)
+    h.update(json.dumps(members, sort_keys=True).encode())
+    return h.hexdigest()
+
+
+def run_key(params, start_date, end_date, fingerprint, version=None):
+    payload = json.dumps({"params": params, "start": start_date, "end": end_date,
+                          "code": version or code_version(), "data": fingerprint}, sort_keys=True, default=str)
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+def _pack_result(result):
+    buf = io.BytesIO()
+    np.savez(
+        buf,
+        dates=result.dates.values.astype("datetime64[ns]"),
+        equity=result.equity,
+        cash=result.cash,
+        events=result.events,
+        labels=np.asarray(result.labels).astype(str),
+        trades=result.trades,
+        names=np.array(json.dumps(result.names, ensure_ascii=False)),
+        initial_cash=np.array(float(result.initial_cash)),
+    )
+    return buf.getvalue()
+
+
+def _unpack_result(payload):
+    with np.load(io.BytesIO(payload)) as f:
+        return BacktestResult(
+            pd.DatetimeIndex(f["dates"]), f["equity"], f["cash"], f["events"], f["labels"].astype(object),
+            f["trades"], json.loads(str(f["names"])), float(f["initial_cash"]),
+        )
+
+
+class ResultStore:
+    """runs 테이블 하나: 키, 실행 조건(params JSON), 지표(metrics JSON), 소요 시간, 결과 배열(npz BLOB)"""
+
+    def __init__(self, path=DEFAULT_STORE_PATH):
+        self.path = path
+        self._conn = sqlite3.connect(path, timeout=30)
+        self._conn.execute(_SCHEMA)
+        self._conn.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def __contains__(self, key):
+        return self._conn.execute("SELECT 1 FROM runs WHERE key = ?", (key,)).fetchone() is not None
+
+    def get(self, key):
+        """→ (BacktestResult, 지표 dict) 또는 None"""
+        row = self._conn.execute("SELECT payload, metrics FROM runs WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        return _unpack_result(row[0]), json.loads(row[1])
+
+    def put(self, key, result, params, data, fingerprint, metrics, elapsed, label=None):
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, time.strftime("%Y-%m-%dT%H:%M:%S"), label, data["start_date"], data["end_date"],
+                 json.dumps(params, sort_keys=True, default=str), code_version(), fingerprint,
+                 json.dumps(metrics), elapsed, sqlite3.Binary(_pack_result(result))),
+            )
+
+    def runs(self, current_code=False, **filters):
+        """저장된 실행 목록 DataFrame (파라미터 / 지표가 컬럼으로 펼쳐짐)
+
+        filters: 파라미터 또는 기간 값이 같은 실행만 (예: runs(rsi_exit=75, start_date="20200101"))
+        current_code=True 면 지금 코드 버전으로 만든 결과만.
+        """
+        rows = self._conn.execute(
+            "SELECT key, created_at, label, start_date, end_date, params, code_version, data_fingerprint, "
+            "metrics, elapsed FROM runs ORDER BY created_at").fetchall()
+        records = []
+        for key, created, label, start, end, params, code, fp, metrics, elapsed in rows:
+            records.append({"key": key, "created_at": created, "label": label, "start_date": start,
+                            "end_date": end, "code_version": code, "data_fingerprint": fp, "elapsed": elapsed,
+                            **json.loads(params), **json.loads(metrics)})
+        df = pd.DataFrame(records)
+        if df.empty:
+            return df
+        if current_code:
+            df = df[df["code_version"] == code_version()]
+        for name, value in filters.items():
+            df = df[df[name] == value] if name in df else df.iloc[0:0]
+        return df.reset_index(drop=True)
+
+    def delete(self, key):
+        with self._conn:
+            self._conn.execute("DELETE FROM runs WHERE key = ?", (key,))
+
+    def log_stats(self):
+        total = self._conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+        print(f"[STORE] 저장소 hit {self.hits} / miss {self.misses} | 저장된 실행 {total}개 ({self.path})")
+
+    def close(self):
+        self._conn.close()
+
+
+_stores = {}
+
+
+def get_result_store(path=DEFAULT_STORE_PATH):
+    """경로별 프로세스 전역 저장소"""
+    store = _stores.get(path)
+    if store is None:
+        store = _stores[path] = ResultStore(path)
+    return store
+
+
+def cached_backtest(data, params=None, store=None, verbose=False, label=None):
+    """같은 (파라미터, 기간, 코드, 데이터) 실행이 저장돼 있으면 바로 반환, 없으면 실행 후 저장 → BacktestResult"""
+    store = store or get_result_store()
+    full = {**DEFAULT_STRATEGY_PARAMS, **(params or {})}
+    fingerprint = input_fingerprint(data)
+    key = run_key(full, data["start_date"], data["end_date"], fingerprint)
+
+    hit = store.get(key)
+    if hit is not None:
+        store.hits += 1
+        print(f"[STORE] ✅ 저장된 결과 사용 ({key[:12]})")
+        return hit[0]
+
+    store.misses += 1
+    started = time.perf_counter()
+    result = Backtester(data, params, verbose).run()
+    elapsed = time.perf_counter() - started
+    metrics = {
+        "final_cash": result.final_cash,
+        "trades": len(result.trades),
+        "win_rate": float((result.returns > 0).mean()) if len(result.trades) else 0.0,
+        **result_metrics(result, data["kospi"]["종가"]),
+    }
+    store.put(key, result, full, data, fingerprint, metrics, elapsed, label)
+    print(f"[STORE] 실행 결과 저장 ({key[:12]}, {elapsed:.1f}s)")
+    return result
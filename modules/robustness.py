@@ -0,0 +1,118 @@
+"""거래 수익률 재표본(bootstrap / block bootstrap / 순서 섞기)으로 성과 지표의 분포를 구한다
+
+재표본 n 개를 (n × 거래수) 행렬 하나로 만들고 복리 수익률 / MDD / Sharpe / 승률을 행 단위
+numpy 연산으로 한 번에 계산한다 (파이썬 루프는 chunk 단위뿐). 10만 회도 수 초 안에 끝난다.
+
+    from modules.robustness import run_robustness
+    dists, summary = run_robustness(result.returns, n=100_000)
+"""
+import numpy as np
+import pandas as pd
+
+METRICS = ("compound_return", "mdd", "sharpe", "win_rate")
+METHODS = ("bootstrap", "block", "shuffle")
+DEFAULT_BLOCK = 5
+CHUNK_ROWS = 20_000   # 한 번에 만드는 재표본 행 수 (메모리 상한: CHUNK_ROWS × 거래수 × 8바이트 × 수 배)
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+TIE_ULPS = 8  # 실제값과 이 정도 (eps × 거래수 × 배수) 안으로 같으면 동률 — 순서를 바꾼 합산 / 곱의 반올림 오차
+
+
+def trade_metrics(samples):
+    """(n × m) 거래 수익률 행렬 → 행별 지표 dict
+
+    compound_return: 복리 누적 (= 최종자산 / 초기자산 - 1), mdd: 거래 단위 자산곡선의 최대 낙폭 (음수),
+    sharpe: 거래당 평균 / 표준편차 (표준편차 0 이면 NaN), win_rate: 수익 거래 비율.
+    MDD / Sharpe / 승률은 evaluate_backtest_results 와 같은 정의라 원래 순서 한 줄을 넣으면 같은 값이 나온다.
+    단 그쪽 '누적 수익률' 은 단순 합이고, 여기서는 전액 재투자하는 엔진에 맞춰 복리로 계산한다.
+    """
+    samples = np.atleast_2d(np.asarray(samples, dtype=float))
+    equity = np.cumprod(1 + samples, axis=1)
+    drawdown = equity / np.maximum.accumulate(equity, axis=1) - 1
+    std = samples.std(axis=1, ddof=1) if samples.shape[1] > 1 else np.full(len(samples), np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sharpe = np.where(std > 0, samples.mean(axis=1) / std, np.nan)
+    return {
+        "compound_return": equity[:, -1] - 1,
+        "mdd": drawdown.min(axis=1),
+        "sharpe": sharpe,
+        "win_rate": (samples > 0).mean(axis=1),
+    }
+
+
+def bootstrap_indices(rng, rows, m):
+    """복원 추출 (거래 하나씩 독립)"""
+    return rng.integers(0, m, size=(rows, m))
+
+
+def block_indices(rng, rows, m, block=DEFAULT_BLOCK):
+    """원형 블록 bootstrap: 길이 block 인 연속 구간을 이어 붙여 연속 손실 같은 순서 의존성을 보존"""
+    block = max(1, min(block, m))
+    n_blocks = -(-m // block)
+    starts = rng.integers(0, m, size=(rows, n_blocks, 1))
+    return ((starts + np.arange(block)) % m).reshape(rows, -1)[:, :m]
+
+
+def shuffle_indices(rng, rows, m):
+    """거래 순서만 무작위로 바꾼 재배열 (복리 수익률 / 승률은 그대로, MDD 분포를 본다)"""
+    return rng.permuted(np.broadcast_to(np.arange(m), (rows, m)), axis=1)
+
+
+def resample(returns, n=10_000, method="bootstrap", block=DEFAULT_BLOCK, seed=0, chunk=CHUNK_ROWS):
+    """재표본 n 개의 지표 분포 → {지표: 길이 n 배열}"""
+    returns = np.asarray(returns, dtype=float)
+    m = len(returns)
+    if m == 0:
+        return {k: np.full(n, np.nan) for k in METRICS}
+    rng = np.random.default_rng(seed)
+    out = {k: np.empty(n) for k in METRICS}
+    for lo in range(0, n, chunk):
+        rows = min(chunk, n - lo)
+        if method == "bootstrap":
+            idx = bootstrap_indices(rng, rows, m)
+        elif method == "block":
+            idx = block_indices(rng, rows, m, block)
+        elif method == "shuffle":
+            idx = shuffle_indices(rng, rows, m)
+        else:
+            raise ValueError(f"알 수 없는 method: {method} (가능: {', '.join(METHODS)})")
+        for k, v in trade_metrics(returns[idx]).items():
+            out[k][lo:lo + rows] = v
+    return out
+
+
+def summarize(returns, dists):
+    """방법별 분포 → (방법, 지표) 행의 요약표: 실제값, 평균, 표준편차, 분위수, 실제값 이하 비율
+
+    pct_below_actual 은 실제값과 (반올림 오차 범위 안에서) 같은 표본을 절반만 센다 — shuffle 에서
+    순서와 무관한 지표 (복리 수익률 / Sharpe / 승률) 는 전부 동률이라 0.5 가 된다.
+    """
+    returns = np.asarray(returns, dtype=float)
+    actual = {k: v[0] for k, v in trade_metrics(returns).items()}
+    rows = []
+    for method, dist in dists.items():
+        for k in METRICS:
+            v = dist[k]
+            ok = v[~np.isnan(v)]
+            row = {"method": method, "metric": k, "actual": actual[k],
+                   "mean": ok.mean() if len(ok) else np.nan, "std": ok.std() if len(ok) else np.nan}
+            for q, value in zip(QUANTILES, np.quantile(ok, QUANTILES) if len(ok) else [np.nan] * len(QUANTILES)):
+                row[f"p{int(q * 100)}"] = value
+            tol = TIE_ULPS * np.finfo(float).eps * len(returns) * max(abs(actual[k]), 1.0)
+            tie = np.abs(ok - actual[k]) <= tol
+            row["pct_below_actual"] = ((ok < actual[k]) & ~tie).mean() + 0.5 * tie.mean() if len(ok) else np.nan
+            rows.append(row)
+    return pd.DataFrame(rows).set_index(["method", "metric"])
+
+
+def run_robustness(returns, n=10_000, methods=METHODS, block=DEFAULT_BLOCK, seed=0):
+    """거래 수익률 목록 → ({방법: {지표: 분포 배열}}, 요약 DataFrame)"""
+    returns = np.asarray(list(returns), dtype=float)
+    dists = {method: resample(returns, n, method, block, seed + k) for k, method in enumerate(methods)}
+    return dists, summarize(returns, dists)
+
+
+def print_robustness(summary):
+    print("\n🎲 재표본 강건성 분석 (5% / 50% / 95% 분위):")
+    for (method, metric), row in summary.iterrows():
+        print(f"  {method:<9} {metric:<15} 실제 {row['actual']:9.4f} | "
+              f"{row['p5']:9.4f} {row['p50']:9.4f} {row['p95']:9.4f}")
@@ -1,4 +1,6 @@
-from modules.indicators import calculate_indicators
+import numpy as np
+import pandas as pd
+from modules.indicators import DEFAULT_INDICATOR_PARAMS, calculate_indicators, calculate_rs, supertrend_kernel
 from modules.sector_map import sector_code_map
 
 def find_leading_sectors(sector_data_dict, kospi_df):
@@ -25,3 +27,133 @@ def find_leading_sectors(sector_data_dict, kospi_df):
             print(f"[ERROR] 업종 코드 {code} 계산 실패: {e}")
 
     return sorted(leading_sectors, key=lambda x: x[2], reverse=True)
+
+
+def build_sector_signal_panel(sector_data_dict, kospi_df, params=None):
+    """업종별 지표를 전체 기간에 대해 한 번만 계산해 날짜 × 업종 패널로 만든다.
+
+    Supertrend, RS 는 모두 과거 봉만 사용하므로 전체 기간으로 계산한 값의
+    t 시점 행은 t 까지 잘라서 계산한 값과 같다 (lookahead 없음).
+    반환값: {'Supertrend', 'RS', 'RS_prev', 'bars'} → DataFrame(index=날짜, columns=업종코드)
+    params 로 Supertrend 기간/배수, RS 창 크기, RS 비교 시차(rs_lag)를 바꿀 수 있다.
+    """
+    p = {**DEFAULT_INDICATOR_PARAMS, 'rs_lag': 5, **(params or {})}
+    supertrend, rs, rs_prev, bars = {}, {}, {}, {}
+
+    # 같은 날짜 인덱스를 가진 업종끼리 묶어 Supertrend 를 한 번에 계산
+    groups = {}
+    for code, df in sector_data_dict.items():
+        groups.setdefault(tuple(df.index), []).append(code)
+
+    for codes in groups.values():
+        frames = [sector_data_dict[c] for c in codes]
+        try:
+            st_values, _, _ = supertrend_kernel(
+                np.column_stack([f['고가'] for f in frames]),
+                np.column_stack([f['저가'] for f in frames]),
+                np.column_stack([f['종가'] for f in frames]),
+                p['st_period'], p['st_multiplier'],
+            )
+        except Exception as e:
+            print(f"[ERROR] 업종 코드 {', '.join(codes)} 계산 실패: {e}")
+            continue
+        for j, code in enumerate(codes):
+            supertrend[code] = pd.Series(st_values[:, j], index=frames[j].index)
+
+    for code, df in sector_data_dict.items():
+        if code not in supertrend:
+            continue
+        try:
+            rs_series = calculate_rs(df, kospi_df, p['rs_window']).reindex(df.index)
+        except Exception as e:
+            print(f"[ERROR] 업종 코드 {code} 계산 실패: {e}")
+            del supertrend[code]
+            continue
+        rs[code] = rs_series
+        rs_prev[code] = rs_series.shift(p['rs_lag'])  # rs_lag=5 면 iloc[-6] 과 동일 (업종 자체 봉 기준)
+        bars[code] = pd.Series(range(1, len(df) + 1), index=df.index)
+
+    # 업종 입력 순서를 유지해야 find_leading_sectors 와 동순위 정렬 결과가 같다
+    order = [c for c in sector_data_dict if c in rs]
+    supertrend = {c: supertrend[c] for c in order}
+
+    return {
+        'Supertrend': pd.DataFrame(supertrend),
+        'RS': pd.DataFrame(rs),
+        'RS_prev': pd.DataFrame(rs_prev),
+        'bars': pd.DataFrame(bars),
+    }
+
+
+def find_leading_sectors_from_panel(panel, current_date, min_bars=21, rs_threshold=1.05):
+    """미리 계산된 패널에서 current_date 행만 읽어 주도 업종을 정렬해 반환한다.
+
+    find_leading_sectors(…loc[:current_date]…) 와 같은 결과를 돌려준다.
+    min_bars 로 main.py 의 최소 봉 수(60) 조건도 함께 적용할 수 있다.
+    """
+    bars = panel['bars']
+    if current_date not in bars.index:
+        return []
+
+    bars_row = bars.loc[current_date]
+    st_row = panel['Supertrend'].loc[current_date]
+    rs_row = panel['RS'].loc[current_date]
+    prev_row = panel['RS_prev'].loc[current_date]
+
+    leading_sectors = []
+    for code in bars.columns:
+        n = bars_row[code]
+        # 해당 날짜에 봉이 없는 업종은 제외 (main.py 의 current_date in v.index 조건)
+        if pd.isna(n) or n < max(min_bars, 21):
+            continue
+
+        latest_rs = rs_row[code]
+        is_supertrend = bool(st_row[code])
+        is_rs_strong = latest_rs > rs_threshold
+        is_rs_growing = latest_rs > prev_row[code]
+
+        if is_supertrend and is_rs_strong and is_rs_growing:
+            name = sector_code_map.get(code, f"업종코드 {code}")
+            leading_sectors.append((code, name, latest_rs))
+
+    return sorted(leading_sectors, key=lambda x: x[2], reverse=True)
+
+
+class SectorSignals:
+    """업종 패널을 거래일 달력 위치에 맞춘 numpy 배열 묶음
+
+    leading(t) 는 find_leading_sectors_from_panel(panel, dates[t]) 와 같은 결과를
+    날짜 label 조회 없이 배열 한 행 연산으로 돌려준다.
+    """
+
+    __slots__ = ("codes", "names", "supertrend", "rs", "rs_prev", "bars")
+
+    def __init__(self, panel, dates):
+        self.codes = list(panel['bars'].columns)
+        self.names = [sector_code_map.get(c, f"업종코드 {c}") for c in self.codes]
+
+        def aligned(name):
+            return panel[name].reindex(index=dates, columns=self.codes)
+
+        self.bars = aligned('bars').to_numpy(dtype=float)
+        self.rs = aligned('RS').to_numpy(dtype=float)
+        self.rs_prev = aligned('RS_prev').to_numpy(dtype=float)
+        st = aligned('Supertrend').to_numpy(dtype=object)
+        self.supertrend = np.where(pd.isna(st), False, st).astype(bool)
+
+    def leading(self, t, min_bars=21, rs_threshold=1.05):
+        rs = self.rs[t]
+        with np.errstate(invalid='ignore'):
+            ok = (self.bars[t] >= max(min_bars, 21)) & self.supertrend[t] & (rs > rs_threshold) & (rs > self.rs_prev[t])
+        idx = np.flatnonzero(ok)
+        idx = idx[np.argsort(-rs[idx], kind='stable')]  # sorted(reverse=True) 와 같은 동순위 순서
+        return [(self.codes[j], self.names[j], rs[j]) for j in idx]
+
+    def leaders(self, min_bars=21, rs_threshold=1.05):
+        """전 거래일의 1위 업종을 한 번에 → (업종 위치 배열 (없으면 -1), 그 업종 RS 배열) — leading(t)[0] 과 같음"""
+        with np.errstate(invalid='ignore'):
+            ok = (self.bars >= max(min_bars, 21)) & self.supertrend & (self.rs > rs_threshold) & (self.rs > self.rs_prev)
+        has = ok.any(axis=1)
+        best = np.where(has, np.where(ok, self.rs, -np.inf).argmax(axis=1), -1)
+        best_rs = np.where(has, self.rs[np.arange(len(best)), np.maximum(best, 0)], np.nan)
+        return best, best_rs
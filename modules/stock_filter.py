@@ -1,41 +1,29 @@
 from modules.data_loader import get_stock_ohlcv
-from modules.indicators import calculate_indicators
-import pandas as pd
+from modules.cross_index import get_cross_index
 
-def filter_first_golden_cross_stock(stock_dict, start_date, end_date, kospi_df):
-    first_cross = None
+def filter_first_golden_cross_stock(stock_dict, start_date, end_date, kospi_df, as_of=None, index=None,
+                                    loader=None, verbose=True, token=None):
+    """업종 내에서 [start_date, as_of] 구간에 가장 먼저 MA5/MA60 골든크로스가 난 종목
 
-    for code, name in stock_dict.items():
-        df = get_stock_ohlcv(code, start_date, end_date)
-        if df.empty or len(df) < 100:
-            continue
+    종목별 크로스 날짜는 CrossEventIndex 에 한 번만 만들어 두고, 이후 호출은
+    종목당 이진 탐색만 한다. as_of 를 생략하면 end_date 까지 전체를 본다.
+    loader 로 시세 조회 함수를 바꿀 수 있다 (기본: get_stock_ohlcv). token 은 CrossEventIndex.ensure_range 참고.
+    반환값: [(code, name, cross_date, ma5, ma60)] 또는 []
+    """
+    index = index or get_cross_index()
+    loader = loader or get_stock_ohlcv
+    for code in stock_dict:
+        index.ensure_range(code, start_date, end_date, loader, token)
 
-        df = calculate_indicators(df, kospi_df)
-        if 'MA5' not in df or 'MA60' not in df:
-            continue
+    hit = index.earliest_golden(stock_dict, start_date, as_of, min_bars=100)
 
-        for i in range(1, len(df)):
-            prev_ma5 = df['MA5'].iloc[i - 1]
-            prev_ma60 = df['MA60'].iloc[i - 1]
-            curr_ma5 = df['MA5'].iloc[i]
-            curr_ma60 = df['MA60'].iloc[i]
-
-            if pd.notna(prev_ma5) and pd.notna(prev_ma60) and pd.notna(curr_ma5) and pd.notna(curr_ma60):
-                if prev_ma5 <= prev_ma60 and curr_ma5 > curr_ma60:
-                    cross_date = df.index[i]
-                    if (first_cross is None) or (cross_date < first_cross['date']):
-                        first_cross = {
-                            'code': code,
-                            'name': name,
-                            'date': cross_date,
-                            'ma5': curr_ma5,
-                            'ma60': curr_ma60
-                        }
-                    break  # 종목당 첫 골든크로스만 확인
-
-    if first_cross:
-        print(f"[SELECT] ✅ 골든크로스 가장 빠른 종목: {first_cross['code']} | {first_cross['name']} | 날짜: {first_cross['date'].date()}")
-        return [(first_cross['code'], first_cross['name'], first_cross['ma5'], first_cross['ma60'])]
+    if hit:
+        code, cross_date, ma5, ma60 = hit
+        name = stock_dict[code]
+        if verbose:
+            print(f"[SELECT] ✅ 골든크로스 가장 빠른 종목: {code} | {name} | 날짜: {cross_date.date()}")
+        return [(code, name, cross_date, ma5, ma60)]
     else:
-        print("[FILTER] ❌ 골든크로스 발생 종목 없음")
+        if verbose:
+            print("[FILTER] ❌ 골든크로스 발생 종목 없음")
         return []
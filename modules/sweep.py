@@ -0,0 +1,116 @@
+import csv
+import itertools
+import multiprocessing as mp
+import os
+import random
+import time
+
+import pandas as pd
+
+from modules.analytics import result_metrics
+from modules.engine import run_backtest
+
+# fork 로 띄운 워커는 이 전역을 copy-on-write 로 공유한다 (작업마다 데이터를 보내지 않음)
+_WORKER_DATA = None
+
+
+def expand_grid(grid):
+    """{'파라미터': [값, ...]} → 모든 조합의 파라미터 dict 목록 (그리드 탐색)"""
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+
+def sample_params(space, n, seed=0):
+    """랜덤 탐색용 파라미터 n 개 추출
+
+    space 값이 list 면 그중 하나를 고르고, (low, high) tuple 이면 구간에서 균등 추출
+    (low, high 가 모두 int 면 정수).
+    """
+    rng = random.Random(seed)
+    samples = []
+    for _ in range(n):
+        params = {}
+        for key, spec in space.items():
+            if isinstance(spec, tuple):
+                low, high = spec
+                if isinstance(low, int) and isinstance(high, int):
+                    params[key] = rng.randint(low, high)
+                else:
+                    params[key] = rng.uniform(low, high)
+            else:
+                params[key] = rng.choice(list(spec))
+        samples.append(params)
+    return samples
+
+
+def summarize_run(result):
+    """BacktestResult → 한 줄 지표 (자산곡선 지표는 modules.analytics 정의)"""
+    returns = pd.Series(result.returns, dtype=float)
+    metrics = {
+        "final_cash": result.final_cash,
+        "cumulative": result.final_cash / result.initial_cash - 1,
+        "trades": len(returns),
+        "win_rate": float((returns > 0).mean()) if len(returns) else 0.0,
+        "cagr": 0.0,
+        "mdd": 0.0,
+        "sharpe": 0.0,
+        "sortino": 0.0,
+    }
+    curve = result_metrics(result)
+    for key in ("cagr", "mdd", "sharpe", "sortino"):
+        if key in curve and curve[key] == curve[key]:
+            metrics[key] = curve[key]
+    return metrics
+
+
+def _init_worker(data):
+    global _WORKER_DATA
+    _WORKER_DATA = data
+
+
+def _run_one(task):
+    run_id, params = task
+    started = time.perf_counter()
+    try:
+        result = run_backtest(_WORKER_DATA, params, verbose=False)
+        metrics = summarize_run(result)
+        error = ""
+    except Exception as e:
+        metrics, error = {}, str(e)
+    return {"run_id": run_id, **params, **metrics, "elapsed": time.perf_counter() - started, "error": error}
+
+
+def run_sweep(param_sets, data, processes=None, results_path="sweep_results.csv"):
+    """파라미터 조합들을 프로세스 풀에서 병렬 실행하고 결과를 CSV 로 바로바로 기록
+
+    data 는 load_backtest_data() 결과. Linux(fork)에서는 워커가 부모 메모리를 그대로
+    공유하고, 그 외 환경에서는 워커당 한 번만 initializer 로 전달된다.
+    반환값: 전체 결과 DataFrame (run_id 순)
+    """
+    global _WORKER_DATA
+    processes = processes or os.cpu_count() or 1
+    tasks = list(enumerate(param_sets))
+    columns = ["run_id", *sorted({k for p in param_sets for k in p}),
+               "final_cash", "cumulative", "trades", "win_rate", "cagr", "mdd", "sharpe", "sortino", "elapsed", "error"]
+
+    if "fork" in mp.get_all_start_methods():
+        _WORKER_DATA = data
+        pool = mp.get_context("fork").Pool(processes)
+    else:
+        pool = mp.Pool(processes, initializer=_init_worker, initargs=(data,))
+
+    rows = []
+    started = time.perf_counter()
+    with pool, open(results_path, "w", newline="", encoding="utf-8-sig") as f:
+        writer = csv.DictWriter(f, fieldnames=columns, extrasaction="ignore")
+        writer.writeheader()
+        # chunksize 1: 조합마다 실행 시간이 달라도 코어가 고르게 쓰이도록
+        for row in pool.imap_unordered(_run_one, tasks, chunksize=1):
+            writer.writerow(row)
+            f.flush()
+            rows.append(row)
+            print(f"[SWEEP] {len(rows)}/{len(tasks)} 완료 (run {row['run_id']}, {row['elapsed']:.1f}s)")
+
+    print(f"[SWEEP] 총 {len(tasks)}개 조합, {processes}개 프로세스, {time.perf_counter() - started:.1f}s → {results_path}")
+    _WORKER_DATA = None
+    return pd.DataFrame(rows, columns=columns).sort_values("run_id").reset_index(drop=True)
@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+
+
+class TradingCalendar:
+    """거래일 달력: 날짜 ↔ 정수 위치 변환과 시리즈 사전 정렬
+
+    백테스트 루프는 날짜 대신 위치 t 로 돌고, 시리즈별 "t 시점까지의 봉 수" 는 커서가
+    한 번에 계산해 두므로 날짜마다 label 슬라이싱이나 이진 탐색을 하지 않는다.
+    """
+
+    def __init__(self, dates):
+        self.dates = pd.DatetimeIndex(dates)
+
+    def __len__(self):
+        return len(self.dates)
+
+    def position(self, date):
+        """달력에 있는 날짜의 위치 (없으면 -1)"""
+        try:
+            return int(self.dates.get_loc(pd.Timestamp(date)))
+        except KeyError:
+            return -1
+
+    def asof(self, date):
+        """date 이하인 마지막 거래일의 위치 (달력 시작 전이면 -1)"""
+        return int(self.dates.searchsorted(pd.Timestamp(date), side="right")) - 1
+
+    def align(self, data):
+        """Series/DataFrame → 달력 날짜에 맞춘 numpy 배열 (없는 날짜는 NaN)"""
+        return data.reindex(self.dates).to_numpy()
+
+    def cursor(self, df, columns=None):
+        return AsOfCursor(df, self, columns)
+
+
+class AsOfCursor:
+    """df 를 달력 위치 t 시점까지만 보는 커서
+
+    counts[t] = df.loc[:달력[t]] 의 길이를 미리 계산해 두고, frame(t) / values(col, t) 는
+    그 길이만큼 앞에서 자른 view 를 돌려준다 (데이터 복사 없음, 날짜마다 O(1)).
+    columns 를 주면 그 컬럼 배열만 복사해 두고 원본 df 는 잡고 있지 않는다 (메모리 한도 모드 —
+    이때 frame() 은 df 를 직접 넘겨야 하고, 다른 컬럼은 읽을 수 없다).
+    """
+
+    __slots__ = ("df", "counts", "_columns")
+
+    def __init__(self, df, calendar, columns=None):
+        self.df = df
+        self.counts = df.index.searchsorted(calendar.dates, side="right")
+        self._columns = {}
+        if columns is not None:
+            self._columns = {name: df[name].to_numpy(copy=True) for name in columns}
+            self.df = None
+
+    @property
+    def nbytes(self):
+        size = self.counts.nbytes + sum(arr.nbytes for arr in self._columns.values())
+        return size + (int(self.df.memory_usage(index=True).sum()) if self.df is not None else 0)
+
+    def bars(self, t):
+        return int(self.counts[t])
+
+    def frame(self, t, df=None):
+        """(df 또는 커서 원본의) t 시점까지의 행 — df 는 같은 날짜 인덱스를 가진 프레임 (예: 지표)"""
+        return (self.df if df is None else df).iloc[:self.counts[t]]
+
+    def column(self, name):
+        arr = self._columns.get(name)
+        if arr is None:
+            arr = self._columns[name] = self.df[name].to_numpy()
+        return arr
+
+    def values(self, name, t):
+        return self.column(name)[:self.counts[t]]
+
+    def last(self, name, t, default=np.nan):
+        """t 시점까지의 마지막 값 (봉이 없으면 default)"""
+        k = self.counts[t]
+        return self.column(name)[k - 1] if k else default
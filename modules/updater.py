@@ -0,0 +1,218 @@
+import argparse
+import glob
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from modules.cross_index import DEFAULT_INDEX_PATH
+from modules.data_loader import extract_sector_code_from_filename
+from modules.fetcher import call_with_retry, get_rate_limiter
+from modules.instrumentation import KRX, count
+from modules.price_store import RECENT_DAYS, get_price_store, settled_end
+
+OVERLAP_BARS = 5          # 정정(수정주가) 여부 확인용으로 다시 받아 비교하는 최근 봉 수
+COMPARE_COLUMNS = ['시가', '고가', '저가', '종가']
+
+
+def _read_csv(path):
+    return pd.read_csv(path, index_col=0, parse_dates=True)
+
+
+def _write_csv_atomic(df, path):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    df.to_csv(tmp)
+    os.replace(tmp, path)
+
+
+def _merge(old, new):
+    df = pd.concat([old, new])
+    df = df[~df.index.duplicated(keep="last")].sort_index()
+    df.index.name = old.index.name or new.index.name
+    return df
+
+
+def _is_restated(old, fetched):
+    """겹치는 날짜의 OHLC 가 저장본과 다르면 (액면분할·수정주가 등) True
+
+    저장본의 마지막 봉은 장중에 받은 미확정 값일 수 있어 비교에서 뺀다 (그 봉은 새 값으로 덮어씀).
+    """
+    common = old.index[:-1].intersection(fetched.index)
+    cols = [c for c in COMPARE_COLUMNS if c in old and c in fetched]
+    if common.empty or not cols:
+        return False
+    a = old.loc[common, cols].to_numpy(dtype=float)
+    b = fetched.loc[common, cols].to_numpy(dtype=float)
+    return not np.allclose(a, b, rtol=1e-6, equal_nan=True)
+
+
+def _last_bar_changed(old, fetched):
+    """저장본 마지막 봉(장중 값일 수 있음)이 새로 받은 값과 다르면 True"""
+    last = old.index[-1]
+    cols = [c for c in COMPARE_COLUMNS if c in old and c in fetched]
+    if last not in fetched.index or not cols:
+        return False
+    a = old.loc[[last], cols].to_numpy(dtype=float)
+    b = fetched.loc[[last], cols].to_numpy(dtype=float)
+    return not np.allclose(a, b, rtol=1e-6, equal_nan=True)
+
+
+def _find_gaps(dates, calendar, halts=()):
+    """저장본 기간 안에서 기준 달력(코스피 거래일)에 있는데 빠진 날짜 구간들 → [(start, end)]
+
+    halts: 이미 다시 받아 봐도 봉이 없던 구간 (거래정지) — 매번 다시 요청하지 않도록 제외한다
+    """
+    if calendar is None or len(dates) == 0:
+        return []
+    cal = calendar[(calendar >= dates[0]) & (calendar <= dates[-1])]
+    missing = cal.difference(dates)
+    for s, e in halts:
+        missing = missing[(missing < s) | (missing > e)]
+    if missing.empty:
+        return []
+    # 달력상 연속된 결측일을 하나의 구간으로 묶는다
+    pos = cal.get_indexer(missing)
+    breaks = np.flatnonzero(np.diff(pos) != 1) + 1
+    return [(chunk[0], chunk[-1]) for chunk in np.split(missing, breaks)]
+
+
+def _drop_cross_index(key):
+    """수정주가가 반영되면 예전 가격으로 만든 크로스 인덱스는 버린다"""
+    for path in glob.glob(os.path.join(DEFAULT_INDEX_PATH, "**", f"{key}.npz"), recursive=True):
+        os.remove(path)
+
+
+def _write_store(store, kind, key, df, start, today):
+    """받은 봉을 저장소에 반영하고 coverage 는 확정된 날짜까지만 기록"""
+    last = settled_end(df, start, today, today)
+    store.write(kind, key, df, start if last is not None else None, last)
+
+
+def update_series(path, kind, key, fetch, today, calendar=None, store=None):
+    """CSV 하나를 증분 갱신하고 무엇이 바뀌었는지 dict 로 반환
+
+    1) 마지막 OVERLAP_BARS 봉부터 today 까지만 받는다
+    2) 겹치는 봉이 저장본과 다르면 정정으로 보고 전체 기간을 다시 받는다
+    3) 기준 달력 대비 빠진 날짜 구간은 그 구간만 다시 받아 채운다
+    4) 결과는 임시 파일에 쓴 뒤 교체(원자적)하고, 로컬 저장소에도 반영한다
+    """
+    store = store or get_price_store()
+    report = {"kind": kind, "key": key, "path": path, "last_before": None, "last_after": None,
+              "added": 0, "gaps_repaired": 0, "restated": False, "status": "ok", "error": ""}
+    try:
+        old = _read_csv(path)
+        if old.empty:
+            report["status"] = "empty"
+            return report
+        report["last_before"] = old.index[-1]
+        fetch_start = old.index[max(len(old) - OVERLAP_BARS, 0)]
+        today = pd.Timestamp(today).normalize()
+
+        fetched = fetch(fetch_start.strftime("%Y%m%d"), today.strftime("%Y%m%d"))
+        if fetched is None:
+            fetched = pd.DataFrame()
+
+        if not fetched.empty and _is_restated(old, fetched):
+            full = fetch(old.index[0].strftime("%Y%m%d"), today.strftime("%Y%m%d"))
+            if full is None or full.empty:
+                raise RuntimeError("정정 감지 후 전체 재조회 실패")
+            report["restated"] = True
+            new = full
+            _write_store(store, kind, key, full, old.index[0], today)
+            _drop_cross_index(key)
+        else:
+            new = _merge(old, fetched) if not fetched.empty else old
+            refreshed = not fetched.empty and _last_bar_changed(old, fetched)
+            if not fetched.empty:
+                _write_store(store, kind, key, fetched, fetch_start, today)
+
+            recent = today - pd.Timedelta(days=RECENT_DAYS)
+            for gap_start, gap_end in _find_gaps(new.index, calendar, store.halts(kind, key)):
+                filled = fetch(gap_start.strftime("%Y%m%d"), gap_end.strftime("%Y%m%d"))
+                if filled is not None and not filled.empty:
+                    new = _merge(new, filled)
+                    store.write(kind, key, filled, gap_start, gap_end)
+                    report["gaps_repaired"] += len(filled)
+                # 원천에 다시 물어도 남은 결측은 거래정지로 기록 (최근 구간은 일시 실패일 수 있어 다음에 다시 확인)
+                if gap_end < recent:
+                    store.add_halt(kind, key, gap_start, gap_end)
+
+        report["added"] = int((new.index > old.index[-1]).sum())
+        report["last_after"] = new.index[-1]
+        if report["restated"] or report["added"] or report["gaps_repaired"] or refreshed:
+            _write_csv_atomic(new, path)
+        else:
+            report["status"] = "unchanged"
+    except Exception as e:
+        report["status"] = "error"
+        report["error"] = str(e)
+    return report
+
+
+def _krx_fetcher(fn, code, limiter):
+    def fetch(start, end):
+        df = call_with_retry(fn, start, end, code, limiter=limiter, key="krx")
+        if df is not None:
+            df.columns.name = None
+            count(KRX, int(df.memory_usage().sum()))
+        return df
+    return fetch
+
+
+def run_update(stock_dir="stock_data", index_dir="data", today=None, max_workers=4, krx=None,
+               store=None, report_path=None):
+    """stock_data/*.csv 와 data/index_*.csv 전체를 증분 갱신
+
+    지수를 먼저 갱신한 뒤, 코스피(1001) 거래일을 기준 달력으로 종목 결측 구간을 찾는다.
+    반환값: 파일별 변경 내역 DataFrame (report_path 를 주면 CSV 로도 저장)
+    """
+    if krx is None:
+        from pykrx import stock as krx
+    today = pd.Timestamp(today or pd.Timestamp.today()).normalize()
+    limiter = get_rate_limiter()
+    store = store or get_price_store()
+
+    index_jobs = []
+    for path in sorted(glob.glob(os.path.join(index_dir, "index_*.csv"))):
+        code = extract_sector_code_from_filename(path)
+        if code:
+            index_jobs.append((path, "index", code, _krx_fetcher(krx.get_index_ohlcv_by_date, code, limiter)))
+    stock_jobs = [
+        (path, "stock", os.path.basename(path)[:-4],
+         _krx_fetcher(krx.get_market_ohlcv_by_date, os.path.basename(path)[:-4], limiter))
+        for path in sorted(glob.glob(os.path.join(stock_dir, "*.csv")))
+    ]
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        reports = list(pool.map(lambda job: update_series(*job, today, None, store), index_jobs))
+
+        calendar = None
+        kospi_path = next((job[0] for job in index_jobs if job[2] == "1001"), None)
+        if kospi_path:
+            calendar = _read_csv(kospi_path).index
+
+        reports += list(pool.map(lambda job: update_series(*job, today, calendar, store), stock_jobs))
+
+    df = pd.DataFrame(reports)
+    if not df.empty:
+        changed = df[df["status"] == "ok"]
+        print(f"[UPDATE] {len(df)}개 중 갱신 {len(changed)} / 변경 없음 {(df['status'] == 'unchanged').sum()} / "
+              f"오류 {(df['status'] == 'error').sum()} | 새 봉 {int(df['added'].sum())}, "
+              f"결측 보정 {int(df['gaps_repaired'].sum())}, 정정 {int(df['restated'].sum())}")
+        for row in df[df["restated"] | (df["gaps_repaired"] > 0) | (df["status"] == "error")].itertuples():
+            print(f"  - {row.kind} {row.key}: 정정={row.restated} 결측보정={row.gaps_repaired} {row.error}")
+    if report_path:
+        df.to_csv(report_path, index=False, encoding="utf-8-sig")
+    return df
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="종목/지수 CSV 증분 갱신")
+    parser.add_argument("--today", help="갱신 기준일 (YYYYMMDD, 기본: 오늘)")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--stock-dir", default="stock_data")
+    parser.add_argument("--index-dir", default="data")
+    parser.add_argument("--report", help="변경 내역 CSV 저장 경로")
+    args = parser.parse_args()
+    run_update(args.stock_dir, args.index_dir, args.today, args.workers, report_path=args.report)
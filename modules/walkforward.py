@@ -0,0 +1,171 @@
+import argparse
+import multiprocessing as mp
+import os
+import time
+
+import pandas as pd
+
+from modules.cross_index import data_token, get_cross_index
+from modules.engine import DEFAULT_STRATEGY_PARAMS, INDICATOR_KEYS, load_backtest_data, run_backtest
+from modules.signal_logic import build_sector_signal_panel
+from modules.sweep import expand_grid, summarize_run
+
+TRADING_DAYS = 252
+
+# fork 로 띄운 워커는 이 전역을 copy-on-write 로 공유한다: (data, {패널 키: 업종 패널})
+_WORKER_STATE = None
+
+
+def make_folds(dates, train_bars, test_bars, step_bars=None, anchored=False):
+    """거래일 배열을 학습/검증 구간으로 나눈다 → [(train_start, train_end, test_start, test_end)]
+
+    rolling: 학습 구간이 step_bars 씩 밀려가고, anchored: 학습 시작일을 첫 날로 고정하고 늘려간다.
+    검증 구간은 학습 구간 바로 다음 test_bars 봉 (마지막 fold 는 남은 봉만큼).
+    """
+    step_bars = step_bars or test_bars
+    folds = []
+    train_end = train_bars
+    while train_end < len(dates):
+        train_start = 0 if anchored else train_end - train_bars
+        test_end = min(train_end + test_bars, len(dates))
+        folds.append((dates[train_start], dates[train_end - 1], dates[train_end], dates[test_end - 1]))
+        train_end += step_bars
+    return folds
+
+
+def _panel_key(params):
+    p = {**DEFAULT_STRATEGY_PARAMS, **params}
+    return tuple(p[k] for k in INDICATOR_KEYS) + (p['rs_lag'],)
+
+
+def precompute(data, param_sets):
+    """fold 간에 공유할 계산을 부모 프로세스에서 한 번만 해 둔다
+
+    - 업종 패널: 지표 파라미터 조합별로 전체 기간에 대해 한 번 (인과적이라 어느 fold 에서 잘라 써도 같음)
+    - 크로스 인덱스: MA 창 크기별로 전체 종목을 한 번 동기화
+    """
+    panels = {}
+    for params in param_sets:
+        key = _panel_key(params)
+        if key not in panels:
+            p = {**DEFAULT_STRATEGY_PARAMS, **params}
+            panels[key] = build_sector_signal_panel(
+                data["sectors"], data["kospi"], {**{k: p[k] for k in INDICATOR_KEYS}, 'rs_lag': p['rs_lag']})
+
+    windows = {(p.get('ma_short', DEFAULT_STRATEGY_PARAMS['ma_short']),
+                p.get('ma_long', DEFAULT_STRATEGY_PARAMS['ma_long'])) for p in param_sets}
+    for short, long in windows:
+        index = get_cross_index(short, long)
+        for ticker, df in data["stocks"].items():
+            index.ensure_range(ticker, data["start_date"], data["end_date"], lambda t, s, e: df, data_token(data))
+    return panels
+
+
+def _window(data, start, end):
+    """전체 기간 데이터에서 매매 구간만 바꾼 얕은 복사본 (시세/지표는 그대로 공유)"""
+    return {**data, "start_date": start, "end_date": end}
+
+
+def _run_fold(task):
+    fold_id, (train_start, train_end, test_start, test_end), param_sets, objective = task
+    data, panels = _WORKER_STATE
+    started = time.perf_counter()
+
+    best, best_score = None, None
+    train = _window(data, train_start, train_end)
+    for params in param_sets:
+        result = run_backtest(train, params, verbose=False, sector_panel=panels[_panel_key(params)])
+        score = summarize_run(result)[objective]
+        if best_score is None or score > best_score:
+            best, best_score = params, score
+    train_elapsed = time.perf_counter() - started
+
+    result = run_backtest(_window(data, test_start, test_end), best, verbose=False,
+                          sector_panel=panels[_panel_key(best)])
+    row = {
+        "fold": fold_id,
+        "train_start": train_start, "train_end": train_end,
+        "test_start": test_start, "test_end": test_end,
+        **{f"best_{k}": v for k, v in best.items()},
+        f"train_{objective}": best_score,
+        **{f"test_{k}": v for k, v in summarize_run(result).items()},
+        "train_s": train_elapsed,
+        "test_s": time.perf_counter() - started - train_elapsed,
+        "pid": os.getpid(),
+    }
+    return row, result.equity_frame()["asset"] / result.initial_cash
+
+
+def stitch_equity(curves, initial_cash):
+    """fold 별 검증 구간 자산곡선(시작=1 기준)을 이어 붙여 하나의 out-of-sample 곡선으로"""
+    pieces, level = [], float(initial_cash)
+    for curve in curves:
+        if curve.empty:
+            continue
+        pieces.append(curve * level)
+        level *= float(curve.iloc[-1])
+    return pd.concat(pieces) if pieces else pd.Series(dtype=float)
+
+
+def run_walk_forward(data, param_sets, train_bars=TRADING_DAYS * 2, test_bars=TRADING_DAYS // 2,
+                     step_bars=None, anchored=False, objective="sharpe", processes=None):
+    """walk-forward 최적화: fold 마다 학습 구간에서 param_sets 중 objective 최고 조합을 골라 다음 구간에서 검증
+
+    data 는 load_backtest_data() 결과 (전체 기간). fold 들은 프로세스 풀에서 병렬로 돈다.
+    반환값: (fold 별 결과 DataFrame, 이어 붙인 out-of-sample 평가자산 Series)
+    """
+    global _WORKER_STATE
+    dates = data["kospi"].loc[data["start_date"]:data["end_date"]].index
+    folds = make_folds(dates, train_bars, test_bars, step_bars, anchored)
+    if not folds:
+        raise ValueError(f"기간이 너무 짧음: {len(dates)}봉 (학습 {train_bars}봉 + 검증 1봉 이상 필요)")
+    param_sets = list(param_sets) or [{}]
+
+    started = time.perf_counter()
+    _WORKER_STATE = (data, precompute(data, param_sets))
+    precompute_s = time.perf_counter() - started
+    print(f"[WF] {len(folds)}개 fold × {len(param_sets)}개 조합 | 사전 계산 {precompute_s:.1f}s")
+
+    tasks = [(i, fold, param_sets, objective) for i, fold in enumerate(folds)]
+    processes = min(processes or os.cpu_count() or 1, len(tasks))
+    try:
+        if processes > 1 and "fork" in mp.get_all_start_methods():
+            with mp.get_context("fork").Pool(processes) as pool:
+                outputs = pool.map(_run_fold, tasks, chunksize=1)
+        else:
+            outputs = [_run_fold(task) for task in tasks]
+    finally:
+        _WORKER_STATE = None
+
+    rows = [row for row, _ in outputs]
+    for row in rows:
+        print(f"[WF] fold {row['fold']} 학습 {row['train_start'].date()}~{row['train_end'].date()} "
+              f"→ 검증 {row['test_start'].date()}~{row['test_end'].date()} | "
+              f"검증 수익률 {row['test_cumulative']:.2%} ({row['train_s']:.1f}s + {row['test_s']:.1f}s)")
+    initial_cash = {**DEFAULT_STRATEGY_PARAMS, **param_sets[0]}['initial_cash']
+    equity = stitch_equity([curve for _, curve in outputs], initial_cash)
+    print(f"[WF] out-of-sample 누적 수익률 {equity.iloc[-1] / initial_cash - 1:.2%} | "
+          f"총 {time.perf_counter() - started:.1f}s, {processes}개 프로세스")
+    return pd.DataFrame(rows), equity
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="walk-forward 최적화 (학습 구간 그리드 탐색 → 다음 구간 검증)")
+    parser.add_argument("--start", default="20150101")
+    parser.add_argument("--end", default="20250101")
+    parser.add_argument("--train-bars", type=int, default=TRADING_DAYS * 2)
+    parser.add_argument("--test-bars", type=int, default=TRADING_DAYS // 2)
+    parser.add_argument("--step-bars", type=int)
+    parser.add_argument("--anchored", action="store_true", help="학습 시작일 고정 (기본: rolling)")
+    parser.add_argument("--objective", default="sharpe")
+    parser.add_argument("--processes", type=int)
+    parser.add_argument("--out", default="walkforward")
+    args = parser.parse_args()
+
+    grid = {"rs_threshold": [1.0, 1.05, 1.1], "rsi_exit": [70, 80]}
+    folds_df, oos = run_walk_forward(
+        load_backtest_data(args.start, args.end), expand_grid(grid), args.train_bars, args.test_bars,
+        args.step_bars, args.anchored, args.objective, args.processes)
+    folds_df.to_csv(f"{args.out}_folds.csv", index=False, encoding="utf-8-sig")
+    oos.rename("asset").to_csv(f"{args.out}_equity.csv", encoding="utf-8-sig")
+    print(f"[WF] 저장 → {args.out}_folds.csv, {args.out}_equity.csv")